@@ -0,0 +1,4 @@
+from .measure import Measurement, measure, measure_isolated
+from .suite import\
+    StageResult, Regression, run_stage,\
+    save_results, load_results, find_regressions, format_results
@@ -0,0 +1,83 @@
+"""Measurement of wall time and peak memory of pipeline stages.
+"""
+import multiprocessing as mp
+import resource
+import time
+from typing import Any, Callable, NamedTuple, Optional
+
+_PATH_PROC_STATUS = "/proc/self/status"
+_PATH_PROC_CLEAR_REFS = "/proc/self/clear_refs"
+
+class Measurement(NamedTuple):
+    wall_time: float # Seconds
+    peak_rss: int # Increase of the peak resident set size in bytes
+    result: Any # Return value of the measured function
+
+def _read_proc_status_kb(key: str) -> Optional[int]:
+    try:
+        with open(_PATH_PROC_STATUS, "r", encoding="utf-8") as file:
+            for line in file:
+                if line.startswith(f"{key}:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def _reset_peak_rss() -> bool:
+    # Resets the peak RSS (`VmHWM`) to the current RSS (Linux only)
+    try:
+        with open(_PATH_PROC_CLEAR_REFS, "w", encoding="utf-8") as file:
+            file.write("5")
+        return True
+    except OSError:
+        return False
+
+def measure(f: Callable[..., Any], *args, **kwargs) -> Measurement:
+    """Measures wall time and peak RSS increase of `f` in the current process.
+    If the peak RSS cannot be reset, the increase is relative to the process' previous peak.
+
+    Args:
+        f (Callable[..., Any]): Function to measure, called with `args` and `kwargs`.
+
+    Returns:
+        Measurement: Wall time, peak RSS increase and the result of `f`.
+    """
+    is_reset = _reset_peak_rss()
+    rss_start = _read_proc_status_kb("VmRSS") if is_reset else None
+    if rss_start is None:
+        rss_start = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    t_start = time.perf_counter()
+    result = f(*args, **kwargs)
+    wall_time = time.perf_counter() - t_start
+
+    rss_peak = _read_proc_status_kb("VmHWM") if is_reset else None
+    if rss_peak is None:
+        rss_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return Measurement(
+        wall_time=wall_time,
+        peak_rss=max(rss_peak - rss_start, 0) * 1024,
+        result=result)
+
+def _measure_child(conn, f: Callable[..., Any], args, kwargs):
+    conn.send(measure(f, *args, **kwargs))
+    conn.close()
+
+def measure_isolated(f: Callable[..., Any], *args, **kwargs) -> Measurement:
+    """Measures `f` in a forked child process.
+    Memory allocated by earlier measurements thus does not mask the peak of `f`.
+    The result of `f` must be picklable.
+
+    Args:
+        f (Callable[..., Any]): Function to measure, called with `args` and `kwargs`.
+
+    Returns:
+        Measurement: Wall time, peak RSS increase and the result of `f`.
+    """
+    ctx = mp.get_context("fork")
+    conn_recv, conn_send = ctx.Pipe(duplex=False)
+    process = ctx.Process(target=_measure_child, args=(conn_send, f, args, kwargs))
+    process.start()
+    measurement = conn_recv.recv()
+    process.join()
+    return measurement
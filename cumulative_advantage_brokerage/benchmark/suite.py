@@ -0,0 +1,121 @@
+"""Benchmark results of pipeline stages and their comparison against a baseline.
+"""
+import json
+import platform
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, NamedTuple
+
+from .measure import measure_isolated
+
+METRICS_REGRESSION = ("wall_time", "peak_rss")
+
+class StageResult(NamedTuple):
+    stage: str
+    scale: int # Number of authorships of the synthetic dataset
+    wall_time: float # Seconds
+    peak_rss: int # Increase of the peak resident set size in bytes
+    n_rows: int # Rows processed (stage-specific, e.g., authorships or motifs)
+
+    @property
+    def rows_per_s(self) -> float:
+        return self.n_rows / max(self.wall_time, 1e-9)
+
+    @property
+    def key(self) -> Tuple[str, int]:
+        return self.stage, self.scale
+
+class Regression(NamedTuple):
+    stage: str
+    scale: int
+    metric: str # One of `METRICS_REGRESSION`
+    value_baseline: float
+    value: float
+
+    @property
+    def ratio(self) -> float:
+        return self.value / max(self.value_baseline, 1e-9)
+
+def run_stage(stage: str, scale: int, f: Callable[..., int], *args, **kwargs) -> StageResult:
+    """Measures a stage in a forked child process (see `measure_isolated`).
+
+    Args:
+        stage (str): Name of the stage.
+        scale (int): Scale of the input data.
+        f (Callable[..., int]): Runs the stage and returns the number of processed rows.
+
+    Returns:
+        StageResult: Wall time, peak RSS increase and rows of the stage.
+    """
+    m = measure_isolated(f, *args, **kwargs)
+    return StageResult(
+        stage=stage, scale=scale,
+        wall_time=m.wall_time, peak_rss=m.peak_rss, n_rows=int(m.result))
+
+def save_results(path: str, l_results: List[StageResult], d_meta: Optional[Dict[str, Any]] = None):
+    """Writes results and metadata of the run (host, Python version, time) to a JSON file.
+    """
+    d_out = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "host": platform.node(),
+            "python": platform.python_version(),
+            **(d_meta or {})},
+        "results": [{**result._asdict(), "rows_per_s": result.rows_per_s}\
+            for result in l_results]}
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(d_out, file, indent=2)
+
+def load_results(path: str) -> List[StageResult]:
+    """Reads results written by `save_results`.
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        d_in = json.load(file)
+    return [StageResult(**{field: d_result[field] for field in StageResult._fields})\
+        for d_result in d_in["results"]]
+
+def find_regressions(
+        l_results: List[StageResult],
+        l_baseline: List[StageResult],
+        tolerance: float = .2,
+        min_wall_time: float = 1.,
+        min_peak_rss: int = 2**26) -> List[Regression]:
+    """Compares results to a baseline by stage and scale.
+    A metric regresses if it exceeds its baseline value by more than `tolerance` (relative).
+    Stages faster than `min_wall_time` seconds or with peaks below `min_peak_rss` bytes
+    in both runs are ignored for the respective metric, as their measurements are mostly noise.
+
+    Returns:
+        List[Regression]: Regressed metrics of stages contained in both runs.
+    """
+    d_baseline = {result.key: result for result in l_baseline}
+    d_min = {"wall_time": min_wall_time, "peak_rss": min_peak_rss}
+    l_regressions = []
+    for result in l_results:
+        if result.key not in d_baseline:
+            continue
+        result_baseline = d_baseline[result.key]
+        for metric in METRICS_REGRESSION:
+            value, value_baseline = getattr(result, metric), getattr(result_baseline, metric)
+            if max(value, value_baseline) < d_min[metric]:
+                continue
+            if value > (1 + tolerance) * value_baseline:
+                l_regressions.append(Regression(
+                    stage=result.stage, scale=result.scale, metric=metric,
+                    value_baseline=value_baseline, value=value))
+    return l_regressions
+
+def format_results(l_results: List[StageResult], l_baseline: Optional[List[StageResult]] = None) -> str:
+    """Table of all results with the speedup over the baseline (if given).
+    """
+    d_baseline = {} if l_baseline is None else {result.key: result for result in l_baseline}
+    l_lines = [(f"{'stage':<36} {'scale':>10} {'time [s]':>10} {'peak RSS [MiB]':>15} "
+                f"{'rows':>12} {'rows/s':>12} {'speedup':>8}")]
+    for result in l_results:
+        speedup = ""
+        if result.key in d_baseline:
+            speedup = f"{d_baseline[result.key].wall_time / max(result.wall_time, 1e-9):.2f}x"
+        l_lines.append((
+            f"{result.stage:<36} {result.scale:>10} {result.wall_time:>10.2f} "
+            f"{result.peak_rss / 2**20:>15.1f} {result.n_rows:>12} "
+            f"{result.rows_per_s:>12.0f} {speedup:>8}"))
+    return "\n".join(l_lines)
@@ -1,5 +1,6 @@
 from .collaborator_filter import CollaboratorFilter, StandardFilter
 from .collaborator_series_brokerage import CollaboratorSeriesBrokerageInference
+from .collaborator_series_brokerage_array import ArrayCollaboratorSeriesBrokerageInference
 from .impact_groups_inference import ImpactGroupsInference
 from .binner import\
     PercentileBinner, CareerLengthBinner, CitationsBinner, ProductivityBinner
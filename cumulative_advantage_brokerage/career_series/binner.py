@@ -5,12 +5,12 @@ from typing import List, Optional
 
 import numpy as np
 from sqlalchemy import\
-    select, func, distinct,\
+    select, func,\
     alias, and_, case, Column
 
 from ..dbm import\
     HasSession, BinsRealization, CumAdvBrokSession,\
-    Project, Collaboration, Citation
+    Project, Collaboration, Citation, CollaboratorLifecycle
 from ..constants import CS_BINS_PERCENTILES
 from .collaborator_filter import CollaboratorFilter, StandardFilter
 
@@ -47,6 +47,41 @@ class PercentileBinner(HasSession):
         self.collaborator_filter = collaborator_filter
         self.id_metric_configuration = id_metric_configuration
         self.percentiles = percentiles
+        self.collaborator_filter.prepare(self.session)
+
+    @classmethod
+    def from_database(
+            cls,
+            session: CumAdvBrokSession,
+            id_metric_configuration: int,
+            **kwargs) -> "PercentileBinner":
+        """Creates a binner with the binning borders stored for a configuration
+        (see `compute_binning_borders`) instead of computing them again.
+
+        Parameters
+        ----------
+        session : CumAdvBrokSession
+            Session object to communicate with the database.
+        id_metric_configuration : int
+            ID of the `MetricConfiguration`-object the borders were stored under.
+        **kwargs
+            Further arguments of the binner (e.g., `percentiles` or `collaborator_filter`).
+
+        Returns
+        -------
+        PercentileBinner
+            The binner with `a_bin_realizations` and `a_bin_values` set.
+        """
+        binner = cls(
+            session=session,
+            id_metric_configuration=id_metric_configuration,
+            **kwargs)
+        binner.a_bin_realizations = list(session.execute(
+            select(BinsRealization)\
+                .where(BinsRealization.id_metric_configuration == id_metric_configuration)\
+                .order_by(BinsRealization.position)).scalars())
+        binner.a_bin_values = np.asarray([b.value for b in binner.a_bin_realizations])
+        return binner
 
     @abstractmethod
     def create_query_max_value(self) -> select:
@@ -117,6 +152,25 @@ class PercentileBinner(HasSession):
             ],
             else_=len(self.a_bin_values) - 1).label("bin")
 
+    def bin_values(self, a_values: np.ndarray) -> np.ndarray:
+        """Assigns bins to metric values in memory, equivalent to `bin_metric`.
+        As in its `else`-clause, values below the first border are assigned to the last bin.
+
+        Parameters
+        ----------
+        a_values : np.ndarray
+            The metric values to be binned.
+
+        Returns
+        -------
+        np.ndarray
+            The bin position of each value.
+        """
+        assert self.a_bin_values is not None, "Binning borders not computed."
+        a_bins = np.searchsorted(self.a_bin_values, a_values, side="right") - 1
+        a_bins[a_bins < 0] = len(self.a_bin_values) - 1
+        return a_bins
+
 class CareerLengthBinner(PercentileBinner):
     """Binner for career length.
     """
@@ -134,17 +188,10 @@ class CareerLengthBinner(PercentileBinner):
             .create_collaborator_source_subquery()
         return select(
             sq_collaborators.c.id_collaborator,
-            (func.extract(
-                "days",
-                func.max(Project.timestamp) - func.min(Project.timestamp)) / 365)\
-                    .label("metric"))\
+            CollaboratorLifecycle.career_length.label("metric"))\
         .select_from(sq_collaborators)\
-        .join(Collaboration,
-              Collaboration.id_collaborator == sq_collaborators.c.id_collaborator,
-              isouter=True)\
-        .join(Project,
-              Project.id == Collaboration.id_project)\
-        .group_by(sq_collaborators.c.id_collaborator)
+        .join(CollaboratorLifecycle,
+              CollaboratorLifecycle.id_collaborator == sq_collaborators.c.id_collaborator)
 
 class CitationsBinner(PercentileBinner):
     def create_query_max_value(self) -> select:
@@ -205,12 +252,10 @@ class CitationsBinner(PercentileBinner):
     def _create_collaborator_death_query(sq_collaborators: select) -> select:
         return select(
             sq_collaborators.c.id_collaborator,
-            func.max(Project.timestamp).label("death"))\
+            CollaboratorLifecycle.death)\
             .select_from(sq_collaborators)\
-            .join(Collaboration,
-                  Collaboration.id_collaborator == sq_collaborators.c.id_collaborator)\
-            .join(Project, Project.id == Collaboration.id_project)\
-            .group_by(sq_collaborators.c.id_collaborator)\
+            .join(CollaboratorLifecycle,
+                  CollaboratorLifecycle.id_collaborator == sq_collaborators.c.id_collaborator)\
             .subquery()
 
 class ProductivityBinner(PercentileBinner):
@@ -227,9 +272,7 @@ class ProductivityBinner(PercentileBinner):
             .create_collaborator_source_subquery()
         return select(
                 sq_collaborators.c.id_collaborator,
-                (func.count(distinct(Collaboration.id_project))).label("metric"))\
+                CollaboratorLifecycle.n_projects.label("metric"))\
             .select_from(sq_collaborators)\
-            .join(Collaboration,
-                Collaboration.id_collaborator == sq_collaborators.c.id_collaborator,
-                isouter=True)\
-            .group_by(sq_collaborators.c.id_collaborator)
+            .join(CollaboratorLifecycle,
+                CollaboratorLifecycle.id_collaborator == sq_collaborators.c.id_collaborator)
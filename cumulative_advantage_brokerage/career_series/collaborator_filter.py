@@ -1,49 +1,130 @@
-from sqlalchemy import select, Column, func, case, or_, and_, alias, distinct
+import hashlib
 
-from ..dbm.models.collaboration import Collaboration
-from ..dbm.models.project import Project
-from ..constants import\
-    CAREER_LENGTH_MAX, DATE_OBSERVATION_END, DURATION_BUFFER_AUTHOR_ACTIVE
+from sqlalchemy import select, func, delete, insert, literal
+from sqlalchemy.dialects import postgresql
+
+from ..dbm.session import CumAdvBrokSession
+from ..dbm.models.collaborator_lifecycle import CollaboratorLifecycle
+from ..dbm.models.collaborator_filter_set import CollaboratorFilterSet
 
 class CollaboratorFilter:
     """Defines filters on the set of collaborators.
+    Conditions are specified on the precomputed `CollaboratorLifecycle` (see `refresh_collaborator_lifecycle`).
+
+    With `materialized=True`, the filtered set is stored once in `CollaboratorFilterSet` under the hash of the conditions (`key`)
+    and queries select from this stored set instead of evaluating the conditions.
+    Stored sets are reused by all binners and series inferences using the filter, also across script runs,
+    until the lifecycle is refreshed.
+    Custom filters implement `_specify_conditions` (e.g., with a sub-select on genders)
+    and should be materialized if their conditions are costly.
     """
+    materialized: bool
+
+    _is_prepared: bool
+
+    def __init__(self, materialized: bool = False) -> None:
+        """Defines filters on the set of collaborators.
+
+        Parameters
+        ----------
+        materialized : bool, optional
+            Whether to store the filtered set in the database and select from it (see `materialize`), by default False
+        """
+        self.materialized = materialized
+        self._is_prepared = False
+
+    @property
+    def key(self) -> str:
+        """Hash identifying the filtered set by the (compiled) filter query and its parameters.
+        """
+        compiled = self._create_filter_query().compile(dialect=postgresql.dialect())
+        str_query = f"{compiled}\n{sorted((k, repr(v)) for k, v in compiled.params.items())}"
+        return hashlib.sha256(str_query.encode("utf-8")).hexdigest()
+
     def create_collaborator_source_subquery(self, return_sq: bool = True)\
             -> select:
         """Queries the set of collaborators to be considered for the analysis, filtered by the conditions specified in the subclass.
+        If `materialized`, the set is selected from `CollaboratorFilterSet` and has to be stored beforehand (see `prepare`).
 
         Returns
         -------
         select
             A subquery selecting filtered collaborator IDs.
         """
-        q = select(Collaboration.id_collaborator)\
-            .select_from(Collaboration)\
-            .join(Project, Collaboration.id_project == Project.id)\
-            .group_by(Collaboration.id_collaborator)\
-            .having(self._specify_conditions())
+        q = select(CollaboratorFilterSet.id_collaborator)\
+                .where(CollaboratorFilterSet.filter_key == self.key)\
+            if self.materialized else self._create_filter_query()
         return q.subquery() if return_sq else q
 
-    @staticmethod
-    def _specify_conditions():
+    def prepare(self, session: CumAdvBrokSession) -> None:
+        """Stores the filtered set once per filter object if `materialized` (see `materialize`).
+
+        Parameters
+        ----------
+        session : CumAdvBrokSession
+            Session of the database to store the set in.
+        """
+        if self.materialized and not self._is_prepared:
+            self.materialize(session)
+            self._is_prepared = True
+
+    def materialize(self, session: CumAdvBrokSession, refresh: bool = False) -> int:
+        """Stores the filtered set under `key` unless it is already stored.
+
+        Parameters
+        ----------
+        session : CumAdvBrokSession
+            Session of the database to store the set in.
+        refresh : bool, optional
+            Recompute a stored set, by default False
+
+        Returns
+        -------
+        int
+            Number of collaborators in the set.
+        """
+        key = self.key
+        n_collaborators = session.execute(
+            select(func.count(CollaboratorFilterSet.id_collaborator))\
+                .where(CollaboratorFilterSet.filter_key == key)).scalar()
+        if n_collaborators > 0 and not refresh:
+            print(f"Reusing set of {n_collaborators} collaborators of `{type(self).__name__}' ({key[:8]}).")
+            return n_collaborators
+
+        sq_filter = self._create_filter_query().subquery()
+        session.execute(
+            delete(CollaboratorFilterSet)\
+                .where(CollaboratorFilterSet.filter_key == key))
+        result = session.execute(
+            insert(CollaboratorFilterSet)\
+                .from_select(
+                    ["filter_key", "id_collaborator"],
+                    select(literal(key), sq_filter.c.id_collaborator)))
+        session.commit()
+        print(f"Stored set of {result.rowcount} collaborators of `{type(self).__name__}' ({key[:8]}).")
+        return result.rowcount
+
+    def _create_filter_query(self) -> select:
+        return select(CollaboratorLifecycle.id_collaborator)\
+            .where(self._specify_conditions())
+
+    def _specify_conditions(self):
         raise NotImplementedError
 
 class StandardFilter(CollaboratorFilter):
-    @staticmethod
-    def _specify_conditions():
+    def _specify_conditions(self):
         """Filter as described in the publication.
         Removes authors with
         - career length more than 40 years
         - less than two publications (or two publications at the same date)
         - authors who are considered active because their last publication is within fours years of the end of the observation period
 
+        The conditions are evaluated once per collaborator when refreshing the lifecycle table
+        (see `standard_filter_conditions`) and stored as indexed flag.
+
         Returns
         -------
-        `and_`-clause
+        Column
             A clause specifying the conditions to filter collaborators.
         """
-        return and_(
-                func.max(Project.timestamp) != func.min(Project.timestamp),
-                (func.max(Project.timestamp) - func.min(Project.timestamp)) <= CAREER_LENGTH_MAX,
-                func.max(Project.timestamp) <= (DATE_OBSERVATION_END - DURATION_BUFFER_AUTHOR_ACTIVE)
-            )
+        return CollaboratorLifecycle.in_standard_filter.is_(True)
@@ -1,6 +1,5 @@
-from collections import defaultdict
-from typing import List, Iterator, Dict, NamedTuple, Set, Union
-from sqlalchemy import select, Column, func, or_, alias
+from typing import List, Iterator, Dict, NamedTuple, Union
+from sqlalchemy import select, Column, func, or_
 
 import numpy as np
 
@@ -10,16 +9,26 @@ from ..constants import\
     CAREER_LENGTH_MAX, DURATION_BUFFER_AUTHOR_ACTIVE,\
     DATE_OBSERVATION_END
 from ..dbm import\
-    CollaboratorSeriesBrokerage, HasSession,\
-    Collaboration, Project,\
+    CollaboratorSeriesBrokerage, CollaboratorStageMax, HasSession,\
+    Project, CollaboratorLifecycle,\
     TriadicClosureMotif, SimplicialTriadicClosureMotif
 
+# Motif types and roles of the series
+MOTIF_TYPES = (
+    TriadicClosureMotif._motif_type,
+    SimplicialTriadicClosureMotif._motif_type)
+ROLES = ("a", "b", "c")
+
 class _YieldBinSeries(NamedTuple):
     id_collaborator: int
     l_series: List[CollaboratorSeriesBrokerage]
 
 class CollaboratorSeriesBrokerageInference(HasSession):
     """Inference of brokerage series for collaborators.
+
+    Series are sparse: only non-zero counts are stored.
+    Together with the final career stage of each collaborator (see `get_stages_max`),
+    readers reconstruct the zero counts of all other stages, roles and motif types.
     """
     collaborator_filter: CollaboratorFilter
     id_metric_configuration: int
@@ -55,6 +64,8 @@ class CollaboratorSeriesBrokerageInference(HasSession):
             [b.id for b in bins_sorted])
 
         super().__init__(*arg, **kwargs)
+        self.collaborator_filter.prepare(self.session)
+
         # Create a cache of the final career length of all authors
         self._init_map_collaborator_max_group()
 
@@ -70,41 +81,23 @@ class CollaboratorSeriesBrokerageInference(HasSession):
         select
             Sub-query to aggregate the counts of motifs for a given role per career stage.
         """
-        # Filter collaborator set
-        sq_coll_birth = self.collaborator_filter\
-            .create_collaborator_source_subquery()
-
-        sq_coll_motifs = alias(sq_coll_birth)
-
-        # Select starting point of career
-        # Outer-join is used to not filter out brokerage events for which a subset of authors is not in the filtered set.
-        sq_career_start = select(
-                sq_coll_birth.c.id_collaborator.label("id_collaborator_birth"),
-                func.min(Project.timestamp).label("birth"))\
-            .select_from(sq_coll_birth)\
-            .join(Collaboration,
-                  Collaboration.id_collaborator == sq_coll_birth.c.id_collaborator,
-                  isouter=True)\
-            .join(Project, Collaboration.id_project == Project.id)\
-            .group_by(sq_coll_birth.c.id_collaborator)\
+        # Select starting point of career of the filtered collaborator set
+        sq_career_start = self._create_career_start_query()\
             .subquery()
 
         # Assign career stage by binning the duration between the birth and the brokerage project timestamp `t_ac`.
         sq_motifs = select(
                 TriadicClosureMotif.id.label("id_motif"),
-                sq_coll_motifs.c.id_collaborator.label("id_collaborator"),
+                sq_career_start.c.id_collaborator_birth.label("id_collaborator"),
                 TriadicClosureMotif.motif_type.label("motif_type"),
                 self.binner.bin_metric((func.extract(
                     "days",
                     Project.timestamp - sq_career_start.c.birth) / 365)))\
-            .select_from(sq_coll_motifs)\
+            .select_from(sq_career_start)\
             .join(TriadicClosureMotif,
-                  col_role == sq_coll_motifs.c.id_collaborator,
-                  isouter=True)\
+                  col_role == sq_career_start.c.id_collaborator_birth)\
             .join(Project,
                   Project.id == TriadicClosureMotif.id_project_ac)\
-            .join(sq_career_start,
-                  sq_career_start.c.id_collaborator_birth == col_role)\
             .where(or_(
                 TriadicClosureMotif.motif_type == TriadicClosureMotif._motif_type,
                 TriadicClosureMotif.motif_type == SimplicialTriadicClosureMotif._motif_type
@@ -113,6 +106,24 @@ class CollaboratorSeriesBrokerageInference(HasSession):
 
         return sq_motifs
 
+    def _create_career_start_query(self) -> select:
+        """Query the first publication date (`birth`) of all collaborators in the filtered set.
+
+        Returns
+        -------
+        select
+            Query of the collaborator ID (`id_collaborator_birth`) and their `birth`.
+        """
+        sq_coll_birth = self.collaborator_filter\
+            .create_collaborator_source_subquery()
+
+        return select(
+                sq_coll_birth.c.id_collaborator.label("id_collaborator_birth"),
+                CollaboratorLifecycle.birth)\
+            .select_from(sq_coll_birth)\
+            .join(CollaboratorLifecycle,
+                  CollaboratorLifecycle.id_collaborator == sq_coll_birth.c.id_collaborator)
+
     def _init_map_collaborator_max_group(self):
         sq_vals = self.binner\
             .create_query_max_value()\
@@ -125,6 +136,21 @@ class CollaboratorSeriesBrokerageInference(HasSession):
         self._map_collaborator_max_group = dict(
             (id_c, c_bin) for (id_c, c_bin) in self.session.execute(q_vals))
 
+    def get_stages_max(self) -> List[CollaboratorStageMax]:
+        """Final career stage of all collaborators of the filtered set.
+        The stages define up to which stage the sparse series have (implicit) zero counts.
+
+        Returns
+        -------
+        List[CollaboratorStageMax]
+            List of all collaborators with their final career stage.
+        """
+        return [CollaboratorStageMax(
+                    stage_max=int(stage_max),
+                    id_collaborator=int(id_collaborator),
+                    id_metric_configuration=int(self.id_metric_configuration) if self.id_metric_configuration is not None else None)\
+                for id_collaborator, stage_max in self._map_collaborator_max_group.items()]
+
     def _init_yield(self,
                     id_collaborator:int,
                     role: str,
@@ -139,7 +165,7 @@ class CollaboratorSeriesBrokerageInference(HasSession):
                     id_bin=int(self._map_bin_pos_id[bin_pos]),
                     id_metric_configuration=int(self.id_metric_configuration) if self.id_metric_configuration is not None else None,
                     value=int(cnt))\
-                        for bin_pos, cnt in enumerate(a_counts)
+                        for bin_pos, cnt in enumerate(a_counts) if cnt != 0
                 ])
 
     def _aggregate_role_query(self, col_role: Column) -> select:
@@ -161,49 +187,33 @@ class CollaboratorSeriesBrokerageInference(HasSession):
     def generate_series(self) -> Iterator[_YieldBinSeries]:
         """Generates the brokerage frequency career stage series.
         This function iterates over all roles and collaborator IDs to aggregate the counts of motifs for a given role per career stage.
-        It considers zero counts for a role-motif combination if no counts were found in the database.
-        This way, each collaborator will always contribute `3x2xn_stages` values, where `n_stages` is the number of stages in which the collaborator published.
+        Only non-zero counts up to the final career stage of a collaborator are yielded.
+        Zero counts of the `3x2xn_stages` values of each collaborator, where `n_stages` is the number of stages in which the collaborator published,
+        are implicit (see `get_stages_max`).
 
         Yields
         ------
         Iterator[_YieldBinSeries]
             Yields a tuple of the collaborator ID and a list of `CollaboratorSeriesBrokerage` objects.
         """
-        id_collaborator, id_collaborator_curr = -1, -1
-        motif_type, motif_type_curr = None, None
-        _d_cache_collaborators: Dict[str, Set[int]] = defaultdict(set)
-
         for role, col_role in zip(
-                "abc",
+                ROLES,
                 (TriadicClosureMotif.id_collaborator_a,
                  TriadicClosureMotif.id_collaborator_b,
                  TriadicClosureMotif.id_collaborator_c)):
             print(f"Binning on role `{role}'.")
+            id_collaborator_curr, motif_type_curr = -1, None
             for id_collaborator, motif_type, bin_pos, count in\
                     self.session.execute(self._aggregate_role_query(col_role)):
-                if id_collaborator_curr == -1:
-                    # Initial configuration
-                    id_collaborator_curr = id_collaborator
-                    motif_type_curr = motif_type
-
-                    # Init counts array which counts the brokerage events per stage
-                    a_counts = np.zeros(
-                        self._map_collaborator_max_group[id_collaborator] + 1,
-                        dtype=int)
-
                 if (id_collaborator != id_collaborator_curr) or (motif_type != motif_type_curr):
-                    # Change of motif type or role: yield result
-                    yield self._init_yield(id_collaborator_curr, role, motif_type_curr, a_counts)
-
-                    # Remember collaborator
-                    _d_cache_collaborators[motif_type_curr].add(id_collaborator_curr)
+                    # Change of collaborator or motif type: yield result
+                    if id_collaborator_curr != -1:
+                        yield self._init_yield(id_collaborator_curr, role, motif_type_curr, a_counts)
 
-                    # Reset counts array
+                    # Init counts array which counts the brokerage events per stage
                     a_counts = np.zeros(
                         self._map_collaborator_max_group[id_collaborator] + 1,
                         dtype=int)
-
-                    # Reset current collaborator info
                     id_collaborator_curr = id_collaborator
                     motif_type_curr = motif_type
 
@@ -212,25 +222,5 @@ class CollaboratorSeriesBrokerageInference(HasSession):
                     a_counts[bin_pos] = count
 
             # Yield last collaborator
-            yield self._init_yield(id_collaborator, role, motif_type, a_counts)
-            _d_cache_collaborators[motif_type].add(id_collaborator)
-
-            # Add zero counts for other motif_types
-            id_collaborator_curr = -1
-            motif_type_curr = None
-            a_counts = np.zeros(
-                self._map_collaborator_max_group[id_collaborator] + 1,
-                dtype=int)
-
-            print("Adding zero counts for other combinations of motif_type and role")
-            for motif_type, _s_cache_collaborators in _d_cache_collaborators.items():
-                _s_zero_count_collaborators = set(self._map_collaborator_max_group.keys())\
-                    .difference(_s_cache_collaborators)
-                print((f"\t Adding for `{motif_type}': {len(_s_zero_count_collaborators)}"
-                       " authors with zero counts."))
-                for id_collaborator in _s_zero_count_collaborators:
-                    a_counts = np.zeros(
-                        self._map_collaborator_max_group[id_collaborator] + 1,
-                        dtype=int)
-                    yield self._init_yield(id_collaborator, role, motif_type, a_counts)
-                _d_cache_collaborators[motif_type] = set()
+            if id_collaborator_curr != -1:
+                yield self._init_yield(id_collaborator_curr, role, motif_type_curr, a_counts)
@@ -0,0 +1,133 @@
+from typing import Iterator, Tuple
+
+import numpy as np
+from sqlalchemy import select
+
+from .collaborator_series_brokerage import\
+    CollaboratorSeriesBrokerageInference, _YieldBinSeries, MOTIF_TYPES, ROLES
+from ..dbm import Project, BaseTriadicClosureMotif
+
+class ArrayCollaboratorSeriesBrokerageInference(CollaboratorSeriesBrokerageInference):
+    """Inference of brokerage series for collaborators in memory.
+
+    Instead of aggregating each role in the database, the motifs and the birth of all filtered collaborators are read once as arrays.
+    Career stages are assigned by `PercentileBinner.bin_values` and counted per role, motif type, collaborator and stage by `np.bincount`.
+    The (sparse) series are the same as those of `CollaboratorSeriesBrokerageInference`.
+    """
+    chunk_size: int
+
+    _a_collaborators: np.ndarray
+    _a_birth: np.ndarray
+    _a_max_group: np.ndarray
+
+    def __init__(self, *arg, chunk_size: int = 1000000, **kwargs) -> None:
+        """Inference of brokerage series for collaborators in memory.
+
+        Parameters
+        ----------
+        chunk_size : int, optional
+            Number of motifs fetched and counted at once, by default 1000000
+        """
+        self.chunk_size = chunk_size
+        super().__init__(*arg, **kwargs)
+
+    def _init_collaborators(self):
+        # Collaborators with a final career stage
+        self._a_collaborators = np.fromiter(
+            sorted(self._map_collaborator_max_group.keys()), dtype=np.int64)
+        self._a_max_group = np.fromiter(
+            (self._map_collaborator_max_group[id_c] for id_c in self._a_collaborators.tolist()),
+            dtype=np.int64, count=len(self._a_collaborators))
+
+        # Motifs are counted for collaborators with a birth in the filtered set (`-1` otherwise)
+        self._a_birth = np.full(len(self._a_collaborators), -1, dtype=np.int64)
+        rows = self.session.execute(self._create_career_start_query()).all()
+        a_ids = np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows))
+        a_birth = np.fromiter((r[1].toordinal() for r in rows), dtype=np.int64, count=len(rows))
+        a_idx, a_found = self._lookup(a_ids)
+        self._a_birth[a_idx[a_found]] = a_birth[a_found]
+
+    def _lookup(self, a_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions of collaborator IDs in `_a_collaborators` and whether they were found.
+        """
+        a_idx = np.searchsorted(self._a_collaborators, a_ids)
+        a_idx[a_idx == len(self._a_collaborators)] = 0
+        a_found = self._a_collaborators[a_idx] == a_ids if len(self._a_collaborators) > 0\
+            else np.zeros(len(a_ids), dtype=bool)
+        return a_idx, a_found
+
+    def _iter_motifs(self, motif_type: str) -> Iterator[Tuple[np.ndarray, ...]]:
+        """Yields chunks of the collaborators (a, b, c) and the closing date of motifs of a type.
+        """
+        q_motifs = select(
+                BaseTriadicClosureMotif.id_collaborator_a,
+                BaseTriadicClosureMotif.id_collaborator_b,
+                BaseTriadicClosureMotif.id_collaborator_c,
+                Project.timestamp)\
+            .select_from(BaseTriadicClosureMotif)\
+            .join(Project,
+                  Project.id == BaseTriadicClosureMotif.id_project_ac)\
+            .where(BaseTriadicClosureMotif.motif_type == motif_type)
+
+        with self.session.get_bind().connect() as conn:
+            result = conn\
+                .execution_options(
+                    stream_results=True,
+                    max_row_buffer=self.chunk_size)\
+                .execute(q_motifs)
+            for rows in result.partitions(self.chunk_size):
+                n = len(rows)
+                yield tuple(np.fromiter((r[i] for r in rows), dtype=np.int64, count=n)\
+                    for i in range(3))\
+                    + (np.fromiter((r[3].toordinal() for r in rows), dtype=np.int64, count=n),)
+
+    def _count_motifs(self) -> np.ndarray:
+        """Counts motifs per role, motif type, collaborator and career stage.
+
+        Returns
+        -------
+        np.ndarray
+            Counts of shape `(3, len(MOTIF_TYPES), n_collaborators, n_bins)`.
+        """
+        n_collaborators, n_bins = len(self._a_collaborators), len(self.binner.a_bin_values)
+        a_counts = np.zeros((3, len(MOTIF_TYPES), n_collaborators * n_bins), dtype=np.int64)
+        for i_type, motif_type in enumerate(MOTIF_TYPES):
+            print(f"Counting motifs of type `{motif_type}'.")
+            for *l_roles, a_dates in self._iter_motifs(motif_type):
+                for i_role, a_ids in enumerate(l_roles):
+                    a_idx, a_found = self._lookup(a_ids)
+                    a_idx = a_idx[a_found]
+                    a_birth = self._a_birth[a_idx]
+                    a_has_birth = a_birth >= 0
+                    a_idx = a_idx[a_has_birth]
+
+                    # Career stage by the years between birth and the closing project `t_ac`
+                    a_bins = self.binner.bin_values(
+                        (a_dates[a_found][a_has_birth] - a_birth[a_has_birth]) / 365)
+                    a_counts[i_role, i_type] += np.bincount(
+                        a_idx * n_bins + a_bins, minlength=n_collaborators * n_bins)
+        return a_counts.reshape((3, len(MOTIF_TYPES), n_collaborators, n_bins))
+
+    def generate_series(self) -> Iterator[_YieldBinSeries]:
+        """Generates the brokerage frequency career stage series (see `CollaboratorSeriesBrokerageInference.generate_series`).
+
+        Yields
+        ------
+        Iterator[_YieldBinSeries]
+            Yields a tuple of the collaborator ID and a list of `CollaboratorSeriesBrokerage` objects.
+        """
+        self._init_collaborators()
+        a_counts = self._count_motifs()
+
+        # Drop counts after the final career stage
+        a_in_career = np.arange(a_counts.shape[-1]) <= self._a_max_group[:, None]
+        a_counts *= a_in_career
+
+        for i_role, role in enumerate(ROLES):
+            print(f"Binning on role `{role}'.")
+            for i_type, motif_type in enumerate(MOTIF_TYPES):
+                a_counts_type = a_counts[i_role, i_type]
+                for idx in np.flatnonzero(a_counts_type.any(axis=1)).tolist():
+                    yield self._init_yield(
+                        self._a_collaborators.item(idx), role, motif_type,
+                        a_counts_type[idx, :self._a_max_group.item(idx) + 1])
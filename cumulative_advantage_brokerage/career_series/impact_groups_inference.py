@@ -56,5 +56,5 @@ class ImpactGroupsInference(HasSession):
                 ImpactGroup(value=q_m,
                             id_collaborator=id_collaborator,
                             id_metric_configuration=self.id_metric_configuration))
-        self.session.commit_list(l=l_impact_groups)
+        self.session.write_list(l=l_impact_groups)
         return l_impact_groups
@@ -32,6 +32,17 @@ CN_EVENT_PROJECT_ADD_BEFORE = "CN_EVENT_PROJECT_ADD_BEFORE"
 CN_EVENT_PROJECT_ADD_AFTER = "CN_EVENT_PROJECT_ADD_AFTER"
 CN_EVENT_DATE_ADD_BEFORE = "CN_EVENT_DATE_ADD_BEFORE"
 CN_EVENT_DATE_ADD_AFTER = "CN_EVENT_DATE_ADD_AFTER"
+CN_EVENT_CLIQUE_ADD_BEFORE = "CN_EVENT_CLIQUE_ADD_BEFORE"
+CN_EVENT_CLIQUE_ADD_AFTER = "CN_EVENT_CLIQUE_ADD_AFTER"
+EDGE_HISTORY_ALL = "all"
+EDGE_HISTORY_FIRST = "first"
+EDGE_HISTORY_COUNT_FIRST = "count+first"
+TPL_EDGE_HISTORY = (EDGE_HISTORY_ALL, EDGE_HISTORY_FIRST, EDGE_HISTORY_COUNT_FIRST)
+PROJECT_SIZE_EXPAND = "expand"
+PROJECT_SIZE_SKIP = "skip"
+PROJECT_SIZE_CAP = "cap"
+PROJECT_SIZE_CLIQUE = "clique"
+TPL_PROJECT_SIZE_POLICY = (PROJECT_SIZE_EXPAND, PROJECT_SIZE_SKIP, PROJECT_SIZE_CAP, PROJECT_SIZE_CLIQUE)
 
 # Career series
 STR_CAREER_LENGTH = "career_length"
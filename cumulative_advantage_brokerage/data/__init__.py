@@ -2,3 +2,4 @@ from .transform_to_csv import TransferToCSV
 from .integrate_citation_data import CitationDataIntegrator
 from .infer_gender_data import GenderInference
 from .csv_handling import read_dataframes, write_csv
+from .synthetic_data import SyntheticAPSGenerator
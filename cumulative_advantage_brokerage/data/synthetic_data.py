@@ -0,0 +1,378 @@
+"""Synthetic collaboration histories in the CSV layout of `TransferToCSV`.
+"""
+import json
+import os
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.special import zeta
+
+from .csv_handling import write_csv
+from .data_classes import APSDataFrames
+from ..constants import\
+    ID_GENDER_UNKNOWN, ID_GENDER_FEMALE, ID_GENDER_MALE,\
+    MAP_GENDER_ID, MAP_GENDERNQ_ID
+
+AUTHORSHIPS_PER_AUTHOR = 6. # Average number of publications per author, roughly as in APS
+JOURNALS = (
+    ("PR", "Phys. Rev.", "Physical Review"),
+    ("PRL", "Phys. Rev. Lett.", "Physical Review Letters"),
+    ("PRA", "Phys. Rev. A", "Physical Review A"),
+    ("PRB", "Phys. Rev. B", "Physical Review B"),
+    ("PRC", "Phys. Rev. C", "Physical Review C"),
+    ("PRD", "Phys. Rev. D", "Physical Review D"),
+    ("PRE", "Phys. Rev. E", "Physical Review E"),
+)
+FIRST_NAMES = {
+    ID_GENDER_UNKNOWN: ("J.", "A.", "M.", "K.", "S.", "Y.", "L.", "H."),
+    ID_GENDER_FEMALE: ("Maria", "Anna", "Emily", "Sofia", "Laura", "Julia", "Elena", "Clara"),
+    ID_GENDER_MALE: ("John", "Peter", "David", "Michael", "Thomas", "Paul", "Robert", "Lucas"),
+}
+LAST_NAMES = (
+    "Smith", "Müller", "Wang", "Li", "Kim", "Rossi", "Dubois", "Novak",
+    "Tanaka", "Silva", "Cohen", "Ivanov", "Garcia", "Nielsen", "Kowalski", "Brown")
+
+class SyntheticAPSGenerator:
+    """Generates a reproducible (seeded) collaboration history resembling the APS dataset.
+
+    - Authors enter the community in a year drawn from its exponential growth
+        and stay for a geometric number of years (`career_length_mean`).
+    - Publications are distributed over the years proportionally to the active authors.
+        Team sizes follow a Zipf distribution (`team_size_exponent`), capped at `max_team_size`.
+    - Each team is formed around an active author, chosen by a Pareto-distributed productivity,
+        and filled with active authors close to it on a fixed ordering of all authors
+        (with a mean gap of `team_spread`), such that collaborations recur and triangles close.
+    - Each publication cites a Poisson number of earlier publications (`n_references_mean`),
+        chosen by a log-normal fitness which decays with the age of the publication.
+    - Genders are drawn by `gender_shares` (unknown, female, male).
+        A share of authors is not disambiguated and a share has a second name variant.
+
+    Use `from_n_authorships` to obtain a generator for a given dataset size.
+    """
+    n_authors: int
+    n_publications: int
+    year_start: int
+    year_end: int
+    seed: int
+    growth_rate: float
+    career_length_mean: float
+    team_size_exponent: float
+    max_team_size: int
+    team_spread: float
+    n_references_mean: float
+    citation_decay: float
+    gender_shares: Tuple[float, float, float]
+    share_not_disambiguated: float
+    share_name_variants: float
+
+    _rng: np.random.Generator
+
+    def __init__(
+            self,
+            n_authors: int = 10000,
+            n_publications: int = 20000,
+            year_start: int = 1893,
+            year_end: int = 2020,
+            seed: int = 42,
+            growth_rate: float = 0.04,
+            career_length_mean: float = 8.,
+            team_size_exponent: float = 2.2,
+            max_team_size: int = 500,
+            team_spread: float = 2.,
+            n_references_mean: float = 10.,
+            citation_decay: float = 10.,
+            gender_shares: Tuple[float, float, float] = (.3, .15, .55),
+            share_not_disambiguated: float = .05,
+            share_name_variants: float = .1) -> None:
+        self.n_authors = n_authors
+        self.n_publications = n_publications
+        self.year_start = year_start
+        self.year_end = year_end
+        self.seed = seed
+        self.growth_rate = growth_rate
+        self.career_length_mean = career_length_mean
+        self.team_size_exponent = team_size_exponent
+        self.max_team_size = max_team_size
+        self.team_spread = team_spread
+        self.n_references_mean = n_references_mean
+        self.citation_decay = citation_decay
+        self.gender_shares = gender_shares
+        self.share_not_disambiguated = share_not_disambiguated
+        self.share_name_variants = share_name_variants
+
+    @classmethod
+    def from_n_authorships(cls, n_authorships: int, **kwargs) -> "SyntheticAPSGenerator":
+        """Generator of about `n_authorships` authorships.
+        The numbers of publications and authors follow from the expected team size
+        and `AUTHORSHIPS_PER_AUTHOR`.
+        """
+        generator = cls(**kwargs)
+        generator.n_publications = max(1, round(n_authorships / generator.expected_team_size()))
+        generator.n_authors = max(1, round(n_authorships / AUTHORSHIPS_PER_AUTHOR))
+        return generator
+
+    def expected_team_size(self) -> float:
+        """Expected team size of the capped Zipf distribution.
+        """
+        a_k = np.arange(1, self.max_team_size, dtype=np.float64)
+        a_p = a_k ** -self.team_size_exponent / zeta(self.team_size_exponent)
+        return float((a_k * a_p).sum() + self.max_team_size * (1 - a_p.sum()))
+
+    def generate(self) -> APSDataFrames:
+        """Generates all tables.
+
+        Returns:
+            APSDataFrames: Tables in the layout of the CSV files after gender inference.
+        """
+        self._rng = np.random.default_rng(self.seed)
+        a_years = np.arange(self.year_start, self.year_end + 1)
+
+        print(f"Generating {self.n_authors} authors.")
+        a_career_start, a_career_end, a_gender = self._generate_authors(a_years)
+        print(f"Generating {self.n_publications} publications.")
+        a_pub_year, a_timestamp = self._generate_publications(a_years, a_career_start, a_career_end)
+        print("Generating authorships.")
+        a_auth_pub, a_auth_author = self._generate_authorships(
+            a_years, a_pub_year, a_career_start, a_career_end)
+        print("Generating citations.")
+        a_citing, a_cited = self._generate_citations(a_years, a_pub_year)
+
+        df_authors = pd.DataFrame({
+            "id_author": np.arange(self.n_authors),
+            "id_gender": a_gender,
+            "disambiguated": self._rng.random(self.n_authors) >= self.share_not_disambiguated,
+            "id_gender_nq": a_gender})
+        df_authors.loc[~df_authors["disambiguated"], "id_gender"] = ID_GENDER_UNKNOWN
+        df_author_names, a_auth_name = self._generate_author_names(a_gender, a_auth_author)
+        df_journals, a_pub_journal = self._generate_journals(a_pub_year, a_timestamp)
+        print((f"Generated {len(a_auth_pub)} authorships of {self.n_authors} authors "
+               f"on {self.n_publications} publications with {len(a_citing)} citations."))
+
+        return APSDataFrames(
+            genders=pd.DataFrame(data=MAP_GENDER_ID.items(), columns=["gender", "id_gender"])\
+                .set_index("id_gender"),
+            authors=df_authors.set_index("id_author"),
+            author_names=df_author_names.set_index("id_author_name"),
+            publications=pd.DataFrame({
+                "id_publication": np.arange(self.n_publications),
+                "id_journal": a_pub_journal,
+                "timestamp": a_timestamp,
+                "doi": [f"10.1103/Synthetic.{i}" for i in range(self.n_publications)]})\
+                    .set_index("id_publication"),
+            authorships=pd.DataFrame({
+                "id_authorship": np.arange(len(a_auth_pub)),
+                "id_publication": a_auth_pub,
+                "id_author_name": a_auth_name}).set_index("id_authorship"),
+            journals=df_journals.set_index("id_journal"),
+            citations=pd.DataFrame({
+                "id_publication_citing": a_citing,
+                "id_publication_cited": a_cited}))
+
+    def write(self, folder_csv: str) -> APSDataFrames:
+        """Generates all tables and writes them as CSV files to `folder_csv`
+        (see `APSIntegrator` to populate the database from them).
+        """
+        dfs = self.generate()
+        write_csv(folder_out=folder_csv, df_aps=dfs)
+        return dfs
+
+    def write_metadata(self, folder_metadata: str, file_disambiguation: str) -> APSDataFrames:
+        """Generates all tables and writes them as the raw input of `TransferToCSV`:
+        one JSON file per publication in `<folder_metadata>/<journal>/<volume>/`
+        and the disambiguated authorships to the CSV file `file_disambiguation`.
+        """
+        dfs = self.generate()
+        df_auth = dfs.authorships\
+            .join(dfs.author_names[["id_author", "name"]], on="id_author_name")\
+            .join(dfs.authors[["id_gender", "disambiguated"]], on="id_author")\
+            .join(dfs.publications[["doi"]], on="id_publication")
+
+        d_gender = {id_gender: gender for gender, id_gender in MAP_GENDER_ID.items()}
+        d_gender[ID_GENDER_UNKNOWN] = ""
+        df_disamb = df_auth[df_auth["disambiguated"]].sort_values("id_author", kind="stable")
+        print(f"Writing {len(df_disamb)} disambiguated authorships to {file_disambiguation}.")
+        pd.DataFrame({
+            "id": df_disamb["id_author"],
+            "name": df_disamb["name"],
+            "doi": df_disamb["doi"],
+            "gender": df_disamb["id_gender"].map(d_gender)}).to_csv(file_disambiguation, index=False)
+
+        print(f"Writing {len(dfs.publications)} metadata files to {folder_metadata}.")
+        s_names = df_auth.groupby("id_publication")["name"].agg(list)
+        df_pub = dfs.publications.join(dfs.journals, on="id_journal")
+        for id_publication, timestamp, doi, code, short, name, issue, volume in zip(
+                df_pub.index.tolist(),
+                pd.to_datetime(df_pub["timestamp"]).dt.strftime("%Y-%m-%d").tolist(),
+                df_pub["doi"].tolist(), df_pub["code"].tolist(), df_pub["short"].tolist(),
+                df_pub["name"].tolist(), df_pub["issue"].tolist(), df_pub["volume"].tolist()):
+            folder_volume = os.path.join(folder_metadata, code, str(volume))
+            os.makedirs(folder_volume, exist_ok=True)
+            json_paper = {
+                "identifiers": {"doi": doi},
+                "date": timestamp,
+                "journal": {"id": code, "abbreviatedName": short, "name": name},
+                "issue": {"number": issue},
+                "volume": {"number": str(volume)},
+                "authors": [{"type": "Person", "name": name_author}\
+                    for name_author in s_names.get(id_publication, [])]}
+            with open(os.path.join(folder_volume, f"{doi.split('/')[-1]}.json"),
+                      "w", encoding="utf-8") as file:
+                json.dump(json_paper, file)
+        return dfs
+
+    def _get_year_weights(self, a_years: np.ndarray) -> np.ndarray:
+        a_weights = np.exp(self.growth_rate * (a_years - self.year_start))
+        return a_weights / a_weights.sum()
+
+    def _generate_authors(self, a_years: np.ndarray)\
+            -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        a_career_start = self._rng.choice(a_years, self.n_authors, p=self._get_year_weights(a_years))
+        a_career_length = self._rng.geometric(1 / self.career_length_mean, self.n_authors)
+        a_career_end = np.minimum(a_career_start + a_career_length - 1, self.year_end)
+        a_gender = self._rng.choice(
+            [ID_GENDER_UNKNOWN, ID_GENDER_FEMALE, ID_GENDER_MALE],
+            self.n_authors, p=self.gender_shares)
+        return a_career_start, a_career_end, a_gender
+
+    def _count_active_authors(
+            self, a_years: np.ndarray,
+            a_career_start: np.ndarray, a_career_end: np.ndarray) -> np.ndarray:
+        a_diff = np.bincount(a_career_start - self.year_start, minlength=len(a_years) + 1)\
+            - np.bincount(a_career_end + 1 - self.year_start, minlength=len(a_years) + 1)
+        return np.cumsum(a_diff)[:len(a_years)]
+
+    def _generate_publications(
+            self, a_years: np.ndarray,
+            a_career_start: np.ndarray, a_career_end: np.ndarray)\
+                -> Tuple[np.ndarray, np.ndarray]:
+        a_n_active = self._count_active_authors(a_years, a_career_start, a_career_end)
+        a_pub_year = np.sort(self._rng.choice(
+            a_years, self.n_publications, p=a_n_active / a_n_active.sum()))
+        a_year_start = (a_pub_year - 1970).astype("datetime64[Y]").astype("datetime64[D]")
+        a_days_year = (a_pub_year - 1969).astype("datetime64[Y]").astype("datetime64[D]") - a_year_start
+        a_timestamp = a_year_start + np.floor(
+            self._rng.random(self.n_publications) * a_days_year.astype(np.int64)).astype("timedelta64[D]")
+        # Publications are ordered by time, as years are sorted and days are drawn within years
+        a_order = np.lexsort((a_timestamp, a_pub_year))
+        return a_pub_year[a_order], a_timestamp[a_order]
+
+    def _generate_authorships(
+            self, a_years: np.ndarray, a_pub_year: np.ndarray,
+            a_career_start: np.ndarray, a_career_end: np.ndarray)\
+                -> Tuple[np.ndarray, np.ndarray]:
+        a_team_size = np.minimum(
+            self._rng.zipf(self.team_size_exponent, self.n_publications), self.max_team_size)
+        a_productivity = self._rng.pareto(2., self.n_authors) + 1
+        # Fixed ordering of authors, such that teams of later years recur
+        a_order_authors = self._rng.permutation(self.n_authors)
+
+        l_pub, l_author = [], []
+        a_bounds = np.searchsorted(a_pub_year, np.append(a_years, self.year_end + 1))
+        for year, pos_start, pos_end in zip(a_years.tolist(), a_bounds[:-1].tolist(), a_bounds[1:].tolist()):
+            if pos_start == pos_end:
+                continue
+            a_active = a_order_authors[
+                (a_career_start[a_order_authors] <= year) & (a_career_end[a_order_authors] >= year)]
+            n_active = len(a_active)
+            if n_active == 0:
+                continue
+            a_size = np.minimum(a_team_size[pos_start:pos_end], n_active)
+            a_center = self._rng.choice(
+                n_active, pos_end - pos_start, p=a_productivity[a_active] / a_productivity[a_active].sum())
+            a_pub_rows = np.repeat(np.arange(pos_start, pos_end), a_size)
+            # Members follow each other on the ordering of authors with geometric gaps,
+            # centered around the center of the team
+            a_pos_team = np.cumsum(a_size) - a_size
+            a_gap = self._rng.geometric(1 / self.team_spread, len(a_pub_rows))
+            a_gap[a_pos_team] = 0
+            a_offset = np.cumsum(a_gap)
+            a_offset -= np.repeat(a_offset[a_pos_team], a_size)
+            a_offset -= np.repeat(a_offset[a_pos_team + a_size - 1] // 2, a_size)
+            a_idx = (np.repeat(a_center, a_size) + a_offset) % n_active
+            l_pub.append(a_pub_rows)
+            l_author.append(a_active[a_idx])
+
+        a_pub = np.concatenate(l_pub) if len(l_pub) > 0 else np.zeros(0, dtype=np.int64)
+        a_author = np.concatenate(l_author) if len(l_author) > 0 else np.zeros(0, dtype=np.int64)
+        # Authors appear at most once per publication
+        _, a_idx_unique = np.unique(a_pub * self.n_authors + a_author, return_index=True)
+        return a_pub[a_idx_unique], a_author[a_idx_unique]
+
+    def _generate_citations(self, a_years: np.ndarray, a_pub_year: np.ndarray)\
+            -> Tuple[np.ndarray, np.ndarray]:
+        a_fitness = self._rng.lognormal(0., 1., self.n_publications)
+        a_n_references = self._rng.poisson(self.n_references_mean, self.n_publications)
+
+        l_citing, l_cited = [], []
+        a_bounds = np.searchsorted(a_pub_year, np.append(a_years, self.year_end + 1))
+        for year, pos_start, pos_end in zip(a_years.tolist(), a_bounds[:-1].tolist(), a_bounds[1:].tolist()):
+            # Only publications of previous years are cited
+            if pos_start == 0 or pos_start == pos_end:
+                continue
+            a_weights = a_fitness[:pos_start]\
+                * np.exp(-(year - a_pub_year[:pos_start]) / self.citation_decay)
+            a_n = a_n_references[pos_start:pos_end]
+            l_citing.append(np.repeat(np.arange(pos_start, pos_end), a_n))
+            l_cited.append(self._rng.choice(pos_start, a_n.sum(), p=a_weights / a_weights.sum()))
+
+        if len(l_citing) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        a_citing, a_cited = np.concatenate(l_citing), np.concatenate(l_cited)
+        _, a_idx_unique = np.unique(a_citing * self.n_publications + a_cited, return_index=True)
+        return a_citing[a_idx_unique], a_cited[a_idx_unique]
+
+    def _generate_author_names(self, a_gender: np.ndarray, a_auth_author: np.ndarray)\
+            -> Tuple[pd.DataFrame, np.ndarray]:
+        a_first = np.empty(self.n_authors, dtype=object)
+        for id_gender, t_names in FIRST_NAMES.items():
+            a_mask = a_gender == id_gender
+            a_first[a_mask] = np.array(t_names, dtype=object)[
+                self._rng.integers(0, len(t_names), a_mask.sum())]
+        s_last = pd.Series(np.array(LAST_NAMES, dtype=object)[
+            self._rng.integers(0, len(LAST_NAMES), self.n_authors)])
+        s_first = pd.Series(a_first)
+
+        # Second name variants (initial of the first name) of some authors
+        a_has_variant = self._rng.random(self.n_authors) < self.share_name_variants
+        a_id_variant = np.full(self.n_authors, -1, dtype=np.int64)
+        a_id_variant[a_has_variant] = self.n_authors + np.arange(a_has_variant.sum())
+        d_gender_nq = {id_gender: key for key, id_gender in MAP_GENDERNQ_ID.items()}
+        a_gender_nq = pd.Series(a_gender).map(d_gender_nq)
+        df_author_names = pd.concat([
+            pd.DataFrame({
+                "id_author_name": np.arange(self.n_authors),
+                "id_author": np.arange(self.n_authors),
+                "name": s_first + " " + s_last,
+                "gender_nq": a_gender_nq}),
+            pd.DataFrame({
+                "id_author_name": a_id_variant[a_has_variant],
+                "id_author": np.flatnonzero(a_has_variant),
+                "name": (s_first.str[0] + ". " + s_last)[a_has_variant].to_numpy(),
+                "gender_nq": a_gender_nq[a_has_variant].to_numpy()})],
+            ignore_index=True)
+
+        # Authorships of authors with a variant use either name
+        a_auth_name = a_auth_author.copy()
+        a_use_variant = (a_id_variant[a_auth_author] >= 0)\
+            & (self._rng.random(len(a_auth_author)) < .5)
+        a_auth_name[a_use_variant] = a_id_variant[a_auth_author[a_use_variant]]
+        return df_author_names, a_auth_name
+
+    def _generate_journals(self, a_pub_year: np.ndarray, a_timestamp: np.ndarray)\
+            -> Tuple[pd.DataFrame, np.ndarray]:
+        # One issue per journal and month, one volume per journal and year
+        a_journal = self._rng.integers(0, len(JOURNALS), self.n_publications)
+        a_month = a_timestamp.astype("datetime64[M]").astype(np.int64) % 12 + 1
+        a_key = (a_journal * (self.year_end - self.year_start + 1)\
+            + (a_pub_year - self.year_start)) * 12 + a_month - 1
+        a_key_unique, a_id_journal = np.unique(a_key, return_inverse=True)
+        a_journal_unique = a_key_unique // 12 // (self.year_end - self.year_start + 1)
+        df_journals = pd.DataFrame({
+            "id_journal": np.arange(len(a_key_unique)),
+            "code": [JOURNALS[j][0] for j in a_journal_unique.tolist()],
+            "short": [JOURNALS[j][1] for j in a_journal_unique.tolist()],
+            "name": [JOURNALS[j][2] for j in a_journal_unique.tolist()],
+            "issue": (a_key_unique % 12 + 1).astype(str),
+            "volume": a_key_unique // 12 % (self.year_end - self.year_start + 1) + 1})
+        return df_journals, a_id_journal
@@ -21,9 +21,15 @@ from .models.triadic_closure_motifs import\
     TriadicClosureMotif, SimplicialTriadicClosureMotif
 from .models.bins_realization import BinsRealization
 from .models.impact_group import ImpactGroup
+from .models.collaborator_stage_max import CollaboratorStageMax
+from .models.collaborator_lifecycle import CollaboratorLifecycle
+from .models.collaborator_filter_set import CollaboratorFilterSet
 
+from .lifecycle import refresh_collaborator_lifecycle
 from .collection import APSCollection
 from .integrator import APSIntegrator
 from .has_session import HasSession
 from .postgresql_engine import PostgreSQLEngine
 from .session import CumAdvBrokSession
+from .writer_thread import WriterThread
+from .bulk_writer import BulkWriter
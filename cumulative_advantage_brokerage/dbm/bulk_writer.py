@@ -0,0 +1,184 @@
+"""Bulk writes of table rows via `COPY`.
+"""
+import csv
+import io
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from sqlalchemy import Table
+from sqlalchemy.engine import Engine
+
+from .writer_thread import WriterThread, rollback
+
+NULL = "\\N"
+
+class BulkWriter:
+    """Streams rows into a table with `COPY` in chunks of `chunk_size` rows.
+    Rows are ORM objects or dictionaries with (at least) the values of `columns`.
+    They are not added to any session: ORM objects are neither refreshed nor receive their IDs,
+    and Python-side column defaults of the models are not applied.
+
+    Each chunk is written and committed on a separate connection of `engine`.
+    With `asynchronous=True`, chunks are written by a background thread (see `WriterThread`),
+    of which at most `n_chunks_queued` wait, after which `write` blocks until the database caught up.
+    Once a chunk failed, no further chunks are written and the error is raised
+    by the next and every later call to `write`, `flush` or `close`.
+    Leaving a `with` block by an exception discards unwritten rows instead of flushing them.
+
+    With `return_ids=True`, the IDs of the rows are drawn from the sequence of the `id` column before writing
+    and are available in the order of writing as `ids` after `flush`.
+    """
+    engine: Engine
+    table: Table
+    columns: Tuple[str, ...]
+    chunk_size: int
+    asynchronous: bool
+    return_ids: bool
+    n_rows: int
+
+    _l_chunk: List[Tuple]
+    _l_ids: List[np.ndarray]
+    _conn: Any
+    _writer: Optional[WriterThread]
+    _error: Optional[BaseException] # First error of synchronous writes
+
+    def __init__(
+            self, engine: Engine, table: Table,
+            columns: Optional[Sequence[str]] = None,
+            chunk_size: int = 100000,
+            asynchronous: bool = False,
+            return_ids: bool = False,
+            n_chunks_queued: int = 2) -> None:
+        """Streams rows into a table with `COPY` in chunks of `chunk_size` rows.
+
+        Args:
+            engine (Engine): Engine to connect to.
+            table (Table): Table to write to (e.g., `ImpactGroup.__table__`).
+            columns (Optional[Sequence[str]], optional): Columns to write,
+                by default all columns except `id`.
+            chunk_size (int, optional): Number of rows per `COPY`, by default 100000
+            asynchronous (bool, optional): Write chunks in a background thread, by default False
+            return_ids (bool, optional): Collect the IDs of the written rows, by default False
+            n_chunks_queued (int, optional): Number of chunks waiting for the background thread, by default 2
+        """
+        self.engine = engine
+        self.table = table
+        self.columns = tuple(columns) if columns is not None\
+            else tuple(column.name for column in table.columns if column.name != "id")
+        self.chunk_size = chunk_size
+        self.asynchronous = asynchronous
+        self.return_ids = return_ids
+        self.n_rows = 0
+
+        self._l_chunk = []
+        self._l_ids = []
+        self._conn = None
+        self._writer = WriterThread(
+            engine=engine, write_item=self._write_chunk,
+            n_items_queued=n_chunks_queued) if asynchronous else None
+        self._error = None
+
+    def __enter__(self) -> "BulkWriter":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        if exc_type is None:
+            self.close()
+            return
+        # Do not replace the raised exception by errors of writing the remaining rows
+        self._l_chunk = []
+        try:
+            self.close()
+        except BaseException: # pylint: disable=broad-except
+            pass
+
+    @property
+    def ids(self) -> np.ndarray:
+        """IDs of all rows written so far (if `return_ids`).
+        """
+        assert self.return_ids, "IDs are only collected with `return_ids=True`."
+        return np.concatenate(self._l_ids) if len(self._l_ids) > 0\
+            else np.zeros(0, dtype=np.int64)
+
+    def write(self, rows: Iterable[Any]) -> None:
+        self._raise_error()
+        for row in rows:
+            self._l_chunk.append(self._to_values(row))
+            if len(self._l_chunk) >= self.chunk_size:
+                self._submit()
+
+    def flush(self) -> None:
+        """Blocks until all written rows are committed.
+        """
+        if len(self._l_chunk) > 0:
+            self._submit()
+        if self._writer is not None:
+            self._writer.join()
+        self._raise_error()
+
+    def close(self) -> None:
+        """Flushes and releases the connection.
+        """
+        try:
+            self.flush()
+        finally:
+            if self._writer is not None:
+                self._writer.close()
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _to_values(self, row: Any) -> Tuple:
+        if isinstance(row, dict):
+            return tuple(row.get(column) for column in self.columns)
+        return tuple(getattr(row, column) for column in self.columns)
+
+    def _submit(self):
+        self._raise_error()
+        l_chunk, self._l_chunk = self._l_chunk, []
+        if self._writer is not None:
+            self._writer.submit(l_chunk)
+            self.n_rows += len(l_chunk)
+            return
+
+        try:
+            if self._conn is None:
+                self._conn = self.engine.raw_connection()
+            self._write_chunk(self._conn, l_chunk)
+        except BaseException as error:
+            self._error = error
+            rollback(self._conn)
+            raise
+        self.n_rows += len(l_chunk)
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+        if self._writer is not None:
+            self._writer.raise_error()
+
+    def _write_chunk(self, conn, l_chunk: List[Tuple]):
+        columns = self.columns
+        with conn.cursor() as cursor:
+            if self.return_ids:
+                cursor.execute(
+                    "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                    (self.table.name, len(l_chunk)))
+                a_ids = np.fromiter((row[0] for row in cursor.fetchall()), dtype=np.int64, count=len(l_chunk))
+                l_chunk = [(id_row,) + values for id_row, values in zip(a_ids.tolist(), l_chunk)]
+                columns = ("id",) + columns
+            cursor.copy_expert(
+                f"COPY {self.table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{NULL}')",
+                self._to_csv(l_chunk))
+        conn.commit()
+        if self.return_ids:
+            self._l_ids.append(a_ids)
+
+    @staticmethod
+    def _to_csv(l_chunk: List[Tuple]) -> io.StringIO:
+        file = io.StringIO()
+        writer = csv.writer(file)
+        writer.writerows(
+            tuple(NULL if value is None else value for value in values) for values in l_chunk)
+        file.seek(0)
+        return file
@@ -17,6 +17,7 @@ from .models.project import Project
 from .models.gender import Gender,\
     GENDER_UNKNOWN, GENDER_FEMALE, GENDER_MALE
 from .models.citation import Citation
+from .lifecycle import refresh_collaborator_lifecycle
 
 class APSIntegrator:
     """Performs the integration of the APS dataset.
@@ -185,6 +186,7 @@ class APSIntegrator:
 
     def populate_database(self):
         """Collects all data by integrator methods and then populates the database accordingly.
+        Finally, the `collaborator_lifecycle` table is recomputed.
         """
         genders = self.integrate_genders()
         collaborators = self.integrate_collaborators()
@@ -206,6 +208,7 @@ class APSIntegrator:
             session.commit()
             session.add_all(citations)
             session.commit()
+            refresh_collaborator_lifecycle(session)
 
     def _load_id_projects(self):
         with Session(self.engine) as session:
@@ -0,0 +1,69 @@
+"""Computation of the `collaborator_lifecycle` table.
+"""
+from sqlalchemy import select, func, distinct, cast, and_, delete, insert, text, Integer
+from sqlalchemy.orm import Session
+
+from .models.collaboration import Collaboration
+from .models.project import Project
+from .models.collaborator_lifecycle import CollaboratorLifecycle
+from .models.collaborator_filter_set import CollaboratorFilterSet
+from ..constants import\
+    CAREER_LENGTH_MAX, DATE_OBSERVATION_END, DURATION_BUFFER_AUTHOR_ACTIVE
+
+def standard_filter_conditions(birth, death):
+    """Conditions of the `StandardFilter` (see there) on the first and last publication date.
+    """
+    return and_(
+        death != birth,
+        (death - birth) <= CAREER_LENGTH_MAX,
+        death <= (DATE_OBSERVATION_END - DURATION_BUFFER_AUTHOR_ACTIVE))
+
+def refresh_collaborator_lifecycle(session: Session) -> int:
+    """Recomputes `CollaboratorLifecycle` from all collaborations in one aggregation.
+    Has to be called whenever `Collaboration` or `Project` change (e.g., after the data integration).
+    Materialized filter sets (`CollaboratorFilterSet`) are derived from the lifecycle and thus dropped.
+
+    Args:
+        session (Session): Session to execute and commit the refresh in.
+
+    Returns:
+        int: Number of collaborators.
+    """
+    sq_birth_death = select(
+            Collaboration.id_collaborator,
+            func.min(Project.timestamp).label("birth"),
+            func.max(Project.timestamp).label("death"),
+            func.count(distinct(Collaboration.id_project)).label("n_projects"))\
+        .select_from(Collaboration)\
+        .join(Project, Project.id == Collaboration.id_project)\
+        .group_by(Collaboration.id_collaborator)\
+        .subquery()
+
+    q_lifecycle = select(
+            sq_birth_death.c.id_collaborator,
+            sq_birth_death.c.birth,
+            sq_birth_death.c.death,
+            sq_birth_death.c.n_projects,
+            (func.extract(
+                "days",
+                sq_birth_death.c.death - sq_birth_death.c.birth) / 365),
+            cast(func.extract("decade", sq_birth_death.c.birth), Integer),
+            func.coalesce(
+                standard_filter_conditions(sq_birth_death.c.birth, sq_birth_death.c.death),
+                False))\
+        .select_from(sq_birth_death)
+
+    print("Refreshing collaborator lifecycle.")
+    session.execute(delete(CollaboratorFilterSet))
+    session.execute(delete(CollaboratorLifecycle))
+    result = session.execute(
+        insert(CollaboratorLifecycle)\
+            .from_select([
+                "id_collaborator", "birth", "death", "n_projects",
+                "career_length", "decade_birth", "in_standard_filter"],
+                q_lifecycle))
+    session.commit()
+    session.execute(text(f"ANALYZE {CollaboratorLifecycle.__tablename__}"))
+    session.commit()
+    print(f"Stored lifecycle of {result.rowcount} collaborators.")
+    return result.rowcount
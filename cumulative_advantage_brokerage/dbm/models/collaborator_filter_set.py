@@ -0,0 +1,34 @@
+"""Materialized sets of filtered collaborators.
+"""
+from sqlalchemy import Column, Index, ForeignKey, String
+from sqlalchemy.orm import declared_attr
+
+from .base_mixin import Base
+
+# pylint: disable=no-self-argument
+class CollaboratorFilterSet(Base):
+    """Membership of collaborators in the set of a `CollaboratorFilter`.
+
+    Sets are identified by `filter_key`, the hash of the filter conditions (see `CollaboratorFilter.key`).
+    They are derived from `CollaboratorLifecycle` and dropped whenever it is refreshed.
+    """
+    __tablename__ = "collaborator_filter_set"
+
+    filter_key = Column(String(64), nullable=False)
+
+    @declared_attr
+    def id_collaborator(cls):
+        """Connection to `collaborator.id`.
+        """
+        return Column("id_collaborator",
+                      ForeignKey("collaborator.id"),
+                      nullable=False)
+
+    __table_args__ = (
+        Index(
+            "idx_collaborator_filter_set",
+            "filter_key",
+            "id_collaborator",
+            unique=True
+        ),
+    )
@@ -0,0 +1,51 @@
+"""Precomputed career attributes of collaborators.
+"""
+from sqlalchemy import Column, Index, ForeignKey, Integer, Float, DateTime, Boolean
+from sqlalchemy.orm import declared_attr
+
+from .base_mixin import Base
+
+# pylint: disable=no-self-argument
+class CollaboratorLifecycle(Base):
+    """Career attributes of each collaborator with at least one project.
+
+    Rows are derived from `Collaboration` and `Project` and have to be recomputed
+    after the data integration (see `refresh_collaborator_lifecycle`).
+    """
+    __tablename__ = "collaborator_lifecycle"
+
+    # First and last publication date
+    birth = Column(DateTime)
+    death = Column(DateTime)
+
+    n_projects = Column(Integer, nullable=False)
+
+    # Duration between birth and death in years
+    career_length = Column(Float)
+
+    # Decade of the birth (e.g., `199` for the 1990s)
+    decade_birth = Column(Integer)
+
+    # Collaborator is in the set of `StandardFilter`
+    in_standard_filter = Column(Boolean, nullable=False)
+
+    @declared_attr
+    def id_collaborator(cls):
+        """Connection to `collaborator.id`.
+        """
+        return Column("id_collaborator",
+                      ForeignKey("collaborator.id"),
+                      nullable=False)
+
+    __table_args__ = (
+        Index(
+            "idx_collaborator_lifecycle",
+            "id_collaborator",
+            unique=True
+        ),
+        Index(
+            "idx_collaborator_lifecycle_standard_filter",
+            "in_standard_filter",
+            "id_collaborator"
+        ),
+    )
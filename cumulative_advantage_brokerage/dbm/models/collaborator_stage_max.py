@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Index, ForeignKey, Integer
+from sqlalchemy.orm import declared_attr
+
+from .metric_mixin import MetricMixin
+
+class CollaboratorStageMax(MetricMixin):
+    """Final career stage of a collaborator in a career series configuration.
+    Series are stored sparsely, so all stages up to `stage_max` without stored values have zero counts.
+    """
+    __tablename__ = "collaborator_stage_max"
+
+    stage_max = Column(Integer, nullable=False)
+
+    @declared_attr
+    def id_collaborator(cls):
+        """Connection to `collaborator.id`.
+        """
+        return Column("id_collaborator",
+                      ForeignKey("collaborator.id"),
+                      index=True, nullable=False)
+
+    __table_args__ = (
+        Index(
+            "idx_collaborator_stage_max",
+            "id_metric_configuration",
+            "id_collaborator",
+            unique=True
+        ),
+    )
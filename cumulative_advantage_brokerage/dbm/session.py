@@ -1,10 +1,50 @@
-from typing import List, Any
+from typing import List, Any, Optional, Sequence
 
+import numpy as np
+from sqlalchemy import Table
 from sqlalchemy.orm import Session
 
+from .bulk_writer import BulkWriter
+
 class CumAdvBrokSession(Session):
     def commit_list(self, l: List[Any]):
+        """Adds, commits and refreshes ORM objects (one query per object).
+        Use for few objects whose IDs are required, and `write_list` or `bulk_writer` otherwise.
+        """
         self.add_all(l)
         self.commit()
         for el in l:
             self.refresh(el)
+
+    def bulk_writer(
+            self, table: Table,
+            columns: Optional[Sequence[str]] = None,
+            chunk_size: int = 100000,
+            asynchronous: bool = False,
+            return_ids: bool = False) -> BulkWriter:
+        """Creates a writer which streams rows into `table` via `COPY` (see `BulkWriter`).
+        Rows are written on separate connections, so objects they reference must be committed beforehand.
+        """
+        return BulkWriter(
+            engine=self.get_bind(), table=table, columns=columns,
+            chunk_size=chunk_size, asynchronous=asynchronous, return_ids=return_ids)
+
+    def write_list(
+            self, l: List[Any],
+            chunk_size: int = 100000,
+            return_ids: bool = False) -> Optional[np.ndarray]:
+        """Writes ORM objects of a single model via `COPY` without adding them to the session.
+
+        Args:
+            l (List[Any]): ORM objects to write.
+            chunk_size (int, optional): Number of rows per `COPY`, by default 100000
+            return_ids (bool, optional): Return the IDs of the written rows, by default False
+
+        Returns:
+            Optional[np.ndarray]: IDs in the order of `l` if `return_ids`.
+        """
+        if len(l) == 0:
+            return np.zeros(0, dtype=np.int64) if return_ids else None
+        with self.bulk_writer(type(l[0]).__table__, chunk_size=chunk_size, return_ids=return_ids) as writer:
+            writer.write(l)
+        return writer.ids if return_ids else None
@@ -0,0 +1,107 @@
+"""Background thread writing items on a separate database connection.
+"""
+import queue
+import threading
+from typing import Any, Callable, Optional
+
+from sqlalchemy.engine import Engine
+
+class WriterThread:
+    """Passes submitted items to `write_item` in a background thread,
+    on a raw connection of `engine` which is opened by the thread
+    (and prepared by `prepare_connection`, if given).
+    At most `n_items_queued` items wait for the thread, after which `submit` blocks.
+
+    The first error of the thread is kept: it is raised by every later call to `submit` or `join`,
+    and all later items are dropped, so that no partial writes follow a failed one.
+    The thread keeps draining the queue after an error to not block `submit` and `join`.
+    """
+    engine: Engine
+    write_item: Callable[[Any, Any], None]
+    prepare_connection: Optional[Callable[[Any], None]]
+    error: Optional[BaseException]
+
+    _queue: "queue.Queue[Any]"
+    _thread: Optional[threading.Thread]
+
+    _STOP = object()
+
+    def __init__(
+            self, engine: Engine,
+            write_item: Callable[[Any, Any], None],
+            prepare_connection: Optional[Callable[[Any], None]] = None,
+            n_items_queued: int = 2) -> None:
+        self.engine = engine
+        self.write_item = write_item
+        self.prepare_connection = prepare_connection
+        self.error = None
+
+        self._queue = queue.Queue(maxsize=n_items_queued)
+        self._thread = None
+
+    def raise_error(self) -> None:
+        """Raises the first error of the thread, if any.
+        """
+        if self.error is not None:
+            raise self.error
+
+    def submit(self, item: Any) -> None:
+        """Queues `item` for writing and starts the thread if necessary.
+        """
+        self.raise_error()
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        self._queue.put(item)
+
+    def join(self) -> None:
+        """Blocks until all submitted items are written (or dropped).
+        """
+        self._queue.join()
+        self.raise_error()
+
+    def close(self) -> None:
+        """Stops the thread, which closes its connection.
+        Does not raise errors of the thread.
+        """
+        if self._thread is not None:
+            self._queue.put(self._STOP)
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        conn = None
+        try:
+            conn = self.engine.raw_connection()
+            if self.prepare_connection is not None:
+                self.prepare_connection(conn)
+        except BaseException as error: # pylint: disable=broad-except
+            self.error = error
+
+        try:
+            while True:
+                item = self._queue.get()
+                try:
+                    if item is self._STOP:
+                        return
+                    if self.error is None:
+                        self.write_item(conn, item)
+                except BaseException as error: # pylint: disable=broad-except
+                    self.error = error
+                    rollback(conn)
+                finally:
+                    self._queue.task_done()
+        finally:
+            if conn is not None:
+                conn.close()
+
+def rollback(conn) -> None:
+    """Rolls back a failed transaction of `conn`, if any.
+    Errors are ignored as the error which caused the rollback is reported instead.
+    """
+    if conn is None:
+        return
+    try:
+        conn.rollback()
+    except BaseException: # pylint: disable=broad-except
+        pass
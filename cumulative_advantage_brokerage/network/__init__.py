@@ -1,5 +1,15 @@
-from .sql_edge_generator import SQLEdgeGenerator
+from .sql_edge_generator import EdgeGenerator, SQLEdgeGenerator
+from .file_edge_generator import FileEdgeGenerator, write_columns
 from .collaboration_network import CollaborationNetwork
-from .growing_temporal_linked_list_network import GrowingTemporalLinkedListNetwork
+from .growing_temporal_linked_list_network import\
+    GrowingTemporalNetwork, GrowingTemporalLinkedListNetwork
+from .growing_temporal_array_network import GrowingTemporalArrayNetwork
+from .event_profiler import EventProfiler
 from .motif_collector import InitiationMotifCollector
+from .motif_collector_group import MotifCollectorGroup
 from .motif_factory import MotifFactory
+from .batch_motif_collector import BatchInitiationMotifCollector
+from .checkpoint import MotifCollectorCheckpointer
+from .motif_sink import\
+    MotifSink, MemoryMotifSink, CSVMotifSink,\
+    InsertMotifSink, PostgresCopyMotifSink
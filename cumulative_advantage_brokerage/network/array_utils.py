@@ -0,0 +1,62 @@
+"""Helpers for growable, sorted and shared numpy arrays.
+"""
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Tuple
+
+import numpy as np
+
+def grow(a: np.ndarray, size: int, fill: int = 0) -> np.ndarray:
+    """Returns `a` or a copy of it with capacity for at least `size` elements.
+    Capacity is at least doubled to amortize the cost of appending.
+    """
+    if len(a) >= size:
+        return a
+    a_new = np.full(max(size, 2 * len(a)), fill, dtype=a.dtype)
+    a_new[:len(a)] = a
+    return a_new
+
+def difference_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Elements of the sorted array `a` which are not in the sorted array `b`.
+    """
+    if len(b) == 0:
+        return a
+    pos = np.searchsorted(b, a)
+    pos[pos == len(b)] = len(b) - 1
+    return a[b[pos] != a]
+
+def share_arrays(d_arrays: Dict[str, np.ndarray])\
+        -> Tuple[SharedMemory, Dict[str, Tuple[int, str, Tuple[int, ...]]]]:
+    """Copies arrays into a single block of shared memory.
+
+    Returns:
+        Tuple[SharedMemory, Dict[str, Tuple[int, str, Tuple[int, ...]]]]:
+            The shared memory block (to be closed and unlinked by the caller)
+            and the offset, dtype and shape of each array to attach to it.
+    """
+    d_specs, offset = {}, 0
+    for name, a in d_arrays.items():
+        d_specs[name] = (offset, a.dtype.str, a.shape)
+        offset += -(-a.nbytes // 8) * 8 # Keep 8-byte alignment
+    shm = SharedMemory(create=True, size=max(offset, 1))
+    for name, a_shared in attach_arrays(shm, d_specs).items():
+        a_shared[...] = d_arrays[name]
+    return shm, d_specs
+
+def attach_arrays(
+        shm: SharedMemory,
+        d_specs: Dict[str, Tuple[int, str, Tuple[int, ...]]]) -> Dict[str, np.ndarray]:
+    """Arrays stored in a shared memory block by `share_arrays`.
+    """
+    return {name: np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf, offset=offset)\
+        for name, (offset, dtype, shape) in d_specs.items()}
+
+def prefix_arrays(d_arrays: Dict[str, np.ndarray], prefix: str) -> Dict[str, np.ndarray]:
+    """Prepends `<prefix>.` to the names of arrays to nest them in another state.
+    """
+    return {f"{prefix}.{name}": a for name, a in d_arrays.items()}
+
+def select_arrays(d_arrays: Dict[str, np.ndarray], prefix: str) -> Dict[str, np.ndarray]:
+    """Arrays nested under `<prefix>.` (see `prefix_arrays`) without the prefix.
+    """
+    n = len(prefix) + 1
+    return {name[n:]: a for name, a in d_arrays.items() if name.startswith(f"{prefix}.")}
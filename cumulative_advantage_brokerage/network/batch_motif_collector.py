@@ -0,0 +1,485 @@
+"""Vectorized computation of triadic closure motifs from first links.
+"""
+import multiprocessing as mp
+import os
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from .array_utils import share_arrays, attach_arrays
+from .motif_factory import MotifFactory
+from .motif_sink import MotifSink, PostgresCopyMotifSink
+from .sql_edge_generator import EdgeGenerator
+from ..dbm import\
+    HasSession, CumAdvBrokSession
+
+class FirstLinkTable(NamedTuple):
+    """First links of all node pairs `u < v`.
+    Row `i` of all columns describes a single node pair.
+    """
+    nodes_u: np.ndarray # Collaborator IDs (int64)
+    nodes_v: np.ndarray # Collaborator IDs (int64)
+    seq: np.ndarray # Position of the first link in the global link order (int64)
+    dates: np.ndarray # Day ordinals of the first link (int32)
+    projects: np.ndarray # Project IDs of the first link (int64)
+
+class Authorships(NamedTuple):
+    """Distinct collaborator-project pairs, sorted by collaborator, date and project.
+    """
+    collaborators: np.ndarray # Collaborator IDs (int64)
+    dates: np.ndarray # Day ordinals (int32)
+    projects: np.ndarray # Project IDs (int64)
+
+class OrientedNetwork(NamedTuple):
+    """First-link network with links oriented from lower to higher (degree, ID)-rank.
+    Row `i` of all link columns describes a single oriented link, sorted by source and destination.
+    """
+    node_by_rank: np.ndarray # Rank -> collaborator ID (int64)
+    src: np.ndarray # Source ranks (int64)
+    dst: np.ndarray # Destination ranks (int64)
+    keys: np.ndarray # Sorted keys `src * n_nodes + dst` (int64)
+    links: np.ndarray # Indices into the `FirstLinkTable` (int64)
+    n_wedges: np.ndarray # Number of wedges with later links of the same source (int64)
+
+def _reduce_first_links(l_first_links: List[FirstLinkTable]) -> FirstLinkTable:
+    """Keeps the link with the lowest `seq` of each node pair.
+    """
+    first_links = FirstLinkTable(*(np.concatenate(cols) for cols in zip(*l_first_links)))
+    a_keys = (first_links.nodes_u << 32) | first_links.nodes_v
+    a_order = np.lexsort((first_links.seq, a_keys))
+    a_keys = a_keys[a_order]
+    a_first = np.ones(len(a_keys), dtype=bool)
+    a_first[1:] = a_keys[1:] != a_keys[:-1]
+    return FirstLinkTable(*(col[a_order[a_first]] for col in first_links))
+
+class BatchInitiationMotifCollector(HasSession):
+    """Computes the same motifs as `InitiationMotifCollector`,
+    but from the first links of all node pairs instead of replaying each link.
+
+    Each triangle of the first-link network corresponds to exactly one motif:
+    - Currency:
+        Only first links are kept. The broker is the node opposite of the
+        last-formed link, the initiator is the other node of the first-formed link.
+
+    - Recurrence:
+        Each triangle is enumerated once.
+
+    - Simplicial dominance:
+        The motif is simplicial if all three nodes appear together
+        in any project of the closing date.
+
+    Links are ordered globally as they are added to the `GrowingTemporalNetwork`,
+    i.e., by date, project ID and the order of collaborator IDs within projects.
+    Triangles are enumerated in batches of at most `max_wedges` wedges
+    on the degree-oriented network.
+    Each triangle is found exactly once from its lowest-rank node (pivot).
+    With `n_workers > 1`, the pivots are split into shards of about equal work
+    which are processed by worker processes on shared-memory arrays.
+    As shards are disjoint, merging them yields each triplet once.
+    Motifs are written to `sink` (see `InitiationMotifCollector`).
+
+    Counts can be continued incrementally for newly appended dates.
+    The state of a previous run (see `get_state`) holds its first links.
+    Restored with `set_state`, the generator should start after the last date of that run.
+    New links are merged into the stored first links and only triangles
+    which contain a new first link are enumerated.
+    As motifs only depend on first links, this yields exactly the motifs missing
+    from the previous run.
+    """
+    generator: EdgeGenerator
+    max_wedges: int
+    n_workers: int
+    sink: Optional[MotifSink]
+    first_links: Optional[FirstLinkTable]
+    authorships: Optional[Authorships]
+    oriented: Optional[OrientedNetwork]
+    seq_start: int # Position of the first link not counted by a previous run
+    n_links: int # Number of links counted including previous runs
+    date_last: Optional[int] # Day ordinal of the last counted date
+
+    _first_links_previous: Optional[FirstLinkTable]
+    _owns_sink: bool # Whether the sink was created by the collector
+
+    _a_keys_collaborator_date: Optional[np.ndarray] # Sorted keys of authorships by collaborator and date
+    _a_keys_project_collaborator: Optional[np.ndarray] # Sorted keys of authorships by project and collaborator
+
+    def __init__(
+            self, generator: EdgeGenerator,
+            session: CumAdvBrokSession,
+            max_wedges: int = 1 << 22,
+            n_workers: int = 1,
+            sink: Optional[MotifSink] = None, **kwargs) -> None:
+        self.generator = generator
+        self.max_wedges = max_wedges
+        self.n_workers = n_workers
+        self._owns_sink = sink is None
+        self.sink = PostgresCopyMotifSink(engine=session.get_bind())\
+            if sink is None and session is not None else sink
+        self.first_links = None
+        self.authorships = None
+        self.oriented = None
+        self.seq_start = 0
+        self.n_links = 0
+        self.date_last = None
+        self._first_links_previous = None
+        self._a_keys_collaborator_date = None
+        self._a_keys_project_collaborator = None
+
+        super().__init__(session=session, **kwargs)
+
+    def build_first_links(self) -> FirstLinkTable:
+        """Computes the first link of each node pair and the authorships
+        from the ordered collaborations of the generator.
+        """
+        l_first_links, n_first_links = [], 0
+        if self._first_links_previous is not None:
+            l_first_links.append(self._first_links_previous)
+            n_first_links = len(self._first_links_previous.seq)
+        l_authorships = []
+        seq_offset = self.seq_start
+        for columns in self.generator.iter_columns():
+            self.date_last = int(columns.dates[-1])
+            # Drop duplicate collaborators within projects
+            a_distinct = np.ones(len(columns.dates), dtype=bool)
+            a_distinct[1:] = (columns.projects[1:] != columns.projects[:-1])\
+                | (columns.collaborators[1:] != columns.collaborators[:-1])
+            a_dates = columns.dates[a_distinct]
+            a_projects = columns.projects[a_distinct]
+            a_collaborators = columns.collaborators[a_distinct]
+            l_authorships.append(Authorships(
+                collaborators=a_collaborators, dates=a_dates, projects=a_projects))
+
+            a_starts = np.concatenate((
+                [0], np.flatnonzero(np.diff(a_projects)) + 1))
+            a_sizes = np.diff(np.append(a_starts, len(a_projects)))
+            a_n_links = a_sizes * (a_sizes - 1) // 2
+            a_seq_starts = seq_offset + np.cumsum(a_n_links) - a_n_links
+            seq_offset += int(a_n_links.sum())
+
+            for size in np.unique(a_sizes[a_sizes > 1]).tolist():
+                a_idx_u, a_idx_v = np.triu_indices(size, k=1)
+                a_idx_projects = np.flatnonzero(a_sizes == size)
+                n_projects_batch = max(1, self.max_wedges // len(a_idx_u))
+                for i in range(0, len(a_idx_projects), n_projects_batch):
+                    a_batch = a_idx_projects[i:i + n_projects_batch]
+                    a_start = a_starts[a_batch][:, None]
+                    l_first_links.append(FirstLinkTable(
+                        nodes_u=a_collaborators[a_start + a_idx_u].ravel(),
+                        nodes_v=a_collaborators[a_start + a_idx_v].ravel(),
+                        seq=(a_seq_starts[a_batch][:, None]\
+                            + np.arange(len(a_idx_u))).ravel(),
+                        dates=np.repeat(a_dates[a_starts[a_batch]], len(a_idx_u)),
+                        projects=np.repeat(a_projects[a_starts[a_batch]], len(a_idx_u))))
+                    n_first_links += len(l_first_links[-1].seq)
+
+                    # Compact repeated links to bound memory
+                    if n_first_links > 2 * self.max_wedges:
+                        l_first_links = [_reduce_first_links(l_first_links)]
+                        n_first_links = len(l_first_links[0].seq)
+
+        if len(l_first_links) == 0:
+            l_first_links = [FirstLinkTable(
+                *(np.zeros(0, dtype=dtype) for dtype in\
+                    (np.int64, np.int64, np.int64, np.int32, np.int64)))]
+        self.first_links = _reduce_first_links(l_first_links)
+
+        authorships = Authorships(*(np.concatenate(cols) for cols in zip(*l_authorships)))\
+            if len(l_authorships) > 0 else Authorships(
+                np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int32),
+                np.zeros(0, dtype=np.int64))
+        a_order = np.lexsort((authorships.projects, authorships.dates, authorships.collaborators))
+        self.authorships = Authorships(*(col[a_order] for col in authorships))
+        self._a_keys_collaborator_date = (self.authorships.collaborators << 32)\
+            | self.authorships.dates
+        self._a_keys_project_collaborator = np.sort(
+            (self.authorships.projects << 32) | self.authorships.collaborators)
+
+        self.n_links = seq_offset
+        print(f"Computed {len(self.first_links.seq)} first links of {seq_offset} links.")
+        return self.first_links
+
+    def orient_network(self) -> OrientedNetwork:
+        """Orients the first-link network from lower to higher (degree, ID)-rank.
+        """
+        fl = self.first_links
+        a_nodes, a_inv = np.unique(
+            np.concatenate((fl.nodes_u, fl.nodes_v)), return_inverse=True)
+        n_nodes, n_links = len(a_nodes), len(fl.seq)
+        a_idx_u, a_idx_v = a_inv[:n_links], a_inv[n_links:]
+
+        a_degree = np.bincount(a_inv, minlength=n_nodes)
+        a_node_by_rank = np.lexsort((np.arange(n_nodes), a_degree))
+        a_rank = np.empty(n_nodes, dtype=np.int64)
+        a_rank[a_node_by_rank] = np.arange(n_nodes)
+        a_src = np.minimum(a_rank[a_idx_u], a_rank[a_idx_v])
+        a_dst = np.maximum(a_rank[a_idx_u], a_rank[a_idx_v])
+
+        # Sorted adjacency of oriented links
+        a_order = np.lexsort((a_dst, a_src))
+        a_src, a_dst = a_src[a_order], a_dst[a_order]
+        a_indptr = np.concatenate(([0], np.cumsum(np.bincount(a_src, minlength=n_nodes))))
+
+        self.oriented = OrientedNetwork(
+            node_by_rank=a_nodes[a_node_by_rank],
+            src=a_src,
+            dst=a_dst,
+            keys=a_src * n_nodes + a_dst,
+            links=a_order,
+            # Wedges (src; dst_i, dst_j) with i < j within the adjacency of src
+            n_wedges=a_indptr[a_src + 1] - np.arange(n_links) - 1)
+        return self.oriented
+
+    def _split_shards(self, n_shards: int) -> List[Tuple[int, int]]:
+        """Splits the oriented links into ranges of about equally many wedges.
+        """
+        a_cum_wedges = np.cumsum(self.oriented.n_wedges)
+        if len(a_cum_wedges) == 0:
+            return []
+        a_bounds = np.unique(np.concatenate((
+            [0],
+            np.searchsorted(
+                a_cum_wedges,
+                np.linspace(0, a_cum_wedges[-1], n_shards + 1)[1:-1],
+                side="right"),
+            [len(a_cum_wedges)])))
+        return list(zip(a_bounds[:-1].tolist(), a_bounds[1:].tolist()))
+
+    def _iter_triangles(
+            self, pos_start: int = 0, pos_end: Optional[int] = None)\
+                -> Iterator[Tuple[np.ndarray, ...]]:
+        """Enumerates the triangles of the first-link network
+        whose lowest-rank node (pivot) is the source of the oriented links
+        at positions `pos_start` to `pos_end`.
+        Triangles without a link at or after `seq_start` are skipped.
+
+        Yields:
+            Tuple[np.ndarray, ...]: Nodes `u`, `v` and `w` of each triangle
+                and the indices into `first_links` of the links `vw`, `uw` and `uv`
+                (i.e., opposite of `u`, `v` and `w`).
+        """
+        on = self.oriented
+        n_nodes, n_links = len(on.node_by_rank), len(on.keys)
+        pos_end = n_links if pos_end is None else pos_end
+        pos_first = pos_start
+        a_cum_wedges = np.cumsum(on.n_wedges[pos_first:pos_end])
+        while pos_start < pos_end:
+            pos_batch = pos_first + int(np.searchsorted(
+                a_cum_wedges,
+                a_cum_wedges[pos_start - pos_first] - on.n_wedges[pos_start] + self.max_wedges,
+                side="right"))
+            pos_batch = min(max(pos_batch, pos_start + 1), pos_end)
+
+            a_cnt = on.n_wedges[pos_start:pos_batch]
+            a_pos_i = np.repeat(np.arange(pos_start, pos_batch), a_cnt)
+            a_pos_j = a_pos_i + 1 + np.arange(len(a_pos_i))\
+                - np.repeat(np.cumsum(a_cnt) - a_cnt, a_cnt)
+            pos_start = pos_batch
+
+            a_keys_closing = on.dst[a_pos_i] * n_nodes + on.dst[a_pos_j]
+            a_pos_closing = np.searchsorted(on.keys, a_keys_closing)
+            a_pos_closing[a_pos_closing == n_links] = 0
+            a_is_triangle = on.keys[a_pos_closing] == a_keys_closing
+            if self.seq_start > 0:
+                # Triangles of old first links only were counted by a previous run
+                a_seq = self.first_links.seq
+                a_is_triangle &= (a_seq[on.links[a_pos_i]] >= self.seq_start)\
+                    | (a_seq[on.links[a_pos_j]] >= self.seq_start)\
+                    | (a_seq[on.links[a_pos_closing]] >= self.seq_start)
+            if not a_is_triangle.any():
+                continue
+            a_pos_i, a_pos_j = a_pos_i[a_is_triangle], a_pos_j[a_is_triangle]
+            yield (
+                on.node_by_rank[on.src[a_pos_i]],
+                on.node_by_rank[on.dst[a_pos_i]],
+                on.node_by_rank[on.dst[a_pos_j]],
+                on.links[a_pos_closing[a_is_triangle]],
+                on.links[a_pos_j],
+                on.links[a_pos_i])
+
+    def _identify_simplicial(
+            self, a_node_a: np.ndarray, a_node_b: np.ndarray, a_node_c: np.ndarray,
+            a_dates: np.ndarray) -> np.ndarray:
+        """Whether the three nodes appear together in any project of the given dates.
+        """
+        a_keys_date = self._a_keys_collaborator_date
+        a_keys_project = self._a_keys_project_collaborator
+
+        # Projects of `a` on the respective date
+        a_keys_a = (a_node_a << 32) | a_dates
+        a_lo = np.searchsorted(a_keys_date, a_keys_a, side="left")
+        a_cnt = np.searchsorted(a_keys_date, a_keys_a, side="right") - a_lo
+        a_idx = np.repeat(np.arange(len(a_node_a)), a_cnt)
+        a_projects = self.authorships.projects[np.repeat(a_lo, a_cnt)\
+            + np.arange(len(a_idx)) - np.repeat(np.cumsum(a_cnt) - a_cnt, a_cnt)]
+
+        a_is_shared = np.ones(len(a_idx), dtype=bool)
+        for a_node in (a_node_b, a_node_c):
+            a_keys = (a_projects << 32) | a_node[a_idx]
+            a_pos = np.searchsorted(a_keys_project, a_keys)
+            a_pos[a_pos == len(a_keys_project)] = 0
+            a_is_shared &= a_keys_project[a_pos] == a_keys
+        return np.bincount(a_idx[a_is_shared], minlength=len(a_node_a)) > 0
+
+    def _identify_motifs(
+            self, a_node_u: np.ndarray, a_node_v: np.ndarray, a_node_w: np.ndarray,
+            a_link_vw: np.ndarray, a_link_uw: np.ndarray, a_link_uv: np.ndarray)\
+                -> List[Dict[str, Any]]:
+        fl = self.first_links
+        a_nodes = np.stack((a_node_u, a_node_v, a_node_w))
+        a_links_opposite = np.stack((a_link_vw, a_link_uw, a_link_uv))
+
+        # The broker is opposite of the closing (last) link
+        a_range = np.arange(len(a_node_u))
+        a_pos_broker = np.argmax(fl.seq[a_links_opposite], axis=0)
+        a_pos_1, a_pos_2 = (a_pos_broker + 1) % 3, (a_pos_broker + 2) % 3
+        a_link_close = a_links_opposite[a_pos_broker, a_range]
+        a_link_1 = a_links_opposite[a_pos_2, a_range] # Broker - node 1
+        a_link_2 = a_links_opposite[a_pos_1, a_range] # Broker - node 2
+
+        # The initiator is the other node of the first link
+        a_is_first_1 = fl.seq[a_link_1] < fl.seq[a_link_2]
+        a_node_init = np.where(a_is_first_1, a_nodes[a_pos_1, a_range], a_nodes[a_pos_2, a_range])
+        a_node_c = np.where(a_is_first_1, a_nodes[a_pos_2, a_range], a_nodes[a_pos_1, a_range])
+        a_node_broker = a_nodes[a_pos_broker, a_range]
+        a_link_first = np.where(a_is_first_1, a_link_1, a_link_2)
+        a_link_second = np.where(a_is_first_1, a_link_2, a_link_1)
+
+        a_is_simplicial = self._identify_simplicial(
+            a_node_init, a_node_broker, a_node_c, fl.dates[a_link_close])
+
+        motifs = MotifFactory.classify_motifs(
+            a_collaborators=np.stack((a_node_init, a_node_broker, a_node_c)),
+            a_projects=fl.projects[np.stack((a_link_first, a_link_second, a_link_close))],
+            a_dt_open=fl.dates[a_link_second] - fl.dates[a_link_first],
+            a_dt_close=fl.dates[a_link_close] - fl.dates[a_link_second],
+            a_is_simplicial=a_is_simplicial)
+        return MotifFactory.to_rows(motifs)
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """First links and the position and date of the last counted link
+        to continue counting on newly appended dates.
+        """
+        d_state = {f"first_links.{field}": a for field, a in self.first_links._asdict().items()}
+        d_state["n_links"] = np.asarray(self.n_links)
+        d_state["date"] = np.asarray(-1 if self.date_last is None else self.date_last)
+        return d_state
+
+    def set_state(self, d_state: Dict[str, np.ndarray]) -> Optional[int]:
+        """Restores the state of a previous run (see `get_state`).
+        The generator should start at `get_date_start(d_state)`.
+
+        Returns:
+            Optional[int]: The last counted date as day ordinal, `None` if no date was counted.
+        """
+        self._first_links_previous = FirstLinkTable(
+            **{field: d_state[f"first_links.{field}"] for field in FirstLinkTable._fields})
+        self.seq_start = self.n_links = int(d_state["n_links"])
+        date = int(d_state["date"])
+        self.date_last = None if date < 0 else date
+        return self.date_last
+
+    @staticmethod
+    def get_date_start(d_state: Dict[str, np.ndarray]) -> Optional[int]:
+        """Day ordinal to start the generator at to continue the count of a state (see `get_state`).
+        States without a counted date (stored as -1) continue from the start (`None`).
+        """
+        date = int(d_state["date"])
+        return None if date < 0 else date + 1
+
+    @staticmethod
+    def save_state(d_state: Dict[str, np.ndarray], path: str):
+        """Writes a state to a `.npz`-file, replacing an existing file only once complete.
+        """
+        path_tmp = f"{path}.tmp"
+        with open(path_tmp, "wb") as file:
+            np.savez(file, **d_state)
+        os.replace(path_tmp, path)
+
+    @staticmethod
+    def load_state(path: str) -> Dict[str, np.ndarray]:
+        """Loads a state written by `save_state`.
+        """
+        with np.load(path) as data:
+            return dict(data)
+
+    def _get_arrays(self) -> Dict[str, np.ndarray]:
+        d_arrays = {
+            "keys_collaborator_date": self._a_keys_collaborator_date,
+            "keys_project_collaborator": self._a_keys_project_collaborator}
+        for prefix, tpl in (
+                ("first_links", self.first_links),
+                ("authorships", self.authorships),
+                ("oriented", self.oriented)):
+            d_arrays.update({f"{prefix}.{field}": a for field, a in tpl._asdict().items()})
+        return d_arrays
+
+    def _set_arrays(self, d_arrays: Dict[str, np.ndarray]):
+        self._a_keys_collaborator_date = d_arrays["keys_collaborator_date"]
+        self._a_keys_project_collaborator = d_arrays["keys_project_collaborator"]
+        self.first_links, self.authorships, self.oriented = (
+            cls(**{field: d_arrays[f"{prefix}.{field}"] for field in cls._fields})\
+                for prefix, cls in (
+                    ("first_links", FirstLinkTable),
+                    ("authorships", Authorships),
+                    ("oriented", OrientedNetwork)))
+
+    def generate_motifs(self) -> Iterator[List[Dict[str, Any]]]:
+        if self.first_links is None:
+            self.build_first_links()
+        if self.oriented is None:
+            self.orient_network()
+
+        if self.n_workers <= 1:
+            for triangles in self._iter_triangles():
+                yield self._identify_motifs(*triangles)
+            return
+
+        # Several shards per worker to balance the load
+        l_shards = self._split_shards(n_shards=4 * self.n_workers)
+        shm, d_specs = share_arrays(self._get_arrays())
+        try:
+            with mp.get_context("spawn").Pool(
+                    processes=self.n_workers,
+                    initializer=_init_worker,
+                    initargs=(shm.name, d_specs, self.max_wedges, self.seq_start)) as pool:
+                yield from pool.imap_unordered(_identify_motifs_shard, l_shards)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    def integrate_counts(self) -> None:
+        try:
+            for l_motifs in self.generate_motifs():
+                self.sink.write(l_motifs)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Flushes the sink and closes it if it was created by the collector.
+        """
+        if self.sink is None:
+            return
+        if self._owns_sink:
+            self.sink.close()
+        else:
+            self.sink.flush()
+
+# State of worker processes
+_worker_shm: Optional[SharedMemory] = None
+_worker_collector: Optional[BatchInitiationMotifCollector] = None
+
+def _init_worker(
+        name_shm: str, d_specs: Dict[str, Tuple[int, str, Tuple[int, ...]]],
+        max_wedges: int, seq_start: int):
+    global _worker_shm, _worker_collector
+    _worker_shm = SharedMemory(name=name_shm)
+    _worker_collector = BatchInitiationMotifCollector(
+        generator=None, session=None, max_wedges=max_wedges)
+    _worker_collector.seq_start = seq_start
+    _worker_collector._set_arrays(attach_arrays(_worker_shm, d_specs))
+
+def _identify_motifs_shard(shard: Tuple[int, int]) -> List[Dict[str, Any]]:
+    return [motif\
+        for triangles in _worker_collector._iter_triangles(*shard)\
+            for motif in _worker_collector._identify_motifs(*triangles)]
@@ -0,0 +1,159 @@
+"""Checkpoints of the motif collector at date boundaries.
+"""
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import numpy as np
+
+from .motif_collector import InitiationMotifCollector
+from .sql_edge_generator import DateYield
+from ..constants import CN_EVENT_DATE_ADD_AFTER
+
+class MotifCollectorCheckpointer:
+    """Periodically writes snapshots of an `InitiationMotifCollector` after a date was added.
+
+    A snapshot contains the network adjacency, the edge store, the open triangles,
+    the motif counts (`n_motifs`, `n_motifs_clique`)
+    and the last completed date (the generator cursor) as a `.npz`-file.
+    Counting pauses while the state is copied into arrays (see `InitiationMotifCollector.get_state`),
+    which are written by a background thread. The additional memory is thus bounded by the size of these arrays
+    rather than by the dictionaries and objects of the network, which a forked writer would partly duplicate.
+    The longest pause is kept in `seconds_pause_max`
+    (see `scripts/04_benchmarks/benchmark_checkpoint.py` for pauses and memory on synthetic data).
+
+    Checkpoints never wait for the sink of the collector.
+    A snapshot records the number of motifs written to the sink up to its date
+    and replaces the previous snapshot only once the sink committed as many motifs (see `MotifSink.n_committed`).
+    Until then, it is kept as `<path>.pending` and the next checkpoint is postponed.
+    """
+    collector: InitiationMotifCollector
+    path: str
+    every_dates: Optional[int]
+    every_seconds: Optional[float]
+    seconds_pause_max: float # Longest pause of counting by a checkpoint
+
+    _n_dates: int # Dates since the last checkpoint
+    _time_last: float # Time of the last checkpoint
+    _thread: Optional[threading.Thread] # Thread writing the pending snapshot
+    _n_written_pending: Optional[int] # Motifs to be committed before the pending snapshot is valid
+    _error: Optional[BaseException] # Error of writing the pending snapshot
+
+    def __init__(
+            self, collector: InitiationMotifCollector, path: str,
+            every_dates: Optional[int] = None,
+            every_seconds: Optional[float] = None) -> None:
+        """Periodically writes snapshots of a motif collector.
+
+        Args:
+            collector (InitiationMotifCollector): The collector to checkpoint.
+            path (str): Path of the snapshot file (overwritten by each checkpoint).
+            every_dates (Optional[int], optional): Checkpoint after this many dates, by default None
+            every_seconds (Optional[float], optional): Checkpoint after this many seconds, by default None
+        """
+        self.collector = collector
+        self.path = path
+        self.every_dates = every_dates
+        self.every_seconds = every_seconds
+        self.seconds_pause_max = 0.
+
+        self._n_dates = 0
+        self._time_last = time.time()
+        self._thread = None
+        self._n_written_pending = None
+        self._error = None
+
+        # Registered after the collector's handlers to run after the motifs were written
+        self.collector.network.register_event_handler(
+            event=CN_EVENT_DATE_ADD_AFTER,
+            event_handler=lambda date: self._checkpoint(date=date))
+
+    @property
+    def path_pending(self) -> str:
+        return f"{self.path}.pending"
+
+    def _is_due(self) -> bool:
+        return (self.every_dates is not None and self._n_dates >= self.every_dates)\
+            or (self.every_seconds is not None\
+                and time.time() - self._time_last >= self.every_seconds)
+
+    def _checkpoint(self, date: DateYield):
+        self._n_dates += 1
+        self._promote()
+        if not self._is_due() or self._n_written_pending is not None:
+            return
+
+        time_start = time.perf_counter()
+        # Copies, as the arrays of the state may be views on memory which counting continues to modify
+        d_state = {key: np.array(value) for key, value in self.collector.get_state().items()}
+        d_state["date"] = np.asarray(date.date)
+        d_state["network_class"] = np.asarray(type(self.collector.network).__name__)
+        self._n_written_pending = self.collector.sink.n_written
+        self._thread = threading.Thread(
+            target=self._write_snapshot, args=(d_state,), daemon=True)
+        self._thread.start()
+        self.seconds_pause_max = max(self.seconds_pause_max, time.perf_counter() - time_start)
+
+        self._n_dates = 0
+        self._time_last = time.time()
+
+    def _write_snapshot(self, d_state: Dict[str, np.ndarray]):
+        try:
+            with open(self.path_pending, "wb") as file:
+                np.savez(file, **d_state)
+                file.flush()
+                os.fsync(file.fileno())
+        except BaseException as error: # pylint: disable=broad-except
+            self._error = error
+
+    def _promote(self):
+        # Replaces the previous snapshot by the pending one once it is written
+        # and all motifs up to its date are committed
+        if self._n_written_pending is None or self._thread.is_alive():
+            return
+        if self._error is not None:
+            print(f"Writing checkpoint `{self.path}` failed ({self._error!r}).")
+        elif self.collector.sink.n_committed >= self._n_written_pending:
+            os.replace(self.path_pending, self.path)
+        else:
+            return
+        self._thread = None
+        self._n_written_pending = None
+        self._error = None
+
+    def close(self):
+        """Waits for the pending snapshot to be written.
+        It replaces the previous snapshot if the sink committed all motifs up to its date,
+        thus, the sink should be flushed beforehand (e.g., by `InitiationMotifCollector.integrate_counts`).
+        """
+        if self._thread is not None:
+            self._thread.join()
+        self._promote()
+        if self._n_written_pending is not None:
+            print((f"Checkpoint `{self.path_pending}` was not used "
+                   "as the sink did not commit all motifs up to its date."))
+            self._thread = None
+            self._n_written_pending = None
+
+    @staticmethod
+    def load(path: str) -> Dict[str, np.ndarray]:
+        """Loads a snapshot.
+        """
+        with np.load(path) as data:
+            return dict(data)
+
+    @staticmethod
+    def restore(collector: InitiationMotifCollector, d_state: Dict[str, np.ndarray]) -> int:
+        """Restores a collector (and its network) from a snapshot.
+        The generator of the network should start at the returned date + 1.
+
+        Returns:
+            int: The last completed date as day ordinal.
+        """
+        network_class = str(d_state["network_class"])
+        if network_class != type(collector.network).__name__:
+            raise ValueError(
+                f"Snapshot of `{network_class}` does not match `{type(collector.network).__name__}`.")
+        collector.set_state(d_state)
+        return int(d_state["date"])
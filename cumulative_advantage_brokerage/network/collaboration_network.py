@@ -1,68 +1,122 @@
 from collections import defaultdict
 from typing import Any, abstractmethod, Callable, Dict, List, Tuple, Set
 
-from .sql_edge_generator import SQLEdgeGenerator
+from .sql_edge_generator import EdgeGenerator
 from ..constants import\
     CN_EVENT_NODE_ADD_BEFORE,CN_EVENT_NODE_ADD_AFTER,\
     CN_EVENT_LINK_ADD_BEFORE,CN_EVENT_LINK_ADD_AFTER,\
     CN_EVENT_PROJECT_ADD_BEFORE,CN_EVENT_PROJECT_ADD_AFTER,\
-    CN_EVENT_DATE_ADD_BEFORE,CN_EVENT_DATE_ADD_AFTER
+    CN_EVENT_DATE_ADD_BEFORE,CN_EVENT_DATE_ADD_AFTER,\
+    CN_EVENT_CLIQUE_ADD_BEFORE,CN_EVENT_CLIQUE_ADD_AFTER
+
+# Event -> instance attribute holding the compiled dispatcher of the event
+EVENT_DISPATCHERS = {
+    CN_EVENT_NODE_ADD_BEFORE: "_dispatch_node_add_before",
+    CN_EVENT_NODE_ADD_AFTER: "_dispatch_node_add_after",
+    CN_EVENT_LINK_ADD_BEFORE: "_dispatch_link_add_before",
+    CN_EVENT_LINK_ADD_AFTER: "_dispatch_link_add_after",
+    CN_EVENT_PROJECT_ADD_BEFORE: "_dispatch_project_add_before",
+    CN_EVENT_PROJECT_ADD_AFTER: "_dispatch_project_add_after",
+    CN_EVENT_DATE_ADD_BEFORE: "_dispatch_date_add_before",
+    CN_EVENT_DATE_ADD_AFTER: "_dispatch_date_add_after",
+    CN_EVENT_CLIQUE_ADD_BEFORE: "_dispatch_clique_add_before",
+    CN_EVENT_CLIQUE_ADD_AFTER: "_dispatch_clique_add_after",
+}
+
+def _dispatch_nothing(*args):
+    pass
+
+def compile_dispatcher(l_handlers: List[Callable[..., Any]]) -> Callable[..., Any]:
+    """Binds the handlers of an event into a single callable.
+    Events without handlers dispatch to a no-op and events with a single handler
+    dispatch to the handler itself, avoiding the loop over the listeners.
+    """
+    t_handlers = tuple(l_handlers)
+    if len(t_handlers) == 0:
+        return _dispatch_nothing
+    if len(t_handlers) == 1:
+        return t_handlers[0]
+    def f_dispatch(*args):
+        for f_handler in t_handlers:
+            f_handler(*args)
+    return f_dispatch
 
 class CollaborationNetwork:
+    """Network grown by nodes, links, projects and dates which emits an event before and after each.
+
+    Handlers are called with positional arguments in the order
+    `(node, node_attr)`, `(link, link_attr)`, `(project, project_attr)` or `(date,)`.
+    Clique events are called as project events, see `GrowingTemporalNetwork`.
+    The handlers of an event are compiled into a dispatcher when they are registered
+    (see `compile_dispatcher`), so that emitting an event costs a single call.
+    Dispatch wrappers (e.g., profilers, see `add_dispatch_wrapper`) are composed around the compiled dispatchers.
+    """
     network: Any
-    generator: SQLEdgeGenerator
+    generator: EdgeGenerator
 
-    _event_listeners: Dict[str, Callable[[Any], Any]]
+    _event_listeners: Dict[str, List[Callable[..., Any]]]
+    _dispatch_wrappers: List[Callable[[str, Callable[..., Any]], Callable[..., Any]]]
 
-    def __init__(self, generator: SQLEdgeGenerator) -> None:
-        self._event_listeners: Dict[str, List[Callable[[Any], Any]]] = defaultdict(list)
+    def __init__(self, generator: EdgeGenerator) -> None:
+        self._event_listeners = defaultdict(list)
+        self._dispatch_wrappers = []
         self.generator = generator
+        self._compile_dispatchers()
 
     @classmethod
     @abstractmethod
-    def from_generator(cls, generator: SQLEdgeGenerator):
+    def from_generator(cls, generator: EdgeGenerator):
         raise NotImplementedError
 
-    def register_event_handler(self, event: str, event_handler: Callable[[Any], Any]):
+    def register_event_handler(self, event: str, event_handler: Callable[..., Any]):
         self._event_listeners[event].append(event_handler)
+        self._compile_dispatcher(event)
+
+    def add_dispatch_wrapper(
+            self,
+            dispatch_wrapper: Callable[[str, Callable[..., Any]], Callable[..., Any]]):
+        """Wraps the dispatcher of every event, e.g., for profiling.
+        Several wrappers are composed in the order they were added,
+        so each one wraps the dispatchers as wrapped by the previous ones.
+
+        Args:
+            dispatch_wrapper (Callable[[str, Callable[..., Any]], Callable[..., Any]]):
+                Called with the event and its (wrapped) dispatcher, returns the dispatcher to use.
+        """
+        self._dispatch_wrappers.append(dispatch_wrapper)
+        self._compile_dispatchers()
+
+    def remove_dispatch_wrapper(
+            self,
+            dispatch_wrapper: Callable[[str, Callable[..., Any]], Callable[..., Any]]):
+        """Removes a wrapper added by `add_dispatch_wrapper`, keeping all others.
+        """
+        self._dispatch_wrappers.remove(dispatch_wrapper)
+        self._compile_dispatchers()
 
     def add_node(self, node: Any, node_attr: Any) -> int:
-        self._execute_event_handlers(
-            node=node, node_attr=node_attr,
-            event=CN_EVENT_NODE_ADD_BEFORE)
+        self._dispatch_node_add_before(node, node_attr)
         node = self._add_node(node=node, node_attr=node_attr)
-        self._execute_event_handlers(
-            node=node, node_attr=node_attr,
-            event=CN_EVENT_NODE_ADD_AFTER)
+        self._dispatch_node_add_after(node, node_attr)
         return node
 
     def add_link(self, link: Tuple[int, int], link_attr: Any) -> Tuple[int, int]:
-        self._execute_event_handlers(
-            link=link, link_attr=link_attr,
-            event=CN_EVENT_LINK_ADD_BEFORE)
+        self._dispatch_link_add_before(link, link_attr)
         link = self._add_link(link=link, link_attr=link_attr)
-        self._execute_event_handlers(
-            link=link, link_attr=link_attr,
-            event=CN_EVENT_LINK_ADD_AFTER)
+        self._dispatch_link_add_after(link, link_attr)
         return link
 
     def add_project(self, project: Set[int], project_attr: Any) -> Set[int]:
-        self._execute_event_handlers(
-            project=project, project_attr=project_attr,
-            event=CN_EVENT_PROJECT_ADD_BEFORE)
+        self._dispatch_project_add_before(project, project_attr)
         project = self._add_project(
             project=project, project_attr=project_attr)
-        self._execute_event_handlers(
-            project=project, project_attr=project_attr,
-            event=CN_EVENT_PROJECT_ADD_AFTER)
+        self._dispatch_project_add_after(project, project_attr)
         return project
 
     def add_date(self, date: Any) -> Any:
-        self._execute_event_handlers(
-            date=date, event=CN_EVENT_DATE_ADD_BEFORE)
+        self._dispatch_date_add_before(date)
         date = self._add_date(date=date)
-        self._execute_event_handlers(
-            date=date, event=CN_EVENT_DATE_ADD_AFTER)
+        self._dispatch_date_add_after(date)
         return date
 
     @abstractmethod
@@ -81,6 +135,12 @@ class CollaborationNetwork:
     def _add_date(self, date: Any) -> Any:
         raise NotImplementedError
 
-    def _execute_event_handlers(self, event: str, **kwargs):
-        for f_handler in self._event_listeners[event]:
-            f_handler(**kwargs)
+    def _compile_dispatcher(self, event: str):
+        f_dispatch = compile_dispatcher(self._event_listeners.get(event, []))
+        for dispatch_wrapper in self._dispatch_wrappers:
+            f_dispatch = dispatch_wrapper(event, f_dispatch)
+        setattr(self, EVENT_DISPATCHERS[event], f_dispatch)
+
+    def _compile_dispatchers(self):
+        for event in EVENT_DISPATCHERS:
+            self._compile_dispatcher(event)
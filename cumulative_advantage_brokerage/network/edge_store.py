@@ -0,0 +1,178 @@
+"""Storage of link attributes with configurable edge history.
+"""
+from abc import abstractmethod
+from typing import Dict, List, NamedTuple, Optional
+
+import numpy as np
+
+from .array_utils import grow
+from ..constants import\
+    EDGE_HISTORY_ALL, EDGE_HISTORY_FIRST, EDGE_HISTORY_COUNT_FIRST
+
+class FirstLink(NamedTuple):
+    """Attributes of the first link between a node pair.
+    """
+    id_project: int
+    date: int # Day ordinal
+    multiplicity: Optional[int] # Number of links, `None` if not tracked
+
+class EdgeStore:
+    """Stores the attributes of links between node pairs by link index.
+    Link indices are assigned consecutively by the network, starting at zero.
+    """
+    n_links: int
+
+    def __init__(self) -> None:
+        self.n_links = 0
+
+    @abstractmethod
+    def append(self, idx_link: int, link_attr) -> None:
+        """Adds a link to the pair with index `idx_link`.
+        If `idx_link == n_links`, the pair is new.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def first(self, idx_link: int) -> FirstLink:
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Snapshot of the stored links as arrays.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def set_state(self, d_state: Dict[str, np.ndarray]) -> None:
+        """Restores the stored links from a snapshot of `get_state`.
+        """
+        raise NotImplementedError
+
+class AllLinksEdgeStore(EdgeStore):
+    """Keeps the full history of `LinkAttribute`s of each pair.
+    """
+    links: List[List]
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.links = []
+
+    def append(self, idx_link: int, link_attr) -> None:
+        if idx_link == self.n_links:
+            self.links.append([])
+            self.n_links += 1
+        self.links[idx_link].append(link_attr)
+
+    def first(self, idx_link: int) -> FirstLink:
+        links = self.links[idx_link]
+        return FirstLink(
+            id_project=links[0].id_project,
+            date=links[0].date,
+            multiplicity=len(links))
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        l_links = [link_attr for links in self.links for link_attr in links]
+        n = len(l_links)
+        return {
+            "multiplicity": np.fromiter(
+                (len(links) for links in self.links), dtype=np.int32, count=self.n_links),
+            "id_collaboration_u": np.fromiter(
+                (l.id_collaboration_u for l in l_links), dtype=np.int64, count=n),
+            "id_collaboration_v": np.fromiter(
+                (l.id_collaboration_v for l in l_links), dtype=np.int64, count=n),
+            "id_project": np.fromiter(
+                (l.id_project for l in l_links), dtype=np.int64, count=n),
+            "timestamp": np.fromiter(
+                (l.date for l in l_links), dtype=np.int32, count=n)}
+
+    def set_state(self, d_state: Dict[str, np.ndarray]) -> None:
+        # Avoids circular import
+        from .growing_temporal_linked_list_network import LinkAttribute
+
+        if "id_collaboration_u" not in d_state:
+            raise ValueError("Snapshot does not match the edge history policy.")
+
+        l_links = [
+            LinkAttribute(
+                id_collaboration_u=id_collab_u,
+                id_collaboration_v=id_collab_v,
+                id_project=id_project,
+                date=date)\
+                    for id_collab_u, id_collab_v, id_project, date in zip(
+                        d_state["id_collaboration_u"].tolist(),
+                        d_state["id_collaboration_v"].tolist(),
+                        d_state["id_project"].tolist(),
+                        d_state["timestamp"].tolist())]
+        a_bounds = np.concatenate(([0], np.cumsum(d_state["multiplicity"]))).tolist()
+        self.links = [l_links[i_start:i_end] for i_start, i_end in zip(a_bounds[:-1], a_bounds[1:])]
+        self.n_links = len(self.links)
+
+class FirstLinkEdgeStore(EdgeStore):
+    """Keeps only the project and date (as day ordinal) of the first link of each pair
+    and, optionally, the number of links in a struct-of-arrays.
+    """
+    count: bool
+    _a_project: np.ndarray
+    _a_date: np.ndarray
+    _a_multiplicity: Optional[np.ndarray]
+
+    def __init__(self, count: bool = False) -> None:
+        super().__init__()
+        self.count = count
+        self._a_project = np.zeros(0, dtype=np.int64)
+        self._a_date = np.zeros(0, dtype=np.int32)
+        self._a_multiplicity = np.zeros(0, dtype=np.int32) if count else None
+
+    def append(self, idx_link: int, link_attr) -> None:
+        if idx_link == self.n_links:
+            self.n_links += 1
+            self._a_project = grow(self._a_project, self.n_links)
+            self._a_date = grow(self._a_date, self.n_links)
+            self._a_project[idx_link] = link_attr.id_project
+            self._a_date[idx_link] = link_attr.date
+            if self.count:
+                self._a_multiplicity = grow(self._a_multiplicity, self.n_links)
+        if self.count:
+            self._a_multiplicity[idx_link] += 1
+
+    def first(self, idx_link: int) -> FirstLink:
+        return FirstLink(
+            id_project=self._a_project.item(idx_link),
+            date=self._a_date.item(idx_link),
+            multiplicity=self._a_multiplicity.item(idx_link) if self.count else None)
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        d_state = {
+            "project": self._a_project[:self.n_links],
+            "timestamp": self._a_date[:self.n_links]}
+        if self.count:
+            d_state["multiplicity"] = self._a_multiplicity[:self.n_links]
+        return d_state
+
+    def set_state(self, d_state: Dict[str, np.ndarray]) -> None:
+        if "project" not in d_state or self.count != ("multiplicity" in d_state):
+            raise ValueError("Snapshot does not match the edge history policy.")
+        self._a_project = d_state["project"].astype(np.int64)
+        self._a_date = d_state["timestamp"].astype(np.int32)
+        if self.count:
+            self._a_multiplicity = d_state["multiplicity"].astype(np.int32)
+        self.n_links = len(self._a_project)
+
+def create_edge_store(edge_history: str) -> EdgeStore:
+    """Creates the edge store for an edge history policy.
+
+    Args:
+        edge_history (str): One of `EDGE_HISTORY_ALL` (all links),
+            `EDGE_HISTORY_FIRST` (first link only) or
+            `EDGE_HISTORY_COUNT_FIRST` (first link and number of links).
+
+    Returns:
+        EdgeStore: The respective edge store.
+    """
+    if edge_history == EDGE_HISTORY_ALL:
+        return AllLinksEdgeStore()
+    if edge_history == EDGE_HISTORY_FIRST:
+        return FirstLinkEdgeStore(count=False)
+    if edge_history == EDGE_HISTORY_COUNT_FIRST:
+        return FirstLinkEdgeStore(count=True)
+    raise ValueError(f"Unknown edge history policy `{edge_history}`.")
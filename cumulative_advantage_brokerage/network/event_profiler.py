@@ -0,0 +1,149 @@
+"""Opt-in profiling of the event dispatch of collaboration networks.
+"""
+import csv
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Optional
+
+from .collaboration_network import CollaborationNetwork
+from ..constants import\
+    CN_EVENT_LINK_ADD_AFTER, CN_EVENT_DATE_ADD_BEFORE, CN_EVENT_DATE_ADD_AFTER
+
+COLUMNS_DATE = ("date", "wall_time", "n_links", "n_open", "n_closed")
+
+class EventProfiler:
+    """Records call counts and cumulative handler time per event type
+    and the wall time, links added, open triangles (wedges) and closed triangles per date.
+
+    When attached, the dispatchers of the network instance are wrapped by instrumented ones
+    (see `CollaborationNetwork.add_dispatch_wrapper`).
+    Networks without a profiler thus keep the plain dispatchers without any overhead.
+    Several profilers can be attached to the same network (e.g., one per collector)
+    and each records all events of the network.
+    The handler time of a profiler includes the overhead of the profilers attached before it.
+    Per-date statistics are written as rows to `path_csv` (if given)
+    and summarized as a log line every `every_dates` dates.
+    """
+    path_csv: Optional[str]
+    every_dates: int
+
+    network: Optional[CollaborationNetwork]
+    collector: Optional[Any] # `InitiationMotifCollector` for open and closed triangles
+
+    d_calls: Dict[str, int] # Event -> number of dispatches
+    d_time: Dict[str, float] # Event -> cumulative handler time in seconds
+    n_dates: int
+    time_dates: float # Cumulative wall time of dates in seconds
+
+    _time_date_start: float
+    _n_links_date_start: int
+    _n_closed_date_start: int
+    _l_rows: List[tuple] # Per-date rows since the last log line
+    _file: Any
+    _writer: Any
+
+    def __init__(self, path_csv: Optional[str] = None, every_dates: int = 1000) -> None:
+        self.path_csv = path_csv
+        self.every_dates = every_dates
+        self.network = None
+        self.collector = None
+        self.d_calls = defaultdict(int)
+        self.d_time = defaultdict(float)
+        self.n_dates = 0
+        self.time_dates = 0.
+        self._time_date_start = 0.
+        self._n_links_date_start = 0
+        self._n_closed_date_start = 0
+        self._l_rows = []
+        self._file, self._writer = None, None
+
+    def attach(self, network: CollaborationNetwork, collector: Optional[Any] = None):
+        """Instruments the event dispatch of `network`.
+
+        Args:
+            network (CollaborationNetwork): The network to profile.
+            collector (Optional[Any], optional): Motif collector on the network
+                to record open and closed triangles, by default None
+        """
+        self.network = network
+        self.collector = collector
+        network.add_dispatch_wrapper(self._wrap_dispatcher)
+        if self.path_csv is not None:
+            self._file = open(self.path_csv, "w", encoding="utf-8", newline="")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(COLUMNS_DATE)
+
+    def _wrap_dispatcher(self, event: str, f_dispatch: Callable[..., Any]) -> Callable[..., Any]:
+        def f_profiled(*args):
+            if event == CN_EVENT_DATE_ADD_BEFORE:
+                self._start_date()
+            time_start = time.perf_counter()
+            f_dispatch(*args)
+            self.d_time[event] += time.perf_counter() - time_start
+            self.d_calls[event] += 1
+            if event == CN_EVENT_DATE_ADD_AFTER:
+                self._finish_date(args[0])
+        return f_profiled
+
+    def _get_n_closed(self) -> int:
+        return 0 if self.collector is None else self.collector.n_motifs
+
+    def _start_date(self):
+        self._time_date_start = time.perf_counter()
+        self._n_links_date_start = self.d_calls[CN_EVENT_LINK_ADD_AFTER]
+        self._n_closed_date_start = self._get_n_closed()
+
+    def _finish_date(self, date: Any):
+        wall_time = time.perf_counter() - self._time_date_start
+        self.n_dates += 1
+        self.time_dates += wall_time
+        row = (
+            date.timestamp.date().isoformat(),
+            wall_time,
+            self.d_calls[CN_EVENT_LINK_ADD_AFTER] - self._n_links_date_start,
+            0 if self.collector is None else self.collector.triangles_open.n_open,
+            self._get_n_closed() - self._n_closed_date_start)
+        if self._writer is not None:
+            self._writer.writerow(row)
+        self._l_rows.append(row)
+        if len(self._l_rows) >= self.every_dates:
+            self._log()
+
+    def _log(self):
+        if len(self._l_rows) == 0:
+            return
+        wall_time = sum(row[1] for row in self._l_rows)
+        n_links = sum(row[2] for row in self._l_rows)
+        n_closed = sum(row[4] for row in self._l_rows)
+        print((f"date={self._l_rows[-1][0]} dates={self.n_dates} "
+               f"wall_time={wall_time:.2f}s links={n_links} "
+               f"links_per_s={n_links / max(wall_time, 1e-9):.0f} "
+               f"open={self._l_rows[-1][3]} closed={n_closed}"))
+        self._l_rows = []
+
+    def summary(self) -> str:
+        """Call counts and handler time per event type and totals over all dates.
+        """
+        l_lines = [f"{'event':<28} {'calls':>12} {'time [s]':>10} {'per call [us]':>14}"]
+        for event, n_calls in self.d_calls.items():
+            l_lines.append((
+                f"{event:<28} {n_calls:>12} {self.d_time[event]:>10.2f} "
+                f"{1e6 * self.d_time[event] / max(n_calls, 1):>14.2f}"))
+        l_lines.append((
+            f"{self.n_dates} dates in {self.time_dates:.1f}s, "
+            f"{self.d_calls[CN_EVENT_LINK_ADD_AFTER]} links, "
+            f"{self._get_n_closed()} closed triangles."))
+        return "\n".join(l_lines)
+
+    def close(self):
+        """Logs the remaining dates, prints the summary and removes its wrapper from the dispatchers.
+        """
+        if self.network is None:
+            return
+        self._log()
+        print(self.summary())
+        if self._file is not None:
+            self._file.close()
+            self._file, self._writer = None, None
+        self.network.remove_dispatch_wrapper(self._wrap_dispatcher)
+        self.network = None
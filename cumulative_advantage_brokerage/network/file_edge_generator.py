@@ -0,0 +1,158 @@
+"""Edge generator on column files written from the CSV files of `TransferToCSV`.
+"""
+import os
+from typing import Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .sql_edge_generator import EdgeGenerator, EdgeColumns
+from ..constants import\
+    FILE_NAME_CSV_AUTHORS, FILE_NAME_CSV_AUTHOR_NAMES,\
+    FILE_NAME_CSV_AUTHORSHIPS, FILE_NAME_CSV_PUBLICATIONS
+
+FILE_NAME_GENDER_COLLABORATORS = "gender_collaborators.npy"
+FILE_NAME_GENDER_IDS = "gender_ids.npy"
+ORDINAL_EPOCH = 719163 # Day ordinal of 1970-01-01
+NS_PER_DAY = 86400 * 10**9
+
+def write_columns(folder_csv: str, folder_columns: str):
+    """Writes the ordered collaborations as column files.
+
+    Collaborators, collaborations and projects are selected as by `APSIntegrator`:
+    Only disambiguated authors are kept and authorships are mapped to authors by their names.
+    Collaborations are sorted as by `SQLEdgeGenerator`
+    (by publication timestamp, project ID, collaborator ID and collaboration ID).
+
+    Args:
+        folder_csv (str): Folder of the CSV files written by `TransferToCSV`.
+        folder_columns (str): Folder of the column files.
+    """
+    print(f"Reading CSV files from '{folder_csv}'.")
+    df_authors = pd.read_csv(
+        os.path.join(folder_csv, FILE_NAME_CSV_AUTHORS),
+        usecols=["id_author", "id_gender_nq", "disambiguated"])
+    df_authors = df_authors[df_authors["disambiguated"].astype(str) != "False"]
+    df_author_names = pd.read_csv(
+        os.path.join(folder_csv, FILE_NAME_CSV_AUTHOR_NAMES),
+        usecols=["id_author_name", "id_author"])
+    df_author_names = df_author_names[df_author_names["id_author"].isin(df_authors["id_author"])]
+    df_authorships = pd.read_csv(
+        os.path.join(folder_csv, FILE_NAME_CSV_AUTHORSHIPS),
+        usecols=["id_authorship", "id_publication", "id_author_name"])
+    df_publications = pd.read_csv(
+        os.path.join(folder_csv, FILE_NAME_CSV_PUBLICATIONS),
+        usecols=["id_publication", "timestamp"])
+
+    df_edges = df_authorships\
+        .merge(df_author_names, on="id_author_name")\
+        .merge(df_publications, on="id_publication")
+    a_timestamps = pd.to_datetime(df_edges["timestamp"]).to_numpy(dtype="datetime64[ns]")\
+        .astype(np.int64)
+    a_projects = df_edges["id_publication"].to_numpy(dtype=np.int64)
+    a_collaborators = df_edges["id_author"].to_numpy(dtype=np.int64)
+    a_collaborations = df_edges["id_authorship"].to_numpy(dtype=np.int64)
+    a_order = np.lexsort((a_collaborations, a_collaborators, a_projects, a_timestamps))
+
+    columns = EdgeColumns(
+        dates=(a_timestamps[a_order] // NS_PER_DAY + ORDINAL_EPOCH).astype(np.int32),
+        projects=a_projects[a_order],
+        collaborators=a_collaborators[a_order],
+        collaborations=a_collaborations[a_order])
+
+    os.makedirs(folder_columns, exist_ok=True)
+    for field, a in columns._asdict().items():
+        np.save(os.path.join(folder_columns, f"{field}.npy"), a)
+    np.save(
+        os.path.join(folder_columns, FILE_NAME_GENDER_COLLABORATORS),
+        df_authors["id_author"].to_numpy(dtype=np.int64))
+    np.save(
+        os.path.join(folder_columns, FILE_NAME_GENDER_IDS),
+        df_authors["id_gender_nq"].to_numpy(dtype=np.int64))
+    print(f"Wrote {len(columns.dates)} collaborations to '{folder_columns}'.")
+
+class FileEdgeGenerator(EdgeGenerator):
+    """Generator that yields the same edges as `SQLEdgeGenerator`,
+    but reads them from column files (see `write_columns`) instead of the database.
+
+    Each column is a `.npy`-file which is memory-mapped,
+    such that only the chunks of `chunk_size` rows being yielded are read.
+    Collaborations can be restricted to dates (day ordinals) from `date_start`
+    (inclusive) to `date_end` (exclusive) by binary search on the sorted dates.
+    """
+    folder: str
+    chunk_size: int
+    _columns: EdgeColumns # Memory-mapped columns of all collaborations
+
+    def __init__(self,
+                 folder: str,
+                 chunk_size: int = 100000,
+                 id_collaborators: Optional[List[int]] = None,
+                 date_start: Optional[int] = None,
+                 date_end: Optional[int] = None) -> None:
+        self.folder = folder
+        self.chunk_size = chunk_size
+        self.id_collaborators = id_collaborators
+        self.date_start = date_start
+        self.date_end = date_end
+        self._columns = EdgeColumns(*(
+            np.load(os.path.join(folder, f"{field}.npy"), mmap_mode="r")\
+                for field in EdgeColumns._fields))
+        self.map_collaborator_gender = dict(zip(
+            np.load(os.path.join(folder, FILE_NAME_GENDER_COLLABORATORS)).tolist(),
+            np.load(os.path.join(folder, FILE_NAME_GENDER_IDS)).tolist()))
+
+    @classmethod
+    def from_csv(cls, folder_csv: str, folder: str, **kwargs) -> "FileEdgeGenerator":
+        """Writes the column files unless they exist and opens them.
+        """
+        if not os.path.exists(os.path.join(folder, FILE_NAME_GENDER_IDS)):
+            write_columns(folder_csv=folder_csv, folder_columns=folder)
+        return cls(folder=folder, **kwargs)
+
+    def _select_columns(self, date_start: Optional[int]) -> EdgeColumns:
+        dates = self._columns.dates
+        pos_start = 0 if date_start is None\
+            else int(np.searchsorted(dates, date_start, side="left"))
+        pos_end = len(dates) if self.date_end is None\
+            else int(np.searchsorted(dates, self.date_end, side="left"))
+        columns = self._columns.slice(pos_start, pos_end)
+        if self.id_collaborators is None:
+            return columns
+        a_mask = np.isin(columns.collaborators, self.id_collaborators)
+        return EdgeColumns(*(col[a_mask] for col in columns))
+
+    def iter_columns(self) -> Iterator[EdgeColumns]:
+        """Yields the ordered collaborations in chunks of about `chunk_size` rows.
+        Each chunk ends on a date block boundary.
+
+        Yields:
+            EdgeColumns: Chunk of collaborations.
+        """
+        columns = self._select_columns(self.date_start)
+        n_rows = len(columns.dates)
+        pos_start = 0
+        while pos_start < n_rows:
+            pos_end = pos_start + self.chunk_size
+            if pos_end < n_rows:
+                # Do not split the date block at `pos_end`
+                pos_end = int(np.searchsorted(columns.dates, columns.dates[pos_end], side="left"))
+                if pos_end <= pos_start:
+                    pos_end = int(np.searchsorted(
+                        columns.dates, columns.dates[pos_start], side="right"))
+            pos_end = min(pos_end, n_rows)
+            yield EdgeColumns(*(np.asarray(col[pos_start:pos_end]) for col in columns))
+            pos_start = pos_end
+
+    def get_last_publication_dates(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Retrieves the date of the last publication of each collaborator.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Collaborator IDs and the day ordinals of their last publication.
+        """
+        columns = self._select_columns(None)
+        # Dates are sorted, so the last occurrence of a collaborator is its last publication
+        a_id_collaborator, a_idx = np.unique(columns.collaborators[::-1], return_index=True)
+        return (
+            a_id_collaborator.astype(np.int64),
+            np.asarray(columns.dates[::-1][a_idx], dtype=np.int32))
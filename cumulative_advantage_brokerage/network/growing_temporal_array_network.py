@@ -0,0 +1,145 @@
+"""Growing temporal network backed by compact arrays.
+"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .array_utils import grow, difference_sorted
+from .edge_store import FirstLink
+from .growing_temporal_linked_list_network import\
+    GrowingTemporalNetwork, LinkAttribute
+from .sql_edge_generator import EdgeGenerator, CollaboratorYield
+from ..constants import EDGE_HISTORY_ALL
+
+_CAPACITY_NEIGHBORS_INIT = 4
+
+class GrowingTemporalArrayNetwork(GrowingTemporalNetwork):
+    """Temporally growing network stored in compact arrays.
+
+    Collaborator IDs are remapped to dense node indices.
+    The neighbors of each node are kept in a growable, sorted array
+    which is aligned with the indices of the respective links in `edge_store`.
+    """
+    n_nodes: int
+
+    _a_idx_node: np.ndarray # Collaborator ID -> node index (-1 if unknown)
+    _a_id_node: np.ndarray # Node index -> collaborator ID
+    _a_gender: np.ndarray # Node index -> gender ID
+    _a_degree: np.ndarray # Node index -> number of neighbors
+    _l_neighbors: List[np.ndarray] # Node index -> sorted neighbor node indices
+    _l_links: List[np.ndarray] # Node index -> link indices aligned with neighbors
+
+    def __init__(
+            self, generator: EdgeGenerator,
+            edge_history: str = EDGE_HISTORY_ALL, **kwargs) -> None:
+        super().__init__(generator=generator, edge_history=edge_history, **kwargs)
+        self.n_nodes = 0
+
+        self._a_idx_node = np.full(0, -1, dtype=np.int32)
+        self._a_id_node = np.zeros(0, dtype=np.int64)
+        self._a_gender = np.zeros(0, dtype=np.int8)
+        self._a_degree = np.zeros(0, dtype=np.int32)
+        self._l_neighbors = []
+        self._l_links = []
+
+    def has_node(self, node: int) -> bool:
+        return node < len(self._a_idx_node) and self._a_idx_node.item(node) >= 0
+
+    def neighbors(self, node: int) -> List[int]:
+        idx_node = self._a_idx_node.item(node)
+        return self._a_id_node[
+            self._l_neighbors[idx_node][:self._a_degree.item(idx_node)]].tolist()
+
+    def exclusive_neighbors(self, link: Tuple[int, int])\
+            -> Tuple[List[int], List[int]]:
+        idx_u, idx_v = self._a_idx_node.item(link[0]), self._a_idx_node.item(link[1])
+        neigh_u = self._l_neighbors[idx_u][:self._a_degree.item(idx_u)]
+        neigh_v = self._l_neighbors[idx_v][:self._a_degree.item(idx_v)]
+
+        neigh_u_excl = difference_sorted(neigh_u, neigh_v)
+        neigh_v_excl = difference_sorted(neigh_v, neigh_u)
+        return (
+            self._a_id_node[neigh_u_excl[neigh_u_excl != idx_v]].tolist(),
+            self._a_id_node[neigh_v_excl[neigh_v_excl != idx_u]].tolist())
+
+    def first_link(self, link: Tuple[int, int]) -> FirstLink:
+        return self.edge_store.first(self._get_link_index(
+            self._a_idx_node.item(link[0]), self._a_idx_node.item(link[1])))
+
+    def _get_link_index(self, idx_u: int, idx_v: int) -> int:
+        """Index of the link between two node indices or -1 if they are not linked.
+        """
+        degree = self._a_degree.item(idx_u)
+        neigh = self._l_neighbors[idx_u]
+        pos = neigh[:degree].searchsorted(idx_v).item()
+        if pos < degree and neigh.item(pos) == idx_v:
+            return self._l_links[idx_u].item(pos)
+        return -1
+
+    def _insert_neighbor(self, idx_u: int, idx_v: int, idx_link: int):
+        degree = self._a_degree.item(idx_u)
+        neigh, links = self._l_neighbors[idx_u], self._l_links[idx_u]
+        if degree == len(neigh):
+            neigh = self._l_neighbors[idx_u] = grow(neigh, degree + 1)
+            links = self._l_links[idx_u] = grow(links, degree + 1)
+        pos = neigh[:degree].searchsorted(idx_v).item()
+        neigh[pos + 1:degree + 1] = neigh[pos:degree]
+        links[pos + 1:degree + 1] = links[pos:degree]
+        neigh[pos] = idx_v
+        links[pos] = idx_link
+        self._a_degree[idx_u] = degree + 1
+
+    def _add_link(self, link: Tuple[int, int], link_attr: LinkAttribute) -> Tuple[int, int]:
+        idx_u, idx_v = self._a_idx_node.item(link[0]), self._a_idx_node.item(link[1])
+        idx_link = self._get_link_index(idx_u, idx_v)
+        if idx_link < 0:
+            idx_link = self.edge_store.n_links
+            self._insert_neighbor(idx_u, idx_v, idx_link)
+            self._insert_neighbor(idx_v, idx_u, idx_link)
+        self.edge_store.append(idx_link, link_attr)
+        return link
+
+    def _add_node(self, node: int, node_attr: CollaboratorYield) -> int:
+        idx_node = self.n_nodes
+        self.n_nodes += 1
+        self._a_idx_node = grow(self._a_idx_node, node + 1, fill=-1)
+        self._a_id_node = grow(self._a_id_node, self.n_nodes)
+        self._a_gender = grow(self._a_gender, self.n_nodes)
+        self._a_degree = grow(self._a_degree, self.n_nodes)
+
+        self._a_idx_node[node] = idx_node
+        self._a_id_node[idx_node] = node
+        self._a_gender[idx_node] = node_attr.id_gender
+        self._l_neighbors.append(np.zeros(_CAPACITY_NEIGHBORS_INIT, dtype=np.int32))
+        self._l_links.append(np.zeros(_CAPACITY_NEIGHBORS_INIT, dtype=np.int32))
+        return node
+
+    def _get_adjacency_state(self) -> Dict[str, np.ndarray]:
+        a_degree = self._a_degree[:self.n_nodes]
+        return {
+            "id_node": self._a_id_node[:self.n_nodes],
+            "gender": self._a_gender[:self.n_nodes],
+            "degree": a_degree,
+            "neighbors": np.concatenate([np.zeros(0, dtype=np.int32)] + [
+                neigh[:degree] for neigh, degree in zip(self._l_neighbors, a_degree.tolist())]),
+            "links": np.concatenate([np.zeros(0, dtype=np.int32)] + [
+                links[:degree] for links, degree in zip(self._l_links, a_degree.tolist())])}
+
+    def _set_adjacency_state(self, d_state: Dict[str, np.ndarray]) -> None:
+        self._a_id_node = d_state["id_node"].astype(np.int64)
+        self._a_gender = d_state["gender"].astype(np.int8)
+        self._a_degree = d_state["degree"].astype(np.int32)
+        self.n_nodes = len(self._a_id_node)
+        self._a_idx_node = np.full(int(self._a_id_node.max(initial=-1)) + 1, -1, dtype=np.int32)
+        self._a_idx_node[self._a_id_node] = np.arange(self.n_nodes, dtype=np.int32)
+
+        a_bounds = np.concatenate(([0], np.cumsum(self._a_degree))).tolist()
+        self._l_neighbors, self._l_links = [], []
+        for i_start, i_end in zip(a_bounds[:-1], a_bounds[1:]):
+            capacity = max(_CAPACITY_NEIGHBORS_INIT, i_end - i_start)
+            neigh = np.zeros(capacity, dtype=np.int32)
+            neigh[:i_end - i_start] = d_state["neighbors"][i_start:i_end]
+            links = np.zeros(capacity, dtype=np.int32)
+            links[:i_end - i_start] = d_state["links"][i_start:i_end]
+            self._l_neighbors.append(neigh)
+            self._l_links.append(links)
@@ -1,13 +1,20 @@
 """Growing temporal network.
 """
-from datetime import datetime
+from abc import abstractmethod
 from dataclasses import dataclass
-from typing import Iterator, Dict, Set, List, Tuple, Any
-from itertools import combinations_with_replacement
+from typing import Iterator, Dict, Set, Tuple, Any, Iterable, Optional
+from itertools import combinations_with_replacement, combinations, islice
 
+import numpy as np
+
+from .array_utils import prefix_arrays, select_arrays
 from .collaboration_network import CollaborationNetwork
+from .edge_store import EdgeStore, FirstLink, create_edge_store
 from .sql_edge_generator import\
-    SQLEdgeGenerator, DateYield, CollaboratorYield
+    EdgeGenerator, DateYield, CollaboratorYield
+from ..constants import\
+    EDGE_HISTORY_ALL, PROJECT_SIZE_EXPAND, PROJECT_SIZE_SKIP,\
+    PROJECT_SIZE_CAP, PROJECT_SIZE_CLIQUE, TPL_PROJECT_SIZE_POLICY
 
 @dataclass
 class NodeAttributes:
@@ -16,54 +23,150 @@ class NodeAttributes:
 @dataclass
 class ProjectAttribute:
     id_project: int
-    timestamp: datetime
+    date: int # Day ordinal
 
 @dataclass
 class LinkAttribute:
     id_collaboration_u: int
     id_collaboration_v: int
     id_project: int
-    timestamp: datetime
+    date: int # Day ordinal
 
-class GrowingTemporalLinkedListNetwork(CollaborationNetwork):
-    """Class to generate temporally growing linked list networks.
+class GrowingTemporalNetwork(CollaborationNetwork):
+    """Base class of temporally growing networks.
+    Replays the dates of the generator and expands projects into links.
+    Subclasses define how nodes and adjacency are stored.
+    Link attributes are kept in an `EdgeStore` according to the `edge_history` policy
+    (see `create_edge_store`).
+
+    Projects with more than `max_project_size` collaborators are handled
+    according to the `project_size_policy`:
+    - `PROJECT_SIZE_EXPAND`: Expanded into links of all collaborator pairs (default).
+    - `PROJECT_SIZE_SKIP`: Removed from their date.
+    - `PROJECT_SIZE_CAP`: Reduced to their first `max_project_size` collaborators.
+    - `PROJECT_SIZE_CLIQUE`: Stored as a clique without link events.
+        Instead, the clique events are emitted before and after all links were added,
+        such that handlers can resolve the clique at once (see `InitiationMotifCollector`).
     """
-    network: Dict[int, Set[int]]
-    nodes: Dict[int, NodeAttributes]
-    edges: Dict[Tuple[int, int], List[LinkAttribute]]
+    edge_store: EdgeStore
+    project_size_policy: str
+    max_project_size: Optional[int]
 
-    def __init__(self, generator: SQLEdgeGenerator) -> None:
+    def __init__(
+            self, generator: EdgeGenerator,
+            edge_history: str = EDGE_HISTORY_ALL,
+            project_size_policy: str = PROJECT_SIZE_EXPAND,
+            max_project_size: Optional[int] = None) -> None:
         super().__init__(generator=generator)
-        self.network = dict()
-        self.edges = dict()
-        self.nodes = dict()
+        if project_size_policy not in TPL_PROJECT_SIZE_POLICY:
+            raise ValueError(f"Unknown project size policy `{project_size_policy}`.")
+        if project_size_policy != PROJECT_SIZE_EXPAND and max_project_size is None:
+            raise ValueError(f"Project size policy `{project_size_policy}` requires `max_project_size`.")
+        self.edge_store = create_edge_store(edge_history)
+        self.project_size_policy = project_size_policy
+        self.max_project_size = max_project_size
 
     def generate_network(self) -> Iterator[DateYield]:
         """Generate network by iteratively adding edges.
         Edges are added in a group for each date.
         """
         for date in self.generator.edges():
+            if self.project_size_policy in (PROJECT_SIZE_SKIP, PROJECT_SIZE_CAP):
+                date = self._limit_project_sizes(date)
             yield self.add_date(date=date)
 
+    def is_clique(self, project: Dict[int, int]) -> bool:
+        """Whether a project is stored as a clique (see `PROJECT_SIZE_CLIQUE`).
+        """
+        return self.project_size_policy == PROJECT_SIZE_CLIQUE\
+            and len(project) > self.max_project_size
+
+    def _limit_project_sizes(self, date: DateYield) -> DateYield:
+        collaborations = {}
+        for id_project, project in date.collaborations.items():
+            if len(project) <= self.max_project_size:
+                collaborations[id_project] = project
+            elif self.project_size_policy == PROJECT_SIZE_CAP:
+                collaborations[id_project] = dict(islice(project.items(), self.max_project_size))
+        # Collaborators of removed projects are kept as nodes
+        return DateYield(
+            date=date.date,
+            collaborators=date.collaborators,
+            collaborations=collaborations)
+
     def aggregate_network(self) -> None:
         """Aggregate the whole network.
         """
         for _ in self.generate_network():
             continue
 
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Snapshot of nodes, links and the edge store as arrays.
+        """
+        d_state = self._get_adjacency_state()
+        d_state.update(prefix_arrays(self.edge_store.get_state(), "edge_store"))
+        return d_state
+
+    def set_state(self, d_state: Dict[str, np.ndarray]) -> None:
+        """Restores nodes, links and the edge store from a snapshot of `get_state`.
+        """
+        self._set_adjacency_state(d_state)
+        self.edge_store.set_state(select_arrays(d_state, "edge_store"))
+
+    @abstractmethod
+    def _get_adjacency_state(self) -> Dict[str, np.ndarray]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def _set_adjacency_state(self, d_state: Dict[str, np.ndarray]) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    def has_node(self, node: int) -> bool:
+        raise NotImplementedError
+
+    @abstractmethod
+    def neighbors(self, node: int) -> Iterable[int]:
+        """Neighbors of `node`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def exclusive_neighbors(self, link: Tuple[int, int])\
+            -> Tuple[Iterable[int], Iterable[int]]:
+        """Neighbors of `u` which are not neighbors of `v` and vice versa,
+        both excluding `u` and `v` themselves.
+
+        Args:
+            link (Tuple[int, int]): The node pair `(u, v)`.
+
+        Returns:
+            Tuple[Iterable[int], Iterable[int]]: Exclusive neighbors of `u` and `v`.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def first_link(self, link: Tuple[int, int]) -> FirstLink:
+        """Attributes of the first link between an ordered node pair `u < v`.
+        """
+        raise NotImplementedError
+
     def _add_date(self, date: DateYield) -> DateYield:
         for id_collab, attr_collab in date.collaborators.items():
-            if id_collab not in self.network:
+            if not self.has_node(id_collab):
                 self.add_node(node=id_collab, node_attr=attr_collab)
         for id_project, project in date.collaborations.items():
             self.add_project(
                 project=project,
                 project_attr=ProjectAttribute(
                     id_project=id_project,
-                    timestamp=date.timestamp))
+                    date=date.date))
         return date
 
     def _add_project(self, project: Dict[int, int], project_attr: ProjectAttribute) -> Any:
+        if self.is_clique(project):
+            self._add_clique(project=project, project_attr=project_attr)
+            return project
         for node_u, node_v in combinations_with_replacement(project.keys(), 2):
             if node_u == node_v:
                 continue
@@ -77,18 +180,87 @@ class GrowingTemporalLinkedListNetwork(CollaborationNetwork):
                     id_collaboration_u=project[node_u],
                     id_collaboration_v=project[node_v],
                     id_project=project_attr.id_project,
-                    timestamp=project_attr.timestamp))
+                    date=project_attr.date))
+        return project
+
+    def _add_clique(self, project: Dict[int, int], project_attr: ProjectAttribute):
+        self._dispatch_clique_add_before(project, project_attr)
+        # Collaborators are ordered, so are all pairs
+        for node_u, node_v in combinations(sorted(project.keys()), 2):
+            self._add_link(
+                link=(node_u, node_v),
+                link_attr=LinkAttribute(
+                    id_collaboration_u=project[node_u],
+                    id_collaboration_v=project[node_v],
+                    id_project=project_attr.id_project,
+                    date=project_attr.date))
+        self._dispatch_clique_add_after(project, project_attr)
+
+class GrowingTemporalLinkedListNetwork(GrowingTemporalNetwork):
+    """Class to generate temporally growing linked list networks.
+    """
+    network: Dict[int, Set[int]]
+    nodes: Dict[int, NodeAttributes]
+    edges: Dict[Tuple[int, int], int] # Node pair -> link index in `edge_store`
+
+    def __init__(
+            self, generator: EdgeGenerator,
+            edge_history: str = EDGE_HISTORY_ALL, **kwargs) -> None:
+        super().__init__(generator=generator, edge_history=edge_history, **kwargs)
+        self.network = dict()
+        self.edges = dict()
+        self.nodes = dict()
+
+    def has_node(self, node: int) -> bool:
+        return node in self.network
+
+    def neighbors(self, node: int) -> Set[int]:
+        return self.network[node]
+
+    def exclusive_neighbors(self, link: Tuple[int, int])\
+            -> Tuple[Set[int], Set[int]]:
+        u, v = link
+        neigh_u = self.network[u].difference(link)
+        neigh_v = self.network[v].difference(link)
+        return neigh_u.difference(neigh_v), neigh_v.difference(neigh_u)
+
+    def first_link(self, link: Tuple[int, int]) -> FirstLink:
+        return self.edge_store.first(self.edges[link])
 
     def _add_link(self, link: Tuple[int, int], link_attr: LinkAttribute) -> Any:
         node_u, node_v = link
         if node_v not in self.network[node_u]:
-            self.edges[link] = []
-        self.edges[link].append(link_attr)
-        self.network[node_u].add(node_v)
-        self.network[node_v].add(node_u)
+            self.edges[link] = self.edge_store.n_links
+            self.network[node_u].add(node_v)
+            self.network[node_v].add(node_u)
+        self.edge_store.append(self.edges[link], link_attr)
         return link
 
     def _add_node(self, node: int, node_attr: CollaboratorYield) -> int:
         self.network[node] = set()
         self.nodes[node] = NodeAttributes(node_attr.id_gender)
         return node
+
+    def _get_adjacency_state(self) -> Dict[str, np.ndarray]:
+        n_nodes, n_edges = len(self.nodes), len(self.edges)
+        return {
+            "nodes": np.fromiter(self.nodes.keys(), dtype=np.int64, count=n_nodes),
+            "genders": np.fromiter(
+                (attr.id_gender for attr in self.nodes.values()), dtype=np.int64, count=n_nodes),
+            "links_u": np.fromiter((u for u, _ in self.edges), dtype=np.int64, count=n_edges),
+            "links_v": np.fromiter((v for _, v in self.edges), dtype=np.int64, count=n_edges),
+            "links_idx": np.fromiter(self.edges.values(), dtype=np.int64, count=n_edges)}
+
+    def _set_adjacency_state(self, d_state: Dict[str, np.ndarray]) -> None:
+        l_nodes = d_state["nodes"].tolist()
+        self.nodes = {node: NodeAttributes(id_gender)\
+            for node, id_gender in zip(l_nodes, d_state["genders"].tolist())}
+        self.network = {node: set() for node in l_nodes}
+        self.edges = {}
+        for u, v, idx_link in zip(
+                d_state["links_u"].tolist(),
+                d_state["links_v"].tolist(),
+                d_state["links_idx"].tolist()):
+            self.network[u].add(v)
+            self.network[v].add(u)
+            self.edges[(u, v)] = idx_link
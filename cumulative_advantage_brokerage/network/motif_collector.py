@@ -1,28 +1,25 @@
-from typing import Iterator, Tuple, Dict, NamedTuple, List, Any
-from datetime import datetime
+from typing import Iterator, Tuple, Dict, List, Any, Optional, Set
 from collections import defaultdict
+from itertools import combinations
+from math import comb
 
-from sqlalchemy.dialects.postgresql import insert
+import numpy as np
 
+from .array_utils import prefix_arrays, select_arrays
 from .motif_factory import MotifFactory
+from .motif_sink import MotifSink, PostgresCopyMotifSink
+from .event_profiler import EventProfiler
+from .open_triangle_store import OpenTriangle, OpenTriangleStore
 from ..dbm import\
-    HasSession, CumAdvBrokSession, BaseTriadicClosureMotif
+    HasSession, CumAdvBrokSession
 from ..constants import\
     CN_EVENT_LINK_ADD_AFTER, CN_EVENT_LINK_ADD_BEFORE,\
     CN_EVENT_PROJECT_ADD_BEFORE, CN_EVENT_DATE_ADD_BEFORE,\
-    CN_EVENT_DATE_ADD_AFTER
+    CN_EVENT_DATE_ADD_AFTER, CN_EVENT_CLIQUE_ADD_BEFORE
 from .growing_temporal_linked_list_network import\
-    GrowingTemporalLinkedListNetwork, LinkAttribute,\
+    GrowingTemporalNetwork, LinkAttribute,\
     ProjectAttribute, DateYield
 
-_OpenTriangle = NamedTuple(
-    "_OpenTriangle",
-    node_init=int,
-    id_project_ab=int,
-    id_project_bc=int,
-    t_first=datetime,
-    t_second=datetime)
-
 class InitiationMotifCollector(HasSession):
     """Implements a motif counter with the following specifications:
     - Currency:
@@ -34,98 +31,150 @@ class InitiationMotifCollector(HasSession):
     - Simplicial dominance:
         In case both a simplicial and regular closure
         appear on the same date, only the simplicial is counted.
+
+    Open triangles are removed from memory once they are closed.
+    With `evict_inactive=True`, they are also removed as soon as one node
+    of the open pair published for the last time, because they can never close.
+
+    The motifs of each date are written to `sink`,
+    by default a `PostgresCopyMotifSink` on the engine of the session,
+    which is closed by `close` (given sinks are only flushed).
+    Several collectors can count on one replay of the same network (see `MotifCollectorGroup`).
+    With a `profiler`, the event dispatch of the network is instrumented
+    and summarized at the end of `integrate_counts`.
+
+    Projects which the network stores as cliques (see `PROJECT_SIZE_CLIQUE`)
+    are resolved at once instead of per link (see `_resolve_clique`).
+    Triangles that open and close within such a project are counted in `n_motifs_clique`,
+    but not written.
     """
-    network: GrowingTemporalLinkedListNetwork
+    network: GrowingTemporalNetwork
 
-    _triangles_open: Dict[Tuple[int, int], Dict[int, _OpenTriangle]]
+    triangles_open: OpenTriangleStore
 
     _id_current_project: int
-    _d_current_date_projects: Dict[int, Dict[int,int]]
+    _date_current: int # Day ordinal of the current date
+    # Maps collaborators to the projects they publish on the current date
+    _d_current_date_collaborator_projects: Dict[int, Set[int]]
+
+    _l_motifs: List[Dict[str, Any]] # Motifs of the current date
+    _l_motifs_last: List[Dict[str, Any]] # Motifs of the last completed date
+    n_motifs: int # Number of motifs of all completed dates
+    n_motifs_clique: int # Number of motifs within cliques, which are not written
+    sink: MotifSink
+    profiler: Optional[EventProfiler]
 
-    _motif_factory: MotifFactory
-    _l_motifs: List[Dict[str, Any]]
+    _owns_sink: bool # Whether the sink was created by the collector
 
     def __init__(
-            self, network: GrowingTemporalLinkedListNetwork,
-            session: CumAdvBrokSession, **kwargs) -> None:
+            self, network: GrowingTemporalNetwork,
+            session: CumAdvBrokSession,
+            evict_inactive: bool = True,
+            sink: Optional[MotifSink] = None,
+            profiler: Optional[EventProfiler] = None,
+            last_publication_dates: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+            **kwargs) -> None:
         self.network = network
+        self._owns_sink = sink is None
+        self.sink = PostgresCopyMotifSink(engine=session.get_bind())\
+            if sink is None else sink
 
-        self._triangles_open = defaultdict(dict)
-        self._d_current_date_projects: Dict[int, Dict[int,int]] = {}
+        if evict_inactive:
+            # May be passed to share them between collectors on the same generator
+            a_id_collaborator, a_last_date = self.network.generator.get_last_publication_dates()\
+                if last_publication_dates is None else last_publication_dates
+            self.triangles_open = OpenTriangleStore(
+                a_id_collaborator=a_id_collaborator, a_last_date=a_last_date)
+        else:
+            self.triangles_open = OpenTriangleStore()
+        self._d_current_date_collaborator_projects: Dict[int, Set[int]] = {}
 
         self._register_event_handlers()
 
-        self._motif_factory = MotifFactory(session=session)
         self._l_motifs = []
+        self._l_motifs_last = []
+        self.n_motifs = 0
+        self.n_motifs_clique = 0
+
+        self.profiler = profiler
+        if self.profiler is not None:
+            self.profiler.attach(network=self.network, collector=self)
 
         super().__init__(session=session, **kwargs)
 
     def _register_event_handlers(self):
+        # Bound methods are dispatched directly, without a wrapping call per event
         self.network.register_event_handler(
             event=CN_EVENT_LINK_ADD_AFTER,
-            event_handler=lambda link, link_attr: self._identify_triangle_opening(
-                link=link, link_attr=link_attr))
+            event_handler=self._identify_triangle_opening)
         self.network.register_event_handler(
             event=CN_EVENT_LINK_ADD_BEFORE,
-            event_handler=lambda link, link_attr: self._identify_triangle_closure(
-                link=link, link_attr=link_attr))
+            event_handler=self._identify_triangle_closure)
         self.network.register_event_handler(
             event=CN_EVENT_PROJECT_ADD_BEFORE,
-            event_handler=lambda project, project_attr: self._register_current_project(
-                project_attr=project_attr))
+            event_handler=self._register_current_project)
         self.network.register_event_handler(
             event=CN_EVENT_DATE_ADD_BEFORE,
-            event_handler=lambda date: self._register_current_date(
-                date=date))
+            event_handler=self._register_current_date)
         self.network.register_event_handler(
             event=CN_EVENT_DATE_ADD_AFTER,
-            event_handler=lambda date: self._commit_motifs())
+            event_handler=self._finalize_current_date)
+        self.network.register_event_handler(
+            event=CN_EVENT_CLIQUE_ADD_BEFORE,
+            event_handler=self._resolve_clique)
 
     def _identify_triangle_opening(self, link: Tuple[int, int], link_attr: LinkAttribute) -> None:
         u, v = link
-        neigh_u = self.network.network[u].difference({u,v})
-        neigh_v = self.network.network[v].difference({u,v})
+        neigh_u_excl, neigh_v_excl = self.network.exclusive_neighbors(link)
 
-        for w in neigh_u.difference(neigh_v):
+        for w in neigh_u_excl:
             tpl_open = (v,w) if v < w else (w,v)
             tpl_init = (u,w) if u < w else (w,u)
 
             # Initiation focus
-            if (tpl_open in self._triangles_open) and (u in self._triangles_open[tpl_open]):
+            if self.triangles_open.contains(tpl_open, u):
                 continue
 
-            link_uw_attr = self.network.edges[tpl_init][0]
-            self._triangles_open[tpl_open][u] = _OpenTriangle(
+            link_uw_attr = self.network.first_link(tpl_init)
+            self.triangles_open.add(tpl_open, u, OpenTriangle(
                 node_init=w,
                 id_project_ab=link_uw_attr.id_project,
                 id_project_bc=link_attr.id_project,
-                t_first=link_uw_attr.timestamp,
-                t_second=link_attr.timestamp
-            )
-        for w in neigh_v.difference(neigh_u):
+                t_first=link_uw_attr.date,
+                t_second=link_attr.date
+            ), self._date_current)
+        for w in neigh_v_excl:
             tpl_open = (u,w) if u < w else (w,u)
             tpl_init = (v,w) if v < w else (w,v)
 
             # Initiation focus:
             # If the triangle is open already, don't(!) overwrite it
-            if (tpl_open in self._triangles_open) and (v in self._triangles_open[tpl_open]):
+            if self.triangles_open.contains(tpl_open, v):
                 continue
 
-            link_vw_attr = self.network.edges[tpl_init][0]
-            self._triangles_open[tpl_open][v] = _OpenTriangle(
+            link_vw_attr = self.network.first_link(tpl_init)
+            self.triangles_open.add(tpl_open, v, OpenTriangle(
                 node_init=w,
                 id_project_ab=link_vw_attr.id_project,
                 id_project_bc=link_attr.id_project,
-                t_first=link_vw_attr.timestamp,
-                t_second=link_attr.timestamp
-            )
+                t_first=link_vw_attr.date,
+                t_second=link_attr.date
+            ), self._date_current)
 
     def _identify_triangle_closure(self, link: Tuple[int, int], link_attr: LinkAttribute) -> None:
         u, v = link
         if u == v:
             return
-        if (u,v) in self._triangles_open and self._triangles_open[(u,v)] is not None:
-            for node_broker, triangle in self._triangles_open[(u,v)].items():
+        self._close_triangles(u, v, link_attr.date)
+
+    def _close_triangles(self, u: int, v: int, date: int) -> None:
+        # Closed pairs are removed and can never reopen
+        # as opening only considers non-adjacent pairs
+        if (u,v) in self.triangles_open:
+            # Projects of the current date which contain both `u` and `v`
+            s_projects_uv = self._d_current_date_collaborator_projects[u]\
+                .intersection(self._d_current_date_collaborator_projects[v])
+            for node_broker, triangle in self.triangles_open.pop((u,v)):
                 tpl_collaborators = (
                     triangle.node_init,
                     node_broker,
@@ -135,55 +184,136 @@ class InitiationMotifCollector(HasSession):
                     triangle.id_project_bc,
                     self._id_current_project)
 
-                motif = self._motif_factory.identify_motif_type(
+                motif = MotifFactory.classify_motif(
                     tpl_collaborators=tpl_collaborators,
                     tpl_projects=tpl_projects,
                     dt_open=triangle.t_second - triangle.t_first,
-                    dt_close=link_attr.timestamp - triangle.t_second,
+                    dt_close=date - triangle.t_second,
                     # Enforce simplicial dominance:
                     # Set flag in case the three nodes appear together
                     # in ANY other publication of the same date
-                    is_simplicial=any(
-                        {u, node_broker, v}.issubset(project)\
-                            for project in self._d_current_date_projects.values())
+                    is_simplicial=not s_projects_uv.isdisjoint(
+                        self._d_current_date_collaborator_projects.get(node_broker, ()))
                 )
-                self._l_motifs.append({
-                    "id_collaborator_a": motif.id_collaborator_a,
-                    "id_collaborator_b": motif.id_collaborator_b,
-                    "id_collaborator_c": motif.id_collaborator_c,
-                    "id_project_ab": motif.id_project_ab,
-                    "id_project_bc": motif.id_project_bc,
-                    "id_project_ac": motif.id_project_ac,
-                    "motif_type": motif.__class__._motif_type,
-                    "dt_open": motif.dt_open if hasattr(motif, "dt_open") else None,
-                    "dt_close": motif.dt_close if hasattr(motif, "dt_close") else None,
-                })
-            self._triangles_open[(u,v)] = None
-
-    def _register_current_project(self, project_attr: ProjectAttribute):
+                self._l_motifs.append(MotifFactory.to_row(motif))
+
+    def _resolve_clique(self, project: Dict[int, int], project_attr: ProjectAttribute) -> None:
+        """Identifies the triangles of a project stored as a clique
+        before its links are added, equivalent to adding the links one by one:
+        - Open pairs within the clique close.
+        - Pairs of a member and a non-member open with each member as broker
+            which is linked to the non-member.
+        - All other triangles within the clique open and close within the project,
+            i.e., on the same date. Their number is derived from the previous links
+            between members instead of enumerating them.
+        """
+        members = sorted(project.keys())
+        s_members = set(members)
+
+        for u, v in combinations(members, 2):
+            if (u, v) in self.triangles_open:
+                self._close_triangles(u, v, project_attr.date)
+
+        # Non-members -> first links of the members they are linked to
+        d_links_outside = defaultdict(list)
+        for node_broker in members:
+            for w in self.network.neighbors(node_broker):
+                if w not in s_members:
+                    d_links_outside[w].append((node_broker, self.network.first_link(
+                        (node_broker, w) if node_broker < w else (w, node_broker))))
+        for w, l_links_w in d_links_outside.items():
+            # Members which are not linked to `w`, thus excluding the brokers
+            for node in s_members.difference(self.network.neighbors(w)):
+                tpl_open = (node, w) if node < w else (w, node)
+                s_brokers_open = self.triangles_open.brokers(tpl_open)
+                for node_broker, link_w_attr in l_links_w:
+                    # Initiation focus
+                    if node_broker in s_brokers_open:
+                        continue
+                    self.triangles_open.add(tpl_open, node_broker, OpenTriangle(
+                        node_init=w,
+                        id_project_ab=link_w_attr.id_project,
+                        id_project_bc=project_attr.id_project,
+                        t_first=link_w_attr.date,
+                        t_second=project_attr.date
+                    ), self._date_current)
+
+        # Each triangle of members with at most one previous link is a motif of the project.
+        # Triangles with two previous links were closed above
+        # and triangles with three previous links are no motifs.
+        d_within = {node: s_members.intersection(self.network.neighbors(node)) for node in members}
+        n_members = len(members)
+        n_one, n_common = 0, 0
+        for u in members:
+            for v in d_within[u]:
+                if u < v:
+                    n_common_uv = len(d_within[u].intersection(d_within[v]))
+                    n_one += n_members - len(d_within[u]) - len(d_within[v]) + n_common_uv
+                    n_common += n_common_uv
+        n_three = n_common // 3
+        n_two = sum(comb(len(s_within), 2) for s_within in d_within.values()) - 3 * n_three
+        n_none = comb(n_members, 3) - n_one - n_two - n_three
+        self.n_motifs_clique += n_none + n_one
+
+    def _register_current_project(self, project: Dict[int, int], project_attr: ProjectAttribute):
         self._id_current_project = project_attr.id_project
 
     def _register_current_date(self, date: DateYield):
-        self._d_current_date_projects = date.collaborations
+        self._date_current = date.date
+        self._d_current_date_collaborator_projects = defaultdict(set)
+        for id_project, project in date.collaborations.items():
+            for id_collaborator in project:
+                self._d_current_date_collaborator_projects[id_collaborator].add(id_project)
 
-    def _commit_motifs(self):
-        if len(self._l_motifs) == 0:
-            return
+    def _finalize_current_date(self, date: DateYield):
+        self.sink.write(self._l_motifs)
+        self.n_motifs += len(self._l_motifs)
+        # Reset here rather than by the replay, which may be driven by a `MotifCollectorGroup`
+        self._l_motifs_last = self._l_motifs
+        self._l_motifs = []
+        self.triangles_open.evict(self._date_current)
 
-        stmt_ins = insert(BaseTriadicClosureMotif)\
-            .values(self._l_motifs)
-        stmt_do_nothing = stmt_ins.on_conflict_do_nothing()
-        self.session.execute(stmt_do_nothing)
-        self.session.commit()
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Snapshot of the network, the open triangles and the motif counts as arrays.
+        Motifs are not included, thus, a snapshot is only complete
+        once the sink committed the motifs up to it (see `MotifCollectorCheckpointer`).
+        """
+        d_state = prefix_arrays(self.network.get_state(), "network")
+        d_state.update(prefix_arrays(self.triangles_open.get_state(), "triangles_open"))
+        d_state["n_motifs"] = np.asarray(self.n_motifs)
+        d_state["n_motifs_clique"] = np.asarray(self.n_motifs_clique)
+        return d_state
 
-        self._l_motifs = []
+    def set_state(self, d_state: Dict[str, np.ndarray]) -> None:
+        """Restores the network, the open triangles and the motif counts from a snapshot of `get_state`.
+        Counts missing from older snapshots start at zero.
+        """
+        self.network.set_state(select_arrays(d_state, "network"))
+        self.triangles_open.set_state(select_arrays(d_state, "triangles_open"))
+        self.n_motifs = int(d_state.get("n_motifs", 0))
+        self.n_motifs_clique = int(d_state.get("n_motifs_clique", 0))
 
-    def generate_motifs(self) -> Iterator[Tuple[BaseTriadicClosureMotif]]:
+    def generate_motifs(self) -> Iterator[List[Dict[str, Any]]]:
         for _ in self.network.generate_network():
-            yield self._l_motifs
-            self._l_motifs = []
+            yield self._l_motifs_last
 
     def integrate_counts(self, stop_after: Tuple[int,None] = None) -> None:
-        for i, _ in enumerate(self.generate_motifs()):
-            if stop_after is not None and i == stop_after:
-                return
+        try:
+            for i, _ in enumerate(self.generate_motifs()):
+                if stop_after is not None and i == stop_after:
+                    return
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Flushes the sink and closes it if it was created by the collector.
+        Closes the profiler, if any.
+        """
+        try:
+            if self._owns_sink:
+                self.sink.close()
+            else:
+                self.sink.flush()
+        finally:
+            if self.profiler is not None:
+                self.profiler.close()
@@ -0,0 +1,85 @@
+"""Several motif collectors counting on a single replay of one network.
+"""
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
+
+import numpy as np
+
+from .motif_collector import InitiationMotifCollector
+from .growing_temporal_linked_list_network import GrowingTemporalNetwork
+from ..dbm import CumAdvBrokSession
+
+class MotifCollectorGroup:
+    """Replays a network once for several independent motif collectors.
+
+    Collectors are created on the network of the group (see `add_collector`)
+    and register their event handlers on it, so that each event is dispatched to all of them.
+    They thus share the adjacency and the edge store (first links) of the network
+    as well as the last publication dates used for eviction,
+    while each keeps its own open triangles, counts and motif sink.
+    Collectors may differ in their parameters or be subclasses of `InitiationMotifCollector`
+    with other motif definitions.
+
+    Collectors of a group must not be replayed individually (e.g., by their `integrate_counts`).
+    """
+    network: GrowingTemporalNetwork
+    collectors: List[InitiationMotifCollector]
+
+    _last_publication_dates: Optional[Tuple[np.ndarray, np.ndarray]]
+
+    def __init__(self, network: GrowingTemporalNetwork) -> None:
+        self.network = network
+        self.collectors = []
+        self._last_publication_dates = None
+
+    def add_collector(
+            self,
+            Collector: Type[InitiationMotifCollector] = InitiationMotifCollector,
+            session: Optional[CumAdvBrokSession] = None,
+            **kwargs) -> InitiationMotifCollector:
+        """Creates a collector on the network of the group.
+
+        Args:
+            Collector (Type[InitiationMotifCollector], optional): Class of the collector,
+                by default InitiationMotifCollector
+            session (Optional[CumAdvBrokSession], optional): Session of the collector, by default None
+            kwargs: Further arguments of the collector (e.g., `sink` or `evict_inactive`).
+
+        Returns:
+            InitiationMotifCollector: The created collector.
+        """
+        if kwargs.get("evict_inactive", True) and self._last_publication_dates is None:
+            self._last_publication_dates = self.network.generator.get_last_publication_dates()
+        collector = Collector(
+            network=self.network, session=session,
+            last_publication_dates=self._last_publication_dates, **kwargs)
+        self.collectors.append(collector)
+        return collector
+
+    def generate_motifs(self) -> Iterator[List[List[Dict[str, Any]]]]:
+        """Yields the motifs of each date per collector (in the order they were added).
+        """
+        for _ in self.network.generate_network():
+            yield [collector._l_motifs_last for collector in self.collectors]
+
+    def integrate_counts(self, stop_after: Optional[int] = None) -> None:
+        """Replays the network once and closes all collectors (see `InitiationMotifCollector.close`).
+        """
+        try:
+            for i, _ in enumerate(self.generate_motifs()):
+                if stop_after is not None and i == stop_after:
+                    return
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Closes all collectors, even if closing one of them fails.
+        The first error is raised afterwards.
+        """
+        error = None
+        for collector in self.collectors:
+            try:
+                collector.close()
+            except BaseException as e: # pylint: disable=broad-except
+                error = e if error is None else error
+        if error is not None:
+            raise error
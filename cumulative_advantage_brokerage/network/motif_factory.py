@@ -1,5 +1,6 @@
-from typing import Tuple
-from datetime import timedelta
+from typing import Tuple, Dict, Any, List, NamedTuple
+
+import numpy as np
 
 from ..dbm import\
     HasSession,\
@@ -8,89 +9,143 @@ from ..dbm import\
     InitiationLinkMotif, SimplicialInitiationLinkMotif,\
     BaseTriadicClosureMotif, SimplicialBaseTriadicClosureMotif
 
+# Motif types by code.
+# Bit 0: open link later than first link (`dt_open > 0`),
+# bit 1: closing link later than open link (`dt_close > 0`),
+# bit 2: simplicial.
+MOTIF_TYPES = (
+    BaseTriadicClosureMotif, InitiationLinkMotif,
+    BrokerMotif, TriadicClosureMotif,
+    SimplicialBaseTriadicClosureMotif, SimplicialInitiationLinkMotif,
+    SimplicialBrokerMotif, SimplicialTriadicClosureMotif)
+MOTIF_TYPE_NAMES = tuple(cls._motif_type for cls in MOTIF_TYPES)
+CODE_HAS_DT_OPEN = 1
+CODE_HAS_DT_CLOSE = 2
+CODE_SIMPLICIAL = 4
+
+# (motif type code, a, b, c, project ab, project bc, project ac, dt_open, dt_close)
+MotifTuple = Tuple[int, int, int, int, int, int, int, int, int]
+
+class MotifColumns(NamedTuple):
+    """Classified motifs as columns.
+    Row `i` of all columns describes a single motif.
+    """
+    motif_type: np.ndarray # Motif type codes (int8), see `MOTIF_TYPES`
+    collaborators_a: np.ndarray # Collaborator IDs (int64)
+    collaborators_b: np.ndarray # Collaborator IDs (int64)
+    collaborators_c: np.ndarray # Collaborator IDs (int64)
+    projects_ab: np.ndarray # Project IDs (int64)
+    projects_bc: np.ndarray # Project IDs (int64)
+    projects_ac: np.ndarray # Project IDs (int64)
+    dt_open: np.ndarray # Days between first and second link (int64)
+    dt_close: np.ndarray # Days between second and closing link (int64)
+
 class MotifFactory(HasSession):
-    def identify_motif_type(
-        self,
+    """Classifies closed triangles into motif types.
+
+    Motifs are represented as plain tuples (`MotifTuple`) or columns (`MotifColumns`)
+    and converted to rows of the motif table by `to_row` and `to_rows`.
+    The ORM classes in `MOTIF_TYPES` are only used to read motifs back from the database.
+    """
+    @staticmethod
+    def classify_motif(
         tpl_collaborators: Tuple[int, int, int],
         tpl_projects: Tuple[int, int, int],
-        dt_open: timedelta,
-        dt_close: timedelta,
+        dt_open: int,
+        dt_close: int,
         is_simplicial: bool
-    ) -> BaseTriadicClosureMotif:
-        # Check for temporal distance
-        if dt_open.days > 0 and dt_close.days > 0:
-            return TriadicClosureMotif(
-                id_collaborator_a=tpl_collaborators[0],
-                id_collaborator_b=tpl_collaborators[1],
-                id_collaborator_c=tpl_collaborators[2],
-                id_project_ab=tpl_projects[0],
-                id_project_bc=tpl_projects[1],
-                id_project_ac=tpl_projects[2],
-                dt_open=dt_open,
-                dt_close=dt_close
-            ) if not is_simplicial else SimplicialTriadicClosureMotif(
-                id_collaborator_a=tpl_collaborators[0],
-                id_collaborator_b=tpl_collaborators[1],
-                id_collaborator_c=tpl_collaborators[2],
-                id_project_ab=tpl_projects[0],
-                id_project_bc=tpl_projects[1],
-                id_project_ac=tpl_projects[2],
-                dt_open=dt_open,
-                dt_close=dt_close
-            )
-        if dt_close.days > 0:
-            _pos_a, _pos_c = sorted([0,2], key=tpl_collaborators.__getitem__)
+    ) -> MotifTuple:
+        """Classifies a single closed triangle.
 
-            return BrokerMotif(
-                id_collaborator_a=tpl_collaborators[_pos_a],
-                id_collaborator_b=tpl_collaborators[1],
-                id_collaborator_c=tpl_collaborators[_pos_c],
-                id_project_ab=tpl_projects[_pos_a],
-                id_project_bc=tpl_projects[1],
-                id_project_ac=tpl_projects[_pos_c],
-                dt_close=dt_close
-            ) if not is_simplicial else SimplicialBrokerMotif(
-                id_collaborator_a=tpl_collaborators[_pos_a],
-                id_collaborator_b=tpl_collaborators[1],
-                id_collaborator_c=tpl_collaborators[_pos_c],
-                id_project_ab=tpl_projects[_pos_a],
-                id_project_bc=tpl_projects[1],
-                id_project_ac=tpl_projects[_pos_c],
-                dt_close=dt_close
-            )
-        if dt_open.days > 0:
+        Args:
+            tpl_collaborators (Tuple[int, int, int]): Initiator, broker and third node.
+            tpl_projects (Tuple[int, int, int]): Projects of the first, second and closing link.
+            dt_open (int): Days between the first and second link.
+            dt_close (int): Days between the second and closing link.
+            is_simplicial (bool): Whether all three nodes share a project of the closing date.
+
+        Returns:
+            MotifTuple: The motif with the collaborators in the order of its type.
+        """
+        code = (dt_open > 0) | ((dt_close > 0) << 1) | (is_simplicial << 2)
+        if code & 3 == 3:
+            _pos_a, _pos_b, _pos_c = 0, 1, 2
+        elif code & 3 == 2:
+            _pos_a, _pos_c = sorted([0,2], key=tpl_collaborators.__getitem__)
+            _pos_b = 1
+        elif code & 3 == 1:
             _pos_a, _pos_b = sorted([0,1], key=tpl_collaborators.__getitem__)
-            return InitiationLinkMotif(
-                id_collaborator_a=tpl_collaborators[_pos_a],
-                id_collaborator_b=tpl_collaborators[_pos_b],
-                id_collaborator_c=tpl_collaborators[2],
-                id_project_ab=tpl_projects[_pos_a],
-                id_project_bc=tpl_projects[_pos_b],
-                id_project_ac=tpl_projects[2],
-                dt_open=dt_open
-            ) if not is_simplicial else SimplicialInitiationLinkMotif(
-                id_collaborator_a=tpl_collaborators[_pos_a],
-                id_collaborator_b=tpl_collaborators[_pos_b],
-                id_collaborator_c=tpl_collaborators[2],
-                id_project_ab=tpl_projects[_pos_a],
-                id_project_bc=tpl_projects[_pos_b],
-                id_project_ac=tpl_projects[2],
-                dt_open=dt_open
-            )
-        # else:
-        _pos_a, _pos_b, _pos_c = sorted([0,1,2], key=tpl_collaborators.__getitem__)
-        return BaseTriadicClosureMotif(
-                id_collaborator_a=tpl_collaborators[_pos_a],
-                id_collaborator_b=tpl_collaborators[_pos_b],
-                id_collaborator_c=tpl_collaborators[_pos_c],
-                id_project_ab=tpl_projects[_pos_a],
-                id_project_bc=tpl_projects[_pos_b],
-                id_project_ac=tpl_projects[_pos_c],
-        ) if not is_simplicial else SimplicialBaseTriadicClosureMotif(
-                id_collaborator_a=tpl_collaborators[_pos_a],
-                id_collaborator_b=tpl_collaborators[_pos_b],
-                id_collaborator_c=tpl_collaborators[_pos_c],
-                id_project_ab=tpl_projects[_pos_a],
-                id_project_bc=tpl_projects[_pos_b],
-                id_project_ac=tpl_projects[_pos_c],
-        )
+            _pos_c = 2
+        else:
+            _pos_a, _pos_b, _pos_c = sorted([0,1,2], key=tpl_collaborators.__getitem__)
+
+        return (
+            code,
+            tpl_collaborators[_pos_a], tpl_collaborators[_pos_b], tpl_collaborators[_pos_c],
+            tpl_projects[_pos_a], tpl_projects[_pos_b], tpl_projects[_pos_c],
+            dt_open, dt_close)
+
+    @staticmethod
+    def classify_motifs(
+        a_collaborators: np.ndarray,
+        a_projects: np.ndarray,
+        a_dt_open: np.ndarray,
+        a_dt_close: np.ndarray,
+        a_is_simplicial: np.ndarray
+    ) -> MotifColumns:
+        """Vectorized version of `classify_motif`.
+
+        Args:
+            a_collaborators (np.ndarray): Initiators, brokers and third nodes of shape `(3, n)`.
+            a_projects (np.ndarray): Projects of the first, second and closing links of shape `(3, n)`.
+            a_dt_open (np.ndarray): Days between the first and second links.
+            a_dt_close (np.ndarray): Days between the second and closing links.
+            a_is_simplicial (np.ndarray): Whether all three nodes share a project of the closing date.
+
+        Returns:
+            MotifColumns: The motifs with the collaborators in the order of their types.
+        """
+        a_code = (a_dt_open > 0).astype(np.int8)\
+            | ((a_dt_close > 0).astype(np.int8) << 1)\
+            | (a_is_simplicial.astype(np.int8) << 2)
+        a_kind = a_code & 3
+
+        # Position of the collaborators `a`, `b` and `c` in the input
+        a_perm = np.repeat(np.arange(3)[:, None], len(a_code), axis=1)
+        a_mask = a_kind == 0
+        a_perm[:, a_mask] = np.argsort(a_collaborators[:, a_mask], axis=0, kind="stable")
+        a_mask = (a_kind == 1) & (a_collaborators[0] > a_collaborators[1])
+        a_perm[0, a_mask], a_perm[1, a_mask] = 1, 0
+        a_mask = (a_kind == 2) & (a_collaborators[0] > a_collaborators[2])
+        a_perm[0, a_mask], a_perm[2, a_mask] = 2, 0
+
+        a_collaborators = np.take_along_axis(a_collaborators, a_perm, axis=0)
+        a_projects = np.take_along_axis(a_projects, a_perm, axis=0)
+        return MotifColumns(
+            a_code, *a_collaborators, *a_projects,
+            a_dt_open.astype(np.int64), a_dt_close.astype(np.int64))
+
+    @staticmethod
+    def to_row(motif: MotifTuple) -> Dict[str, Any]:
+        """Column values of a motif to be inserted into the motif table.
+        Intervals are kept in days (`None` if the motif type has none)
+        and converted by the motif sinks.
+        """
+        code, a, b, c, p_ab, p_bc, p_ac, dt_open, dt_close = motif
+        return {
+            "id_collaborator_a": a,
+            "id_collaborator_b": b,
+            "id_collaborator_c": c,
+            "id_project_ab": p_ab,
+            "id_project_bc": p_bc,
+            "id_project_ac": p_ac,
+            "motif_type": MOTIF_TYPE_NAMES[code],
+            "dt_open": dt_open if code & CODE_HAS_DT_OPEN else None,
+            "dt_close": dt_close if code & CODE_HAS_DT_CLOSE else None,
+        }
+
+    @staticmethod
+    def to_rows(motifs: MotifColumns) -> List[Dict[str, Any]]:
+        """Column values of all motifs to be inserted into the motif table.
+        """
+        return [MotifFactory.to_row(motif) for motif in zip(*(col.tolist() for col in motifs))]
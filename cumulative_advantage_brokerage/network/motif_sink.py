@@ -0,0 +1,232 @@
+"""Sinks which receive the motifs of motif collectors.
+"""
+import csv
+import io
+from abc import abstractmethod
+from datetime import timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import Table
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.engine import Engine
+
+from ..dbm import CumAdvBrokSession, BaseTriadicClosureMotif, WriterThread
+
+MOTIF_COLUMNS = (
+    "id_collaborator_a", "id_collaborator_b", "id_collaborator_c",
+    "id_project_ab", "id_project_bc", "id_project_ac",
+    "motif_type", "dt_open", "dt_close")
+
+class MotifSink:
+    """Receives motif rows (see `MotifFactory.to_row`).
+    """
+    n_written: int # Number of motifs passed to `write`
+
+    @abstractmethod
+    def write(self, l_motifs: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    @property
+    def n_committed(self) -> int:
+        """Number of written motifs which are persisted, without waiting for the sink.
+        Sinks persisting each write immediately report all written motifs.
+        """
+        return self.n_written
+
+    def flush(self) -> None:
+        """Blocks until all written motifs are persisted.
+        """
+
+    def close(self) -> None:
+        """Flushes and releases resources.
+        """
+        self.flush()
+
+class MemoryMotifSink(MotifSink):
+    """Keeps all motifs in memory.
+    """
+    motifs: List[Dict[str, Any]]
+
+    def __init__(self) -> None:
+        self.motifs = []
+        self.n_written = 0
+
+    def write(self, l_motifs: List[Dict[str, Any]]) -> None:
+        self.motifs.extend(l_motifs)
+        self.n_written += len(l_motifs)
+
+class CSVMotifSink(MotifSink):
+    """Appends motifs to a CSV file with a header of the motif columns.
+    Intervals are written in a format accepted by `COPY ... WITH (FORMAT csv, HEADER)`.
+    Motifs count as committed once the file was flushed.
+    """
+    path: str
+
+    _n_flushed: int
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._file = open(path, "w", encoding="utf-8", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(MOTIF_COLUMNS)
+        self.n_written = 0
+        self._n_flushed = 0
+
+    def write(self, l_motifs: List[Dict[str, Any]]) -> None:
+        self._writer.writerows(_to_csv_row(motif) for motif in l_motifs)
+        self.n_written += len(l_motifs)
+
+    @property
+    def n_committed(self) -> int:
+        return self._n_flushed
+
+    def flush(self) -> None:
+        if not self._file.closed:
+            self._file.flush()
+            self._n_flushed = self.n_written
+
+    def close(self) -> None:
+        self.flush()
+        self._file.close()
+
+class InsertMotifSink(MotifSink):
+    """Inserts the motifs of each write with `INSERT ... ON CONFLICT DO NOTHING`
+    and commits immediately.
+    """
+    session: CumAdvBrokSession
+    table: Table
+
+    def __init__(
+            self, session: CumAdvBrokSession,
+            table: Table = BaseTriadicClosureMotif.__table__) -> None:
+        self.session = session
+        self.table = table
+        self.n_written = 0
+
+    def write(self, l_motifs: List[Dict[str, Any]]) -> None:
+        if len(l_motifs) == 0:
+            return
+
+        stmt_ins = insert(self.table)\
+            .values([_to_insert_row(motif) for motif in l_motifs])
+        stmt_do_nothing = stmt_ins.on_conflict_do_nothing()
+        self.session.execute(stmt_do_nothing)
+        self.session.commit()
+        self.n_written += len(l_motifs)
+
+def _to_timedelta(days: Optional[int]) -> Optional[timedelta]:
+    return None if days is None else timedelta(days=days)
+
+def _to_insert_row(motif: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        **motif,
+        "dt_open": _to_timedelta(motif["dt_open"]),
+        "dt_close": _to_timedelta(motif["dt_close"])}
+
+def _format_interval(days: Optional[int]) -> Optional[str]:
+    if days is None:
+        return None
+    return f"{days} days"
+
+def _to_csv_row(motif: Dict[str, Any]) -> Tuple:
+    return (
+        motif["id_collaborator_a"], motif["id_collaborator_b"], motif["id_collaborator_c"],
+        motif["id_project_ab"], motif["id_project_bc"], motif["id_project_ac"],
+        motif["motif_type"],
+        _format_interval(motif["dt_open"]), _format_interval(motif["dt_close"]))
+
+class PostgresCopyMotifSink(MotifSink):
+    """Collects motifs across writes into batches of `batch_size` rows.
+    Each batch is streamed via `COPY` into a temporary staging table
+    and merged into `table` by a single `INSERT ... ON CONFLICT DO NOTHING`.
+
+    Batches are persisted by a background thread on a separate connection (see `WriterThread`).
+    At most `n_batches_queued` batches wait for the writer,
+    after which `write` blocks until the database caught up.
+    Errors of the writer are raised by the next and every later call to `write`, `flush` or `close`,
+    as the motifs of later batches are dropped once a batch failed.
+    Motifs count as committed once the writer committed their batch.
+    """
+    engine: Engine
+    table: Table
+    batch_size: int
+
+    _l_batch: List[Dict[str, Any]]
+    _writer: WriterThread
+    _n_committed: int # Updated by the writer thread
+
+    def __init__(
+            self, engine: Engine,
+            table: Table = BaseTriadicClosureMotif.__table__,
+            batch_size: int = 100000,
+            n_batches_queued: int = 2) -> None:
+        self.engine = engine
+        self.table = table
+        self.batch_size = batch_size
+
+        self.n_written = 0
+        self._n_committed = 0
+        self._l_batch = []
+        self._writer = WriterThread(
+            engine=engine,
+            write_item=self._merge_batch,
+            prepare_connection=self._create_staging_table,
+            n_items_queued=n_batches_queued)
+
+    def write(self, l_motifs: List[Dict[str, Any]]) -> None:
+        self._writer.raise_error()
+        self._l_batch.extend(l_motifs)
+        self.n_written += len(l_motifs)
+        if len(self._l_batch) >= self.batch_size:
+            self._submit()
+
+    @property
+    def n_committed(self) -> int:
+        return self._n_committed
+
+    def flush(self) -> None:
+        if len(self._l_batch) > 0:
+            self._submit()
+        self._writer.join()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            self._writer.close()
+
+    def _submit(self):
+        l_batch, self._l_batch = self._l_batch, []
+        self._writer.submit(l_batch)
+
+    def _create_staging_table(self, conn):
+        columns_typed = ", ".join(
+            f"{column} {self.table.c[column].type.compile(dialect=postgresql.dialect())}"\
+                for column in MOTIF_COLUMNS)
+        with conn.cursor() as cursor:
+            cursor.execute((
+                f"CREATE TEMPORARY TABLE IF NOT EXISTS {self.table.name}_staging ({columns_typed}) "
+                "ON COMMIT DELETE ROWS"))
+        conn.commit()
+
+    def _merge_batch(self, conn, l_batch: List[Dict[str, Any]]):
+        columns = ", ".join(MOTIF_COLUMNS)
+        with conn.cursor() as cursor:
+            cursor.copy_expert(
+                f"COPY {self.table.name}_staging ({columns}) FROM STDIN WITH (FORMAT csv)",
+                self._to_csv(l_batch))
+            cursor.execute((
+                f"INSERT INTO {self.table.name} ({columns}) "
+                f"SELECT {columns} FROM {self.table.name}_staging "
+                "ON CONFLICT DO NOTHING"))
+        conn.commit()
+        self._n_committed += len(l_batch)
+
+    @staticmethod
+    def _to_csv(l_batch: List[Dict[str, Any]]) -> io.StringIO:
+        file = io.StringIO()
+        writer = csv.writer(file)
+        writer.writerows(_to_csv_row(motif) for motif in l_batch)
+        file.seek(0)
+        return file
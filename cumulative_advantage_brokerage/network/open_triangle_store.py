@@ -0,0 +1,246 @@
+"""Storage of open triangles (wedges) of the motif collector.
+"""
+import heapq
+from typing import Dict, List, NamedTuple, Optional, Set, Tuple
+
+import numpy as np
+
+from .array_utils import grow
+
+class OpenTriangle(NamedTuple):
+    node_init: int
+    id_project_ab: int
+    id_project_bc: int
+    t_first: int # Day ordinal of the first link
+    t_second: int # Day ordinal of the second link
+
+class OpenTriangleStore:
+    """Stores open triangles by their open node pair `(a, c)` (with `a < c`) and broker `b`.
+
+    The node pair is encoded as a single integer key which points to the first record
+    of a linked list of records (one per broker).
+    Records are held in growable arrays whose slots are reused after removal.
+
+    If the last publication dates of all collaborators are provided,
+    open pairs are evicted as soon as one of their nodes stopped publishing,
+    because such pairs can never be closed.
+    """
+    n_open: int # Number of open triangles
+    n_evicted: int # Number of evicted open triangles
+
+    _d_head: Dict[int, int] # Pair key -> slot of first record
+    _a_next: np.ndarray # Slot -> slot of next record with the same pair (-1 if none)
+    _a_broker: np.ndarray
+    _a_node_init: np.ndarray
+    _a_project_ab: np.ndarray
+    _a_project_bc: np.ndarray
+    _a_t_first: np.ndarray # Day ordinals
+    _a_t_second: np.ndarray # Day ordinals
+    _l_free: List[int] # Free slots
+    _n_slots: int
+
+    _a_last_date: Optional[np.ndarray] # Collaborator ID -> last publication day ordinal
+    _d_expiry: Dict[int, List[int]] # Day ordinal -> pair keys which expire after that date
+    _l_expiry: List[int] # Heap of the keys of `_d_expiry`
+
+    def __init__(
+            self,
+            a_id_collaborator: Optional[np.ndarray] = None,
+            a_last_date: Optional[np.ndarray] = None) -> None:
+        """Stores open triangles by their open node pair and broker.
+
+        Args:
+            a_id_collaborator (Optional[np.ndarray], optional): IDs of all collaborators.
+                Required for eviction, by default None
+            a_last_date (Optional[np.ndarray], optional): Day ordinals of the last publication,
+                aligned with `a_id_collaborator`. Required for eviction, by default None
+        """
+        self.n_open = 0
+        self.n_evicted = 0
+
+        self._d_head = {}
+        self._a_next = np.zeros(0, dtype=np.int64)
+        self._a_broker = np.zeros(0, dtype=np.int64)
+        self._a_node_init = np.zeros(0, dtype=np.int64)
+        self._a_project_ab = np.zeros(0, dtype=np.int64)
+        self._a_project_bc = np.zeros(0, dtype=np.int64)
+        self._a_t_first = np.zeros(0, dtype=np.int32)
+        self._a_t_second = np.zeros(0, dtype=np.int32)
+        self._l_free = []
+        self._n_slots = 0
+
+        self._a_last_date = None
+        if a_id_collaborator is not None:
+            self._a_last_date = np.zeros(int(a_id_collaborator.max(initial=0)) + 1, dtype=np.int32)
+            self._a_last_date[a_id_collaborator] = a_last_date
+        self._d_expiry = {}
+        self._l_expiry = []
+
+    @staticmethod
+    def _get_key(pair: Tuple[int, int]) -> int:
+        return (pair[0] << 32) | pair[1]
+
+    def __contains__(self, pair: Tuple[int, int]) -> bool:
+        return self._get_key(pair) in self._d_head
+
+    def __len__(self) -> int:
+        return self.n_open
+
+    def contains(self, pair: Tuple[int, int], broker: int) -> bool:
+        """Whether the pair is open with the given broker.
+        """
+        slot = self._d_head.get(self._get_key(pair), -1)
+        while slot >= 0:
+            if self._a_broker.item(slot) == broker:
+                return True
+            slot = self._a_next.item(slot)
+        return False
+
+    def brokers(self, pair: Tuple[int, int]) -> Set[int]:
+        """Brokers with which the pair is open.
+        """
+        s_brokers = set()
+        slot = self._d_head.get(self._get_key(pair), -1)
+        while slot >= 0:
+            s_brokers.add(self._a_broker.item(slot))
+            slot = self._a_next.item(slot)
+        return s_brokers
+
+    def add(self, pair: Tuple[int, int], broker: int, triangle: OpenTriangle, date: int):
+        """Adds an open triangle.
+
+        Args:
+            pair (Tuple[int, int]): The open node pair `(a, c)` with `a < c`.
+            broker (int): The broker node `b`.
+            triangle (OpenTriangle): Attributes of the open triangle.
+            date (int): The current date as day ordinal.
+        """
+        key = self._get_key(pair)
+        slot_head = self._d_head.get(key, -1)
+        if slot_head < 0 and self._a_last_date is not None:
+            date_expiry = min(self._a_last_date.item(pair[0]), self._a_last_date.item(pair[1]))
+            if date_expiry < date:
+                # One of the nodes does not publish anymore
+                return
+            if date_expiry not in self._d_expiry:
+                self._d_expiry[date_expiry] = []
+                heapq.heappush(self._l_expiry, date_expiry)
+            self._d_expiry[date_expiry].append(key)
+
+        slot = self._allocate()
+        self._a_next[slot] = slot_head
+        self._a_broker[slot] = broker
+        self._a_node_init[slot] = triangle.node_init
+        self._a_project_ab[slot] = triangle.id_project_ab
+        self._a_project_bc[slot] = triangle.id_project_bc
+        self._a_t_first[slot] = triangle.t_first
+        self._a_t_second[slot] = triangle.t_second
+        self._d_head[key] = slot
+        self.n_open += 1
+
+    def pop(self, pair: Tuple[int, int]) -> List[Tuple[int, OpenTriangle]]:
+        """Removes all open triangles of a pair.
+
+        Args:
+            pair (Tuple[int, int]): The open node pair `(a, c)` with `a < c`.
+
+        Returns:
+            List[Tuple[int, OpenTriangle]]: Brokers and attributes of the open triangles
+                in the order they were added.
+        """
+        l_triangles = []
+        slot = self._d_head.pop(self._get_key(pair), -1)
+        while slot >= 0:
+            l_triangles.append((
+                self._a_broker.item(slot),
+                OpenTriangle(
+                    node_init=self._a_node_init.item(slot),
+                    id_project_ab=self._a_project_ab.item(slot),
+                    id_project_bc=self._a_project_bc.item(slot),
+                    t_first=self._a_t_first.item(slot),
+                    t_second=self._a_t_second.item(slot))))
+            self._l_free.append(slot)
+            slot = self._a_next.item(slot)
+        self.n_open -= len(l_triangles)
+        l_triangles.reverse()
+        return l_triangles
+
+    def evict(self, date: int) -> int:
+        """Removes open pairs of which one node does not publish after `date`.
+
+        Args:
+            date (int): The last processed date as day ordinal.
+
+        Returns:
+            int: Number of evicted open triangles.
+        """
+        n_evicted = 0
+        while len(self._l_expiry) > 0 and self._l_expiry[0] <= date:
+            for key in self._d_expiry.pop(heapq.heappop(self._l_expiry)):
+                slot = self._d_head.pop(key, -1)
+                while slot >= 0:
+                    self._l_free.append(slot)
+                    slot = self._a_next.item(slot)
+                    n_evicted += 1
+        self.n_open -= n_evicted
+        self.n_evicted += n_evicted
+        return n_evicted
+
+    def get_state(self) -> Dict[str, np.ndarray]:
+        """Snapshot of the open triangles and pending evictions as arrays.
+        """
+        n = self._n_slots
+        l_expiry = sorted(self._d_expiry.keys())
+        return {
+            "counts": np.asarray([self.n_open, self.n_evicted], dtype=np.int64),
+            "head_keys": np.fromiter(self._d_head.keys(), dtype=np.int64, count=len(self._d_head)),
+            "head_slots": np.fromiter(self._d_head.values(), dtype=np.int64, count=len(self._d_head)),
+            "next": self._a_next[:n],
+            "broker": self._a_broker[:n],
+            "node_init": self._a_node_init[:n],
+            "project_ab": self._a_project_ab[:n],
+            "project_bc": self._a_project_bc[:n],
+            "t_first": self._a_t_first[:n],
+            "t_second": self._a_t_second[:n],
+            "free": np.asarray(self._l_free, dtype=np.int64),
+            "expiry_dates": np.asarray(l_expiry, dtype=np.int64),
+            "expiry_counts": np.asarray(
+                [len(self._d_expiry[date]) for date in l_expiry], dtype=np.int64),
+            "expiry_keys": np.asarray(
+                [key for date in l_expiry for key in self._d_expiry[date]], dtype=np.int64)}
+
+    def set_state(self, d_state: Dict[str, np.ndarray]) -> None:
+        """Restores the open triangles and pending evictions from a snapshot of `get_state`.
+        The last publication dates are not part of the snapshot.
+        """
+        self.n_open, self.n_evicted = d_state["counts"].tolist()
+        self._d_head = dict(zip(d_state["head_keys"].tolist(), d_state["head_slots"].tolist()))
+        self._a_next = d_state["next"].astype(np.int64)
+        self._a_broker = d_state["broker"].astype(np.int64)
+        self._a_node_init = d_state["node_init"].astype(np.int64)
+        self._a_project_ab = d_state["project_ab"].astype(np.int64)
+        self._a_project_bc = d_state["project_bc"].astype(np.int64)
+        self._a_t_first = d_state["t_first"].astype(np.int32)
+        self._a_t_second = d_state["t_second"].astype(np.int32)
+        self._n_slots = len(self._a_next)
+        self._l_free = d_state["free"].tolist()
+
+        l_keys = d_state["expiry_keys"].tolist()
+        a_bounds = np.concatenate(([0], np.cumsum(d_state["expiry_counts"]))).tolist()
+        self._l_expiry = d_state["expiry_dates"].tolist() # Sorted lists are heaps
+        self._d_expiry = {date: l_keys[i_start:i_end] for date, i_start, i_end in zip(
+            self._l_expiry, a_bounds[:-1], a_bounds[1:])}
+
+    def _allocate(self) -> int:
+        if len(self._l_free) > 0:
+            return self._l_free.pop()
+        slot = self._n_slots
+        self._n_slots += 1
+        self._a_next = grow(self._a_next, self._n_slots)
+        self._a_broker = grow(self._a_broker, self._n_slots)
+        self._a_node_init = grow(self._a_node_init, self._n_slots)
+        self._a_project_ab = grow(self._a_project_ab, self._n_slots)
+        self._a_project_bc = grow(self._a_project_bc, self._n_slots)
+        self._a_t_first = grow(self._a_t_first, self._n_slots)
+        self._a_t_second = grow(self._a_t_second, self._n_slots)
+        return slot
@@ -1,9 +1,9 @@
-from collections import defaultdict
+from abc import abstractmethod
 from datetime import datetime
 from dataclasses import dataclass
-from typing import NamedTuple, Dict, Iterator, List, Tuple
+from typing import NamedTuple, Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import select
+from sqlalchemy import select, func
 import numpy as np
 
 from ..dbm import\
@@ -21,7 +21,7 @@ class DateYield:
     """Tuple returned with each yield,
         containing all collaborators who published on that date and their respective links.
     """
-    timestamp: datetime # Timestamp of the returned data.
+    date: int # Day ordinal of the returned data.
     # Dict of collaborators who released at least one project
     # mapped to their gender and project count.
     # Does not necessarily match the union over all collaborations
@@ -33,104 +33,242 @@ class DateYield:
     # Dictionary that maps project IDs to another map that links collaborator IDs to the respective collaboration ID.
     collaborations: Dict[int, Dict[int, int]]
 
-class SQLEdgeGenerator(HasSession):
+    @property
+    def timestamp(self) -> datetime:
+        """Timestamp of the returned data (at day resolution).
+        """
+        return datetime.fromordinal(self.date)
+
+class EdgeColumns(NamedTuple):
+    """Typed columns of the ordered collaboration stream.
+    Row `i` of all columns describes a single collaboration.
+    """
+    dates: np.ndarray # Publication dates as day ordinals (int32)
+    projects: np.ndarray # Project IDs (int64)
+    collaborators: np.ndarray # Collaborator IDs (int64)
+    collaborations: np.ndarray # Collaboration IDs (int64)
+
+    def slice(self, start: int, end: Optional[int] = None) -> "EdgeColumns":
+        return EdgeColumns(*(col[start:end] for col in self))
+
+    @classmethod
+    def concatenate(cls, l_columns: List["EdgeColumns"]) -> "EdgeColumns":
+        return cls(*(np.concatenate(cols) for cols in zip(*l_columns)))
+
+    @classmethod
+    def from_rows(cls, rows: List[Tuple[datetime, int, int, int]]) -> "EdgeColumns":
+        n = len(rows)
+        return cls(
+            dates=np.fromiter((r[0].toordinal() for r in rows), dtype=np.int32, count=n),
+            projects=np.fromiter((r[1] for r in rows), dtype=np.int64, count=n),
+            collaborators=np.fromiter((r[2] for r in rows), dtype=np.int64, count=n),
+            collaborations=np.fromiter((r[3] for r in rows), dtype=np.int64, count=n))
+
+class EdgeGenerator:
+    """Base class of generators which yield the ordered collaborations
+    as typed `EdgeColumns` and as `DateYield`s per date.
+
+    Collaborations are ordered by publication timestamp, project ID and collaborator ID.
+    Subclasses define where collaborations are read from.
+    """
+    map_collaborator_gender: Dict[int, int]
+    id_collaborators: Optional[List[int]]
+    date_start: Optional[int]
+    date_end: Optional[int]
+
+    @abstractmethod
+    def iter_columns(self) -> Iterator[EdgeColumns]:
+        """Yields the ordered collaborations as typed column chunks.
+        Each chunk ends on a date block boundary.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def get_last_publication_dates(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Retrieves the date of the last publication of each collaborator.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Collaborator IDs and the day ordinals of their last publication.
+        """
+        raise NotImplementedError
+
+    def edges(self) -> Iterator[DateYield]:
+        """Yields edges of collaboration network iteratively as they form in temporal order.
+
+        Yields:
+            DateYield: All edges formed on the current point in time.
+                If there are multiple projects released at a specific point in time,
+                all edges forming with regards to these projects are yielded at once.
+        """
+        for columns in self.iter_columns():
+            yield from self._generate_date_yields(columns)
+
+    def _generate_date_yields(self, columns: EdgeColumns) -> Iterator[DateYield]:
+        # Block boundaries (start indices) of dates and projects
+        a_idx_dates = np.concatenate((
+            [0], np.flatnonzero(np.diff(columns.dates)) + 1, [len(columns.dates)]))
+        a_idx_projects = np.concatenate((
+            [0], np.flatnonzero(np.diff(columns.projects)) + 1, [len(columns.dates)]))
+
+        l_collaborators = columns.collaborators.tolist()
+        l_collaborations = columns.collaborations.tolist()
+        l_projects = columns.projects.tolist()
+
+        for date_start, date_end in zip(a_idx_dates[:-1], a_idx_dates[1:]):
+            a_idc, a_cnt = np.unique(
+                columns.collaborators[date_start:date_end], return_counts=True)
+
+            proj_start, proj_end = np.searchsorted(a_idx_projects, (date_start, date_end))
+            l_idx_projects = a_idx_projects[proj_start:proj_end + 1].tolist()
+            yield DateYield(
+                date=columns.dates.item(date_start),
+                collaborators={
+                    idx_collab:\
+                        CollaboratorYield(
+                            self.map_collaborator_gender[idx_collab],
+                            cnt_proj)\
+                                for idx_collab, cnt_proj in zip(a_idc.tolist(), a_cnt.tolist())},
+                collaborations={
+                    l_projects[i_start]: dict(zip(
+                        l_collaborators[i_start:i_end],
+                        l_collaborations[i_start:i_end]))\
+                            for i_start, i_end in zip(l_idx_projects[:-1], l_idx_projects[1:])}
+            )
+
+class SQLEdgeGenerator(HasSession, EdgeGenerator):
     """Generator that yields edges iteratively.
+
+    The ordered collaborations are held as typed `EdgeColumns`.
+    Publication dates are reduced to day resolution.
+    By default, all collaborations are loaded into memory at once,
+    converting the rows of a server-side cursor to columns in chunks of `chunk_size` rows.
+    In streaming mode (`stream=True`), they are instead read through a
+    server-side cursor in chunks of `chunk_size` rows and date blocks are
+    assembled on the fly, so that memory is bounded by the largest date block.
+    Collaborations can be restricted to dates (day ordinals) from `date_start`
+    (inclusive) to `date_end` (exclusive).
     """
-    _l_collaborations: np.ndarray
+    _columns: Optional[EdgeColumns]
+    stream: bool
+    chunk_size: int
 
     def __init__(self, *arg,
                  session: CumAdvBrokSession,
-                 skip_preprocess: bool = False, **kwargs) -> None:
+                 skip_preprocess: bool = False,
+                 stream: bool = False,
+                 chunk_size: int = 100000,
+                 id_collaborators: Optional[List[int]] = None,
+                 date_start: Optional[int] = None,
+                 date_end: Optional[int] = None, **kwargs) -> None:
         super().__init__(*arg, session=session, **kwargs)
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.id_collaborators = id_collaborators
+        self.date_start = date_start
+        self.date_end = date_end
         self.map_collaborator_gender = {}
         self._init_map_collaborator_gender()
-        if not skip_preprocess:
+        self._columns = None
+        if not (skip_preprocess or stream):
             q_edges = self._create_sql_query()
             self._preprocess_collaboration(q_edges)
-        else:
-            self._l_collaborations = None
 
     def _create_sql_query(self) -> select:
-        return select(
+        q_edges = self._filter_collaborators(select(
                 Project.timestamp,
                 Project.id,
                 Collaboration.id_collaborator,
                 Collaboration.id).\
             join(Project, Collaboration.id_project == Project.id).\
             join(Collaborator,
-                Collaboration.id_collaborator == Collaborator.id).\
+                Collaboration.id_collaborator == Collaborator.id))
+        if self.date_start is not None:
+            q_edges = q_edges.where(Project.timestamp >= datetime.fromordinal(self.date_start))
+        q_edges = self._filter_date_end(q_edges)
+        return q_edges.\
             order_by(Project.timestamp.asc(), # Fix temporal order
                      Project.id.asc(),
                      Collaborator.id.asc())
 
+    def _filter_collaborators(self, q: select) -> select:
+        if self.id_collaborators is None:
+            return q
+        return q.where(Collaborator.id.in_(self.id_collaborators))
+
+    def _filter_date_end(self, q: select) -> select:
+        if self.date_end is None:
+            return q
+        return q.where(Project.timestamp < datetime.fromordinal(self.date_end))
+
     def _preprocess_collaboration(self, q_edges: select):
-        self._l_collaborations = np.asarray(self.session.execute(q_edges).all())
+        # Rows are converted per partition, so that they are never all held as Python objects
+        result = self.session.execute(
+            q_edges,
+            execution_options={
+                "stream_results": True,
+                "max_row_buffer": self.chunk_size})
+        l_columns = [EdgeColumns.from_rows(partition)\
+            for partition in result.partitions(self.chunk_size)]
+        self._columns = EdgeColumns.concatenate(l_columns) if len(l_columns) > 0\
+            else EdgeColumns.from_rows([])
 
-    # pylint: disable=comparison-with-callable
-    def edges(self) -> Iterator[DateYield]:
-        """Yields edges of collaboration network iteratively as they form in temporal order.
+    def _stream_collaboration(self, q_edges: select) -> Iterator[EdgeColumns]:
+        # A separate connection keeps the server-side cursor alive
+        # while consumers commit on `self.session` (e.g., after each date).
+        with self.session.get_bind().connect() as conn:
+            result = conn\
+                .execution_options(
+                    stream_results=True,
+                    max_row_buffer=self.chunk_size)\
+                .execute(q_edges)
+            for partition in result.partitions(self.chunk_size):
+                yield EdgeColumns.from_rows(partition)
+
+    def iter_columns(self) -> Iterator[EdgeColumns]:
+        """Yields the ordered collaborations as typed column chunks.
+        Each chunk ends on a date block boundary.
+        Without streaming, all collaborations are yielded as a single chunk.
 
         Yields:
-            DateYield: All edges formed on the current point in time.
-                If there are multiple projects released at a specific point in time,
-                all edges forming with regards to these projects are yielded at once.
+            EdgeColumns: Chunk of collaborations.
         """
-        date_curr = None # Current block defined by datetime
-        proj_curr = None
+        if not self.stream:
+            if self._columns is None:
+                q_edges = self._create_sql_query()
+                self._preprocess_collaboration(q_edges)
+            if len(self._columns.dates) > 0:
+                yield self._columns
+            return
 
-        if self._l_collaborations is None:
-            q_edges = self._create_sql_query()
-            self._preprocess_collaboration(q_edges)
+        columns_carry = None
+        for columns in self._stream_collaboration(self._create_sql_query()):
+            if columns_carry is not None:
+                columns = EdgeColumns.concatenate([columns_carry, columns])
+            # The last date block might continue in the next chunk
+            idx_last = int(np.searchsorted(columns.dates, columns.dates[-1], side="left"))
+            if idx_last > 0:
+                yield columns.slice(0, idx_last)
+            columns_carry = columns.slice(idx_last)
+        if columns_carry is not None:
+            yield columns_carry
 
-        d_collabs_curr = dict()
-
-        edges_yield = defaultdict(int)
-        collabs_yield = defaultdict(int)
-
-        for date_row, proj_row, collab_row, collaboration_row in self._l_collaborations:
-            if date_curr is None: # First iteration
-                date_curr = date_row
-                proj_curr = proj_row
-
-            # Detect new project block
-            if proj_row != proj_curr:
-                edges_yield[proj_curr] = d_collabs_curr
-                d_collabs_curr: Dict[int, int] = dict()
-                proj_curr = proj_row
-
-            # Detect new date block
-            if date_curr != date_row:
-                yield DateYield(
-                    timestamp=date_curr,
-                    collaborators={
-                        idx_collab:
-                            CollaboratorYield(
-                                self.map_collaborator_gender[idx_collab],
-                                cnt_proj)\
-                                    for idx_collab, cnt_proj in collabs_yield.items()},
-                    collaborations=edges_yield
-                )
-
-                # Reset date block structures
-                date_curr = date_row
-                edges_yield = defaultdict(int)
-                collabs_yield = defaultdict(int)
-
-            d_collabs_curr[collab_row] = collaboration_row
-            collabs_yield[collab_row] += 1
-
-        # Yield final date block
-        edges_yield[proj_curr] = d_collabs_curr
-        yield DateYield(
-            timestamp=date_curr,
-            collaborators={
-                idx_collab:\
-                    CollaboratorYield(
-                        self.map_collaborator_gender[idx_collab],
-                        cnt_proj)\
-                            for idx_collab, cnt_proj in collabs_yield.items()},
-            collaborations=edges_yield
-        )
+    def get_last_publication_dates(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Retrieves the date of the last publication of each collaborator.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Collaborator IDs and the day ordinals of their last publication.
+        """
+        stmt = self._filter_date_end(self._filter_collaborators(select(
+                Collaboration.id_collaborator,
+                func.max(Project.timestamp)).\
+            join(Project, Collaboration.id_project == Project.id).\
+            join(Collaborator,
+                Collaboration.id_collaborator == Collaborator.id))).\
+            group_by(Collaboration.id_collaborator)
+        rows = self.session.execute(stmt).all()
+        return (
+            np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows)),
+            np.fromiter((row[1].toordinal() for row in rows), dtype=np.int32, count=len(rows)))
 
     def _init_map_collaborator_gender(self):
         stmt = (select(
@@ -1,8 +1,9 @@
 import warnings
+import itertools
 from collections import defaultdict
 from typing import Dict
 
-from sqlalchemy import select, and_, func, alias, or_
+from sqlalchemy import select, and_, alias, or_
 import numpy as np
 import pandas as pd
 
@@ -15,12 +16,14 @@ from .dbm.models.metric_cs_br_comparison import\
     MetricCollaboratorSeriesBrokerageRateComparison
 from .dbm.models.collaborator_series import CollaboratorSeriesBrokerage
 from .dbm.models.gender import Gender
+from .dbm.models.collaborator_stage_max import CollaboratorStageMax
 from .dbm.models.collaborator import Collaborator
 from .dbm.models.project import Project
-from .dbm.models.collaboration import Collaboration
+from .dbm.models.collaborator_lifecycle import CollaboratorLifecycle
 from .dbm.models.triadic_closure_motifs import\
     TriadicClosureMotif, SimplicialTriadicClosureMotif
 from .career_series.collaborator_filter import StandardFilter
+from .career_series.collaborator_series_brokerage import MOTIF_TYPES, ROLES
 
 def select_latest_metric_config_id_by_args(metric_args: Dict[str, str]) -> int:
     return select(MetricConfiguration.id)\
@@ -144,14 +147,51 @@ def init_metric_id(metric_args: Dict[str, str], session)\
         f"Found ID '{id_metric}'."))
     return id_metric
 
+def check_stages_max(session: CumAdvBrokSession, id_metric_config: int) -> None:
+    """Raises an error if no final career stages are stored for a career series configuration,
+    e.g., because its series were stored densely before.
+    """
+    is_present = session.execute(
+        select(CollaboratorStageMax.id)\
+            .where(CollaboratorStageMax.id_metric_configuration == id_metric_config)\
+            .limit(1)).first() is not None
+    if not is_present:
+        raise ValueError((
+            f"No final career stages stored for career series configuration {id_metric_config}. "
+            "Series are stored sparsely and need the final career stages to reconstruct zero counts: "
+            "re-run `02_brokerage_frequencies/01a_compute_brokerage_frequency_series.py`."))
+
 def get_brokerage_freq_by_id(
         id_metric_config: int,
         session: CumAdvBrokSession,
         filter_max_stage: bool = True) -> pd.DataFrame:
+    check_stages_max(session, id_metric_config)
+
+    # Series of all collaborators with a final career stage
+    q_stage_max = select(
+            CollaboratorStageMax.id_collaborator,
+            Gender.gender,
+            CollaboratorStageMax.stage_max)\
+        .select_from(CollaboratorStageMax)\
+        .join(
+            Collaborator,
+            Collaborator.id == CollaboratorStageMax.id_collaborator
+        )\
+        .join(
+            Gender,
+            Gender.id == Collaborator.id_gender
+        )\
+        .where(CollaboratorStageMax.id_metric_configuration == id_metric_config)
+    d_stage_max = defaultdict(list)
+    for id_c, gender, stage_max in session.execute(q_stage_max):
+        d_stage_max["id_collaborator"].append(id_c)
+        d_stage_max["gender"].append(gender)
+        d_stage_max["stage_max"].append(stage_max)
+    d_stage_max = pd.DataFrame(d_stage_max, columns=["id_collaborator", "gender", "stage_max"])
+
+    # Only non-zero values are stored
     q_cs_broker_freq = select(
-            CollaboratorSeriesBrokerage.id,
             CollaboratorSeriesBrokerage.id_collaborator,
-            Gender.gender,
             BinsRealization.position,
             CollaboratorSeriesBrokerage.motif_type,
             CollaboratorSeriesBrokerage.role,
@@ -160,70 +200,50 @@ def get_brokerage_freq_by_id(
         .join(
             BinsRealization,
             BinsRealization.id == CollaboratorSeriesBrokerage.id_bin)\
-        .join(
-            Collaborator,
-            Collaborator.id == CollaboratorSeriesBrokerage.id_collaborator
-        )\
-        .join(
-            Gender,
-            Gender.id == Collaborator.id_gender
-        )\
         .where(
             and_(
                 CollaboratorSeriesBrokerage.id_metric_configuration == id_metric_config
             ))
-    d_brokerage_freq = defaultdict(list)
-    for id_cs, id_c, gender, pos, mt, ro, val in session.execute(q_cs_broker_freq):
-        d_brokerage_freq["id"].append(id_cs)
-        d_brokerage_freq["id_collaborator"].append(id_c)
-        d_brokerage_freq["gender"].append(gender)
-        d_brokerage_freq["stage"].append(pos)
-        d_brokerage_freq["motif_type"].append(mt)
-        d_brokerage_freq["role"].append(ro)
-        d_brokerage_freq["value"].append(val)
-    d_brokerage_freq = pd.DataFrame(d_brokerage_freq).set_index("id")
+    d_values = defaultdict(list)
+    for id_c, pos, mt, ro, val in session.execute(q_cs_broker_freq):
+        d_values["id_collaborator"].append(id_c)
+        d_values["stage"].append(pos)
+        d_values["motif_type"].append(mt)
+        d_values["role"].append(ro)
+        d_values["value"].append(val)
+    d_values = pd.DataFrame(d_values, columns=["id_collaborator", "stage", "motif_type", "role", "value"])
+
+    # Reconstruct zero counts of all stages up to the final one for all motif types and roles
+    # (excluding the last, incomplete stage if `filter_max_stage`)
+    a_n_stages = d_stage_max["stage_max"].values + (0 if filter_max_stage else 1)
+    d_brokerage_freq = d_stage_max\
+        .loc[d_stage_max.index.repeat(a_n_stages)]\
+        .drop(columns="stage_max")
+    d_brokerage_freq["stage"] = d_brokerage_freq.groupby("id_collaborator").cumcount()
+    d_brokerage_freq = d_brokerage_freq\
+        .merge(pd.DataFrame(itertools.product(MOTIF_TYPES, ROLES), columns=["motif_type", "role"]), how="cross")\
+        .merge(d_values, on=["id_collaborator", "stage", "motif_type", "role"], how="left")
+    d_brokerage_freq["value"] = d_brokerage_freq["value"].fillna(0).astype(int)
 
     # Add a dummy group to everyone
     d_brokerage_freq["g_dummy"] = "0"
 
-    # Remove last (incomplete) stages
-    if filter_max_stage:
-        # Assign max stage
-        # TODO: Add this to query directly
-        gs_idc_stage_max = d_brokerage_freq\
-            .groupby("id_collaborator")\
-            ["stage"]\
-            .max()\
-            .rename("stage_max")
-        _sm = d_brokerage_freq\
-            .join(gs_idc_stage_max, on="id_collaborator")\
-            ["stage_max"]
-        d_brokerage_freq = d_brokerage_freq[d_brokerage_freq["stage"] < _sm]
-
     return d_brokerage_freq
 
 def get_auth_info(session, filtered: bool = True) -> pd.DataFrame:
-    sq_collaborator_id = select(Collaborator.id.label("id_collaborator"))\
-        if not filtered else\
-            StandardFilter()\
-                .create_collaborator_source_subquery()
-    sq_birth_death = select(Collaboration.id_collaborator,
-                func.min(Project.timestamp).label("birth"),\
-                func.max(Project.timestamp).label("death"))\
-        .select_from(Collaboration)\
-        .join(Project, Project.id == Collaboration.id_project)\
-        .join(Collaborator, Collaborator.id == Collaboration.id_collaborator)\
-        .group_by(Collaboration.id_collaborator)\
-        .subquery()
     q = select(
-        sq_collaborator_id.c.id_collaborator,
-        sq_birth_death.c.birth,
-        sq_birth_death.c.death,
+        CollaboratorLifecycle.id_collaborator,
+        CollaboratorLifecycle.birth,
+        CollaboratorLifecycle.death,
         Gender.gender)\
-        .select_from(sq_collaborator_id)\
-        .join(sq_birth_death, sq_collaborator_id.c.id_collaborator == sq_birth_death.c.id_collaborator)\
-        .join(Collaborator, Collaborator.id == sq_collaborator_id.c.id_collaborator)\
+        .select_from(CollaboratorLifecycle)\
+        .join(Collaborator, Collaborator.id == CollaboratorLifecycle.id_collaborator)\
         .join(Gender, Gender.id == Collaborator.id_gender)
+    if filtered:
+        sq_collaborator_id = StandardFilter()\
+            .create_collaborator_source_subquery()
+        q = q.join(sq_collaborator_id,
+                   sq_collaborator_id.c.id_collaborator == CollaboratorLifecycle.id_collaborator)
     d_coll = defaultdict(list)
     for idx, birth, death, gender in session.execute(q):
         d_coll["id"].append(idx)
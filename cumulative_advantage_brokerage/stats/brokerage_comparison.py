@@ -1,24 +1,28 @@
+import itertools
 from typing import Optional, Union, Generator, Tuple
 from collections import defaultdict
 
 import pandas as pd
 import numpy as np
 import scipy as sc
-from sqlalchemy import select, and_, func, literal
+from sqlalchemy import select, and_, func, literal, true, values, column, String
 from sqlalchemy.orm import Query
 
 from .grouper import Grouper, GrouperDummy
 from .statistical_tests import StatisticalTest
 from ..constants import N_RESAMPLES_DEFAULT, N_STAGES
+from ..queries import check_stages_max
+from ..career_series.collaborator_series_brokerage import MOTIF_TYPES, ROLES
 from ..dbm import\
     MetricCollaboratorSeriesBrokerageFrequencyComparison,\
     MetricCollaboratorSeriesBrokerageRateComparison,\
     CollaboratorSeriesBrokerage, BinsRealization,\
-    Collaboration, Project, Gender, Collaborator,\
-    HasSession, CumAdvBrokSession, ImpactGroup
+    Gender, Collaborator, CollaboratorLifecycle,\
+    HasSession, CumAdvBrokSession, ImpactGroup, CollaboratorStageMax
 
 class CollaboratorSeriesBrokerageComparison(HasSession):
     _df_cs_cached: Union[pd.DataFrame, None]
+    _df_cs_base_cached: Union[pd.DataFrame, None]
     id_metric_config_comparison: int
     id_metric_config_career: int
     id_metric_config_impact_group: int
@@ -43,131 +47,145 @@ class CollaboratorSeriesBrokerageComparison(HasSession):
         self.n_resamples = n_resamples
         self.grouper = grouper if grouper is not None else GrouperDummy
         self._df_cs_cached = None
+        self._df_cs_base_cached = None
+        check_stages_max(self.session, self.id_metric_config_career)
 
     def init_cached_data(self):
         self._log("Loading all data from DB...")
-        q_base = self._get_query_base()
-        q_values = select(
-                q_base.c.id_collaborator,
-                q_base.c.stage,
-                q_base.c.stage_max_career,
-                q_base.c.stage_max_impact,
-                q_base.c.decade_birth,
-                q_base.c.motif_type,
-                q_base.c.role,
-                q_base.c.g_dummy,
-                q_base.c.gender,
-                func.sum(q_base.c.value))\
-            .select_from(q_base)\
-            .group_by(
-                q_base.c.id_collaborator,
-                q_base.c.stage,
-                q_base.c.stage_max_career,
-                q_base.c.stage_max_impact,
-                q_base.c.decade_birth,
-                q_base.c.motif_type,
-                q_base.c.role,
-                q_base.c.g_dummy,
-                q_base.c.gender)
-
+        q_base = self._get_query_base().subquery()
+        _df_base = defaultdict(list)
+        for id_c, gender, stage_max_career, stage_max_impact,\
+            decade_birth, motif_type, role, g_dummy\
+                in self.session.execute(select(q_base)):
+            _df_base["id_collaborator"].append(id_c)
+            _df_base["gender"].append(gender)
+            _df_base["stage_max_career"].append(stage_max_career)
+            _df_base["stage_max_impact"].append(stage_max_impact)
+            _df_base["decade_birth"].append(decade_birth)
+            _df_base["motif_type"].append(motif_type)
+            _df_base["role"].append(role)
+            _df_base["g_dummy"].append(g_dummy)
+        self._df_cs_base_cached = pd.DataFrame(_df_base, columns=[
+            "id_collaborator", "gender", "stage_max_career", "stage_max_impact",
+            "decade_birth", "motif_type", "role", "g_dummy"])
+
+        # Only non-zero values are stored
+        q_values = self._get_query_values().subquery()
         _df = defaultdict(list)
-        for id_c, stage, stage_max_career, stage_max_impact,\
-            decade_birth, motif_type, role, g_dummy, gender, val\
-                in self.session.execute(q_values):
+        for id_c, stage, motif_type, role, val in self.session.execute(select(q_values)):
             _df["id_collaborator"].append(id_c)
             _df["stage"].append(stage)
-            _df["stage_max_career"].append(stage_max_career)
-            _df["stage_max_impact"].append(stage_max_impact)
-            _df["decade_birth"].append(decade_birth)
             _df["motif_type"].append(motif_type)
             _df["role"].append(role)
-            _df["g_dummy"].append(g_dummy)
-            _df["gender"].append(gender)
             _df["value"].append(val)
-
-        self._df_cs_cached = pd.DataFrame(_df)
-        self._log(f"Cached {len(self._df_cs_cached)} entries.")
-
+        self._df_cs_cached = pd.DataFrame(_df, columns=["id_collaborator", "stage", "motif_type", "role", "value"])\
+            .merge(self._df_cs_base_cached, on=["id_collaborator", "motif_type", "role"], how="inner")
+        self._log((f"Cached {len(self._df_cs_cached)} non-zero entries "
+                   f"of {len(self._df_cs_base_cached)} series."))
 
     def _get_query_stage_max(self, metric_config: int)\
             -> Query:
         return select(
-                CollaboratorSeriesBrokerage.id_collaborator,
-                func.max(BinsRealization.position).label("stage_max"))\
-            .select_from(CollaboratorSeriesBrokerage)\
-            .join(
-                BinsRealization, BinsRealization.id == CollaboratorSeriesBrokerage.id_bin)\
-            .group_by(CollaboratorSeriesBrokerage.id_collaborator)\
-            .where(CollaboratorSeriesBrokerage.id_metric_configuration == metric_config)\
+                CollaboratorStageMax.id_collaborator,
+                CollaboratorStageMax.stage_max)\
+            .where(CollaboratorStageMax.id_metric_configuration == metric_config)\
             .subquery()
 
     def _get_query_base(self) -> select:
+        """Query of all series, i.e., collaborators with a final career stage
+        for each combination of motif type and role, and their grouping attributes.
+        """
         sq_stage_max_career = self._get_query_stage_max(
             self.id_metric_config_career)
 
-        sq_project_decade = select(
-                Collaboration.id_collaborator,
-                func.extract("decade", func.min(Project.timestamp)).label("decade_birth"))\
-            .select_from(Collaboration)\
-            .join(Project, Project.id == Collaboration.id_project)\
-            .group_by(Collaboration.id_collaborator)\
-            .subquery()
+        # All motif types and roles, including those without stored (non-zero) values
+        sq_motif_type_role = values(
+                column("motif_type", String),
+                column("role", String),
+                name="motif_type_role")\
+            .data(list(itertools.product(MOTIF_TYPES, ROLES)))
 
         return select(
-            CollaboratorSeriesBrokerage.id,
-            CollaboratorSeriesBrokerage.id_collaborator,
+            sq_stage_max_career.c.id_collaborator,
             Gender.gender,
-            BinsRealization.position.label("stage"),
             sq_stage_max_career.c.stage_max.label("stage_max_career"),
             ImpactGroup.value.label("stage_max_impact"),
-            sq_project_decade.c.decade_birth.label("decade_birth"),
-            CollaboratorSeriesBrokerage.motif_type,
-            CollaboratorSeriesBrokerage.role,
-            literal(GrouperDummy.possible_values[0]).label("g_dummy"),
-            CollaboratorSeriesBrokerage.value)\
-        .select_from(CollaboratorSeriesBrokerage)\
+            CollaboratorLifecycle.decade_birth,
+            sq_motif_type_role.c.motif_type,
+            sq_motif_type_role.c.role,
+            literal(GrouperDummy.possible_values[0]).label("g_dummy"))\
+        .select_from(sq_stage_max_career)\
         .join(
-            BinsRealization, BinsRealization.id == CollaboratorSeriesBrokerage.id_bin)\
+            sq_motif_type_role, true())\
         .join(
-            Collaborator, Collaborator.id == CollaboratorSeriesBrokerage.id_collaborator)\
+            Collaborator, Collaborator.id == sq_stage_max_career.c.id_collaborator)\
         .join(
             Gender, Gender.id == Collaborator.id_gender)\
-        .join(
-            sq_stage_max_career, sq_stage_max_career.c.id_collaborator == CollaboratorSeriesBrokerage.id_collaborator
-        )\
         .join(
             ImpactGroup,
             and_(
-                ImpactGroup.id_collaborator == CollaboratorSeriesBrokerage.id_collaborator,
+                ImpactGroup.id_collaborator == sq_stage_max_career.c.id_collaborator,
                 ImpactGroup.id_metric_configuration == self.id_metric_config_impact_group)
         )\
         .join(
-            sq_project_decade, sq_project_decade.c.id_collaborator == CollaboratorSeriesBrokerage.id_collaborator
-        )\
+            CollaboratorLifecycle,
+            CollaboratorLifecycle.id_collaborator == sq_stage_max_career.c.id_collaborator
+        )
+
+    def _get_query_values(self) -> select:
+        """Query of the non-zero values of all series by stage.
+        """
+        return select(
+            CollaboratorSeriesBrokerage.id_collaborator,
+            BinsRealization.position.label("stage"),
+            CollaboratorSeriesBrokerage.motif_type,
+            CollaboratorSeriesBrokerage.role,
+            CollaboratorSeriesBrokerage.value)\
+        .select_from(CollaboratorSeriesBrokerage)\
+        .join(
+            BinsRealization, BinsRealization.id == CollaboratorSeriesBrokerage.id_bin)\
         .where(CollaboratorSeriesBrokerage.id_metric_configuration == self.id_metric_config_career)
 
     def get_values(
             self, stage_curr: int, stage_max: int,
             verbose: bool = True, grouping_key: Union[None, str] = None,
             **kwargs) -> np.ndarray:
+        # Collaborators without stored values at `stage_curr` have zero counts
         if self._df_cs_cached is not None:
+            df_base = self._df_cs_base_cached
+            a_idc = np.unique(df_base.loc[
+                    (df_base["stage_max_impact"] == stage_max)\
+                    & (df_base["stage_max_career"] > stage_curr)\
+                    & self.grouper.add_constraints_cached(df=df_base, grouping_key=grouping_key),
+                        "id_collaborator"].values)
             df_cached_filtered = self._df_cs_cached.loc[
                     (self._df_cs_cached["stage"] == stage_curr)\
                     & (self._df_cs_cached["stage_max_impact"] == stage_max)\
                     & (self._df_cs_cached["stage_max_career"] > stage_curr)\
                     & self.grouper.add_constraints_cached(df=self._df_cs_cached, grouping_key=grouping_key),
                         ["id_collaborator", "value"]]\
-                .groupby("id_collaborator")["value"].sum()
+                .groupby("id_collaborator")["value"].sum()\
+                .reindex(a_idc, fill_value=0)
             return df_cached_filtered.index.values, df_cached_filtered.values
 
-        q_base = self._get_query_base()
+        q_base = self._get_query_base().subquery()
+        q_values = self._get_query_values().subquery()
+        sq_values_stage = select(q_values)\
+            .where(q_values.c.stage == stage_curr)\
+            .subquery()
         q_values = select(
                 q_base.c.id_collaborator,
-                func.sum(q_base.c.value))\
+                func.coalesce(func.sum(sq_values_stage.c.value), 0))\
             .select_from(q_base)\
+            .join(
+                sq_values_stage,
+                and_(
+                    sq_values_stage.c.id_collaborator == q_base.c.id_collaborator,
+                    sq_values_stage.c.motif_type == q_base.c.motif_type,
+                    sq_values_stage.c.role == q_base.c.role),
+                isouter=True)\
             .where(
                 and_(
-                    q_base.c.stage == stage_curr,
                     q_base.c.stage_max_impact == stage_max,
                     q_base.c.stage_max_career > stage_curr,
                     *self.grouper.add_constraints(q_base=q_base, grouping_key=grouping_key)))\
@@ -17,13 +17,14 @@ from cumulative_advantage_brokerage.dbm import\
     BrokerMotif, SimplicialBrokerMotif,\
     InitiationLinkMotif, SimplicialInitiationLinkMotif,\
     TriadicClosureMotif, SimplicialTriadicClosureMotif,\
-    ImpactGroup
+    ImpactGroup, CollaboratorStageMax, CollaboratorLifecycle, CollaboratorFilterSet
 
 def main():
     """Create tables."""
     config = parse_config([ARG_POSTGRES_DB_APS])
 
     tables_base = [
+        CollaboratorFilterSet, CollaboratorLifecycle,
         Gender, CollaboratorName, Collaboration, Project,
         Collaborator, Citation,
         MetricConfiguration, BinsRealization,
@@ -33,7 +34,7 @@ def main():
         BrokerMotif, SimplicialBrokerMotif,
         InitiationLinkMotif, SimplicialInitiationLinkMotif,
         TriadicClosureMotif, SimplicialTriadicClosureMotif,
-        ImpactGroup]
+        ImpactGroup, CollaboratorStageMax]
     print(f"Creating tables for {config[ARG_POSTGRES_DB_APS]}.")
     engine_test = PostgreSQLEngine.from_config(
         config, key_dbname=ARG_POSTGRES_DB_APS)
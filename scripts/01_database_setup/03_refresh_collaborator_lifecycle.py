@@ -0,0 +1,18 @@
+"""Recomputes the `collaborator_lifecycle` table (birth, death, career length, filter flags)
+from the integrated collaborations.
+`02_integrate_aps_data.py` already refreshes the table;
+run this script after changing collaborations or projects otherwise.
+"""
+from cumulative_advantage_brokerage.config import parse_config
+from cumulative_advantage_brokerage.constants import ARG_POSTGRES_DB_APS
+from cumulative_advantage_brokerage.dbm import\
+    PostgreSQLEngine, CumAdvBrokSession, refresh_collaborator_lifecycle
+
+def main():
+    config = parse_config([ARG_POSTGRES_DB_APS])
+    engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
+    with CumAdvBrokSession(engine) as session:
+        refresh_collaborator_lifecycle(session)
+
+if __name__ == "__main__":
+    main()
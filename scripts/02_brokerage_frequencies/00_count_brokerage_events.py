@@ -1,25 +1,200 @@
+import os
+from datetime import datetime
+from typing import Dict, Any
+from argparse import ArgumentParser
+
+from cumulative_advantage_brokerage.benchmark import measure
 from cumulative_advantage_brokerage.config import parse_config
-from cumulative_advantage_brokerage.constants import ARG_POSTGRES_DB_APS
+from cumulative_advantage_brokerage.constants import\
+    ARG_POSTGRES_DB_APS, ARG_PATH_CONTAINER_OUTPUT,\
+    EDGE_HISTORY_FIRST, TPL_EDGE_HISTORY,\
+    PROJECT_SIZE_EXPAND, PROJECT_SIZE_CLIQUE, TPL_PROJECT_SIZE_POLICY
 from cumulative_advantage_brokerage.dbm import\
     PostgreSQLEngine, CumAdvBrokSession
 from cumulative_advantage_brokerage.network import\
     SQLEdgeGenerator, GrowingTemporalLinkedListNetwork,\
-    InitiationMotifCollector
+    GrowingTemporalArrayNetwork, InitiationMotifCollector,\
+    BatchInitiationMotifCollector, MotifCollectorCheckpointer,\
+    EventProfiler, InsertMotifSink, PostgresCopyMotifSink
+
+NETWORKS = {
+    "linked-list": GrowingTemporalLinkedListNetwork,
+    "array": GrowingTemporalArrayNetwork,
+}
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("--engine",
+                    choices=["event", "batch"],
+                    default="event",
+                    help=("Motif engine: replay of all links (event) "
+                          "or vectorized triangle enumeration on first links (batch)."))
+    ap.add_argument("--workers",
+                    type=int, default=1,
+                    help="Number of worker processes (batch engine only).")
+    ap.add_argument("--stream",
+                    action="store_true",
+                    help="Read collaborations through a server-side cursor.")
+    ap.add_argument("--chunk-size",
+                    type=int, default=100000,
+                    help="Number of rows fetched per chunk in streaming mode.")
+    ap.add_argument("--network",
+                    choices=list(NETWORKS.keys()),
+                    default="linked-list",
+                    help="Network backend.")
+    ap.add_argument("--edge-history",
+                    choices=TPL_EDGE_HISTORY,
+                    default=EDGE_HISTORY_FIRST,
+                    help="Link attributes kept per node pair.")
+    ap.add_argument("--project-size-policy",
+                    choices=TPL_PROJECT_SIZE_POLICY,
+                    default=PROJECT_SIZE_EXPAND,
+                    help=("Handling of projects with more than --max-project-size collaborators: "
+                          "all links (expand), none (skip), links of the first collaborators (cap) "
+                          "or resolved as a clique (clique, refused as it does not write the motifs within them). "
+                          "Event engine only."))
+    ap.add_argument("--max-project-size",
+                    type=int, default=100,
+                    help="Size above which the project size policy applies.")
+    ap.add_argument("--sink",
+                    choices=["copy", "insert"],
+                    default="copy",
+                    help=("Motif writer: batched COPY on a background thread (copy) "
+                          "or one INSERT per date (insert)."))
+    ap.add_argument("--batch-size",
+                    type=int, default=100000,
+                    help="Number of motifs written per COPY batch.")
+    ap.add_argument("--no-eviction",
+                    action="store_true",
+                    help="Keep open triangles of collaborators who stopped publishing.")
+    ap.add_argument("--checkpoint",
+                    type=str, default=None,
+                    help=("Path of the checkpoint file. "
+                          "Defaults to `<PATH_CONTAINER_OUTPUT>/data/motif_collector_checkpoint.npz`."))
+    ap.add_argument("--checkpoint-every-dates",
+                    type=int, default=None,
+                    help="Write a checkpoint after this many dates.")
+    ap.add_argument("--checkpoint-every-seconds",
+                    type=float, default=None,
+                    help="Write a checkpoint after this many seconds.")
+    ap.add_argument("--resume",
+                    action="store_true",
+                    help="Resume from the checkpoint if it exists.")
+    ap.add_argument("--state",
+                    type=str, default=None,
+                    help=("Path of the first-link state of the batch engine. "
+                          "Defaults to `<PATH_CONTAINER_OUTPUT>/data/batch_motif_collector_state.npz`."))
+    ap.add_argument("--save-state",
+                    action="store_true",
+                    help="Store the first-link state after the count (batch engine only).")
+    ap.add_argument("--incremental",
+                    action="store_true",
+                    help=("Only count motifs of dates after the stored state "
+                          "and update the state (batch engine only)."))
+    ap.add_argument("--profile",
+                    type=int, default=None, metavar="EVERY_DATES",
+                    help="Profile the event dispatch and log it every EVERY_DATES dates (event engine only).")
+    ap.add_argument("--profile-csv",
+                    type=str, default=None,
+                    help="Write per-date profiling statistics to this CSV file.")
+    args = ap.parse_args()
+    if args.workers > 1 and args.engine != "batch":
+        ap.error("--workers requires --engine batch.")
+    if (args.profile is not None or args.profile_csv is not None) and args.engine != "event":
+        ap.error("--profile requires --engine event.")
+    if args.project_size_policy != PROJECT_SIZE_EXPAND and args.engine != "event":
+        ap.error("--project-size-policy requires --engine event.")
+    if args.project_size_policy == PROJECT_SIZE_CLIQUE:
+        ap.error(("--project-size-policy clique does not write motifs within large projects "
+                  "and can thus not fill the motif tables."))
+    is_checkpointing = args.resume\
+        or args.checkpoint_every_dates is not None\
+        or args.checkpoint_every_seconds is not None
+    if is_checkpointing and args.engine != "event":
+        ap.error("Checkpoints require --engine event.")
+    if (args.save_state or args.incremental) and args.engine != "batch":
+        ap.error("--save-state and --incremental require --engine batch.")
+    return vars(args)
 
 def main():
     config = parse_config([ARG_POSTGRES_DB_APS])
     engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
+    args = parse_args()
+    path_checkpoint = args["checkpoint"] or os.path.join(
+        config.get(ARG_PATH_CONTAINER_OUTPUT, "."), "data", "motif_collector_checkpoint.npz")
+
+    path_state = args["state"] or os.path.join(
+        config.get(ARG_PATH_CONTAINER_OUTPUT, "."), "data", "batch_motif_collector_state.npz")
+
+    d_state, date_start = None, None
+    if args["resume"] and os.path.exists(path_checkpoint):
+        print(f"Loading checkpoint `{path_checkpoint}`.")
+        d_state = MotifCollectorCheckpointer.load(path_checkpoint)
+        date_start = int(d_state["date"]) + 1
+    if args["incremental"]:
+        print(f"Loading state `{path_state}`.")
+        d_state = BatchInitiationMotifCollector.load_state(path_state)
+        date_start = BatchInitiationMotifCollector.get_date_start(d_state)
 
     with CumAdvBrokSession(engine) as session:
         print("Establishing session.")
-        generator = SQLEdgeGenerator(session=session)
-        print("Initiating network.")
-        network = GrowingTemporalLinkedListNetwork(generator=generator)
-        print("Initiating motif collector.")
-        counter = InitiationMotifCollector(network=network, session=session)
+        sink = PostgresCopyMotifSink(engine=engine, batch_size=args["batch_size"])\
+            if args["sink"] == "copy" else InsertMotifSink(session=session)
+        generator = SQLEdgeGenerator(
+            session=session,
+            stream=args["stream"],
+            chunk_size=args["chunk_size"],
+            date_start=date_start)
+        if args["engine"] == "batch":
+            print("Initiating batch motif collector.")
+            counter = BatchInitiationMotifCollector(
+                generator=generator, session=session,
+                n_workers=args["workers"], sink=sink)
+            if d_state is not None:
+                date = counter.set_state(d_state)
+                if date is None:
+                    print("Counting motifs from the start.")
+                else:
+                    print(f"Counting motifs after {datetime.fromordinal(date).date()}.")
+        else:
+            print("Initiating network.")
+            network = NETWORKS[args["network"]](
+                generator=generator,
+                edge_history=args["edge_history"],
+                project_size_policy=args["project_size_policy"],
+                max_project_size=args["max_project_size"])
+            profiler = None
+            if args["profile"] is not None or args["profile_csv"] is not None:
+                profiler = EventProfiler(
+                    path_csv=args["profile_csv"], every_dates=args["profile"] or 1000)
+            print("Initiating motif collector.")
+            counter = InitiationMotifCollector(
+                network=network, session=session,
+                evict_inactive=not args["no_eviction"], sink=sink, profiler=profiler)
+            if d_state is not None:
+                date = MotifCollectorCheckpointer.restore(counter, d_state)
+                print(f"Resuming after {datetime.fromordinal(date).date()}.")
+
+        checkpointer = None
+        if args["checkpoint_every_dates"] is not None or args["checkpoint_every_seconds"] is not None:
+            checkpointer = MotifCollectorCheckpointer(
+                collector=counter, path=path_checkpoint,
+                every_dates=args["checkpoint_every_dates"],
+                every_seconds=args["checkpoint_every_seconds"])
 
         print("Starting motif count.")
-        counter.integrate_counts()
+        m = measure(counter.integrate_counts)
+        if checkpointer is not None:
+            checkpointer.close()
+        sink.close()
+        if args["save_state"] or args["incremental"]:
+            print(f"Storing state `{path_state}`.")
+            BatchInitiationMotifCollector.save_state(counter.get_state(), path_state)
+        print((f"Finished motif count in {m.wall_time:.1f}s "
+               f"(peak RSS increase: {m.peak_rss / 2**20:.1f} MiB)."))
+        if args["engine"] == "event":
+            print((f"Open triangles left: {counter.triangles_open.n_open}, "
+                   f"evicted: {counter.triangles_open.n_evicted}."))
 
 if __name__ == "__main__":
     main()
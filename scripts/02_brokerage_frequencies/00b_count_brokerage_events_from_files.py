@@ -0,0 +1,121 @@
+"""Counts brokerage events without a database.
+Collaborations are read from column files, which are written from the CSV files
+of `00_data_preprocessing` on the first run, and motifs are written to a CSV file.
+"""
+import os
+from typing import Dict, Any
+from argparse import ArgumentParser
+
+from cumulative_advantage_brokerage.benchmark import measure
+from cumulative_advantage_brokerage.config import parse_config
+from cumulative_advantage_brokerage.constants import\
+    ARG_TRANSF_APS_CSV_FOLDER, ARG_PATH_CONTAINER_OUTPUT,\
+    EDGE_HISTORY_FIRST, TPL_EDGE_HISTORY,\
+    PROJECT_SIZE_EXPAND, PROJECT_SIZE_CLIQUE, TPL_PROJECT_SIZE_POLICY
+from cumulative_advantage_brokerage.network import\
+    FileEdgeGenerator, GrowingTemporalLinkedListNetwork,\
+    GrowingTemporalArrayNetwork, InitiationMotifCollector,\
+    BatchInitiationMotifCollector, EventProfiler, CSVMotifSink
+
+NETWORKS = {
+    "linked-list": GrowingTemporalLinkedListNetwork,
+    "array": GrowingTemporalArrayNetwork,
+}
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("--engine",
+                    choices=["event", "batch"],
+                    default="event",
+                    help=("Motif engine: replay of all links (event) "
+                          "or vectorized triangle enumeration on first links (batch)."))
+    ap.add_argument("--workers",
+                    type=int, default=1,
+                    help="Number of worker processes (batch engine only).")
+    ap.add_argument("--network",
+                    choices=list(NETWORKS.keys()),
+                    default="linked-list",
+                    help="Network backend.")
+    ap.add_argument("--edge-history",
+                    choices=TPL_EDGE_HISTORY,
+                    default=EDGE_HISTORY_FIRST,
+                    help="Link attributes kept per node pair.")
+    ap.add_argument("--project-size-policy",
+                    choices=TPL_PROJECT_SIZE_POLICY,
+                    default=PROJECT_SIZE_EXPAND,
+                    help=("Handling of projects with more than --max-project-size collaborators: "
+                          "all links (expand), none (skip), links of the first collaborators (cap) "
+                          "or resolved as a clique (clique, which does not write the motifs within them). "
+                          "Event engine only."))
+    ap.add_argument("--max-project-size",
+                    type=int, default=100,
+                    help="Size above which the project size policy applies.")
+    ap.add_argument("--columns",
+                    type=str, default=None,
+                    help=("Folder of the column files. "
+                          "Defaults to `<PATH_CONTAINER_OUTPUT>/data/edge_columns`."))
+    ap.add_argument("--motifs",
+                    type=str, default=None,
+                    help=("Path of the motif CSV file. "
+                          "Defaults to `<PATH_CONTAINER_OUTPUT>/data/triadic_closure_motifs.csv`."))
+    ap.add_argument("--profile",
+                    type=int, default=None, metavar="EVERY_DATES",
+                    help="Profile the event dispatch and log it every EVERY_DATES dates (event engine only).")
+    ap.add_argument("--profile-csv",
+                    type=str, default=None,
+                    help="Write per-date profiling statistics to this CSV file.")
+    args = ap.parse_args()
+    if args.workers > 1 and args.engine != "batch":
+        ap.error("--workers requires --engine batch.")
+    if (args.profile is not None or args.profile_csv is not None) and args.engine != "event":
+        ap.error("--profile requires --engine event.")
+    if args.project_size_policy != PROJECT_SIZE_EXPAND and args.engine != "event":
+        ap.error("--project-size-policy requires --engine event.")
+    return vars(args)
+
+def main():
+    config = parse_config([ARG_TRANSF_APS_CSV_FOLDER])
+    args = parse_args()
+    folder_output = os.path.join(config.get(ARG_PATH_CONTAINER_OUTPUT, "."), "data")
+    folder_columns = args["columns"] or os.path.join(folder_output, "edge_columns")
+    path_motifs = args["motifs"] or os.path.join(folder_output, "triadic_closure_motifs.csv")
+
+    generator = FileEdgeGenerator.from_csv(
+        folder_csv=config[ARG_TRANSF_APS_CSV_FOLDER], folder=folder_columns)
+    sink = CSVMotifSink(path=path_motifs)
+    if args["engine"] == "batch":
+        print("Initiating batch motif collector.")
+        counter = BatchInitiationMotifCollector(
+            generator=generator, session=None,
+            n_workers=args["workers"], sink=sink)
+    else:
+        print("Initiating network.")
+        network = NETWORKS[args["network"]](
+            generator=generator,
+            edge_history=args["edge_history"],
+            project_size_policy=args["project_size_policy"],
+            max_project_size=args["max_project_size"])
+        profiler = None
+        if args["profile"] is not None or args["profile_csv"] is not None:
+            profiler = EventProfiler(
+                path_csv=args["profile_csv"], every_dates=args["profile"] or 1000)
+        print("Initiating motif collector.")
+        counter = InitiationMotifCollector(
+            network=network, session=None, sink=sink, profiler=profiler)
+
+    if args["project_size_policy"] == PROJECT_SIZE_CLIQUE:
+        print(("Warning: --project-size-policy clique does not write motifs within large projects. "
+               f"`{path_motifs}` thus differs from --project-size-policy expand "
+               "and should not fill the motif tables."))
+
+    print("Starting motif count.")
+    m = measure(counter.integrate_counts)
+    sink.close()
+    print((f"Finished motif count in {m.wall_time:.1f}s "
+           f"(peak RSS increase: {m.peak_rss / 2**20:.1f} MiB). "
+           f"Motifs written to `{path_motifs}`."))
+    if args["project_size_policy"] == PROJECT_SIZE_CLIQUE:
+        print(f"Motifs within cliques (not written): {counter.n_motifs_clique}.")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,32 @@
+from typing import Dict, Any
+from argparse import ArgumentParser
+
 from cumulative_advantage_brokerage.config import parse_config
 from cumulative_advantage_brokerage.constants import\
     ARG_POSTGRES_DB_APS, CS_BINS_PERCENTILES, STR_CAREER_LENGTH
 from cumulative_advantage_brokerage.dbm import\
-    PostgreSQLEngine, CumAdvBrokSession, MetricConfiguration
-from cumulative_advantage_brokerage.career_series import CollaboratorSeriesBrokerageInference, CareerLengthBinner, StandardFilter
+    PostgreSQLEngine, CumAdvBrokSession, MetricConfiguration, CollaboratorSeriesBrokerage
+from cumulative_advantage_brokerage.career_series import\
+    CollaboratorSeriesBrokerageInference, ArrayCollaboratorSeriesBrokerageInference,\
+    CareerLengthBinner, StandardFilter
+
+ENGINES = {
+    "sql": CollaboratorSeriesBrokerageInference,
+    "array": ArrayCollaboratorSeriesBrokerageInference,
+}
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("--engine",
+                    choices=list(ENGINES.keys()),
+                    default="sql",
+                    help=("Series engine: aggregation per role in the database (sql) "
+                          "or of all motifs at once in memory (array)."))
+    return vars(ap.parse_args())
 
 def main():
     config = parse_config([ARG_POSTGRES_DB_APS])
+    args = parse_args()
 
     engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
 
@@ -33,20 +53,20 @@ def main():
         binner.compute_binning_borders()
         print(f"Found borders: {binner.a_bin_values}\nComputing series...")
 
-        cs = CollaboratorSeriesBrokerageInference(
+        cs = ENGINES[args["engine"]](
             session=session,
             id_metric_configuration=m_config.id,
             binner=binner,
             collaborator_filter=StandardFilter(),
         )
-        l_hist = []
+        print("Submitting final career stages...")
+        session.write_list(l=cs.get_stages_max())
+
         print("Submitting results...")
-        for result in cs.generate_series():
-            l_hist += result.l_series
-            if len(l_hist) >= 100000:
-                session.commit_list(l=l_hist)
-                l_hist = []
-        session.commit_list(l=l_hist)
+        with session.bulk_writer(CollaboratorSeriesBrokerage.__table__, asynchronous=True) as writer:
+            for result in cs.generate_series():
+                writer.write(result.l_series)
+        print(f"Submitted {writer.n_rows} non-zero values.")
 
         print(f"Done.\nCareer series metric ID: {m_config.id}")
 
@@ -147,7 +147,7 @@ def main():
 
                 if len(grouper.possible_values) == 0:
                     l_res = list(cmp.generate_comparisons())
-                    session.commit_list(l_res)
+                    session.write_list(l_res)
                 else:
                     for g_val in grouper.possible_values:
                         print(f"Grouping on {grouper.name}={g_val}")
@@ -155,7 +155,7 @@ def main():
                             cmp.generate_comparisons(
                                 grouping_key=g_val))
                         print(f"\t\tCommitting {len(l_res)} results to DB.")
-                        session.commit_list(l_res)
+                        session.write_list(l_res)
 
             print("Done. IDs for subsequent referencing:")
             for metric, m_id in zip((STR_CITATIONS, STR_PRODUCTIVITY), l_metric_ids):
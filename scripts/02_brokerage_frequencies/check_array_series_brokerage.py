@@ -0,0 +1,68 @@
+"""Checks that the in-memory series engine yields the same brokerage frequency series
+as the aggregation in the database, and compares their wall time.
+Binning borders are read from an existing career length configuration (see `01a_compute_brokerage_frequency_series.py`).
+"""
+import sys
+import time
+from typing import Dict, Any, Set, Tuple, Type
+from argparse import ArgumentParser
+
+from cumulative_advantage_brokerage.config import parse_config
+from cumulative_advantage_brokerage.constants import\
+    ARG_POSTGRES_DB_APS, CS_BINS_PERCENTILES
+from cumulative_advantage_brokerage.dbm import\
+    PostgreSQLEngine, CumAdvBrokSession
+from cumulative_advantage_brokerage.career_series import\
+    CollaboratorSeriesBrokerageInference, ArrayCollaboratorSeriesBrokerageInference,\
+    CareerLengthBinner, StandardFilter
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("-id", "--id-metric-configuration",
+                    type=int, required=True,
+                    help="ID of the career length configuration with computed binning borders.")
+    return vars(ap.parse_args())
+
+def compute_series(
+        session: CumAdvBrokSession,
+        Inference: Type[CollaboratorSeriesBrokerageInference],
+        binner: CareerLengthBinner) -> Tuple[Set[Tuple], int, float]:
+    time_start = time.time()
+    cs = Inference(
+        session=session,
+        id_metric_configuration=None,
+        binner=binner,
+        collaborator_filter=StandardFilter())
+    s_series, n_series = set(), 0
+    for result in cs.generate_series():
+        for series in result.l_series:
+            s_series.add((series.role, series.id_collaborator, series.motif_type, series.id_bin, series.value))
+            n_series += 1
+    return s_series, n_series, time.time() - time_start
+
+def main():
+    config = parse_config([ARG_POSTGRES_DB_APS])
+    engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
+    args = parse_args()
+
+    with CumAdvBrokSession(engine) as session:
+        binner = CareerLengthBinner.from_database(
+            session=session,
+            id_metric_configuration=args["id_metric_configuration"],
+            percentiles=CS_BINS_PERCENTILES,
+            collaborator_filter=StandardFilter())
+        print(f"Computing series in the database with borders {binner.a_bin_values}.")
+        s_sql, n_sql, time_sql = compute_series(session, CollaboratorSeriesBrokerageInference, binner)
+        print("Computing series in memory.")
+        s_array, n_array, time_array = compute_series(session, ArrayCollaboratorSeriesBrokerageInference, binner)
+
+    n_missing, n_extra = len(s_sql - s_array), len(s_array - s_sql)
+    print((f"{n_sql} values in the database ({time_sql:.1f}s), {n_array} in memory ({time_array:.1f}s), "
+           f"{n_missing} missing, {n_extra} extra."))
+    if n_missing + n_extra > 0 or n_sql != n_array:
+        print("Series differ.")
+        sys.exit(1)
+    print("Series are equal.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""Checks that the batch motif collector yields the same motifs
+as the event-driven motif collector on sampled subnetworks,
+both serially and sharded across `--workers` processes.
+Each subnetwork is induced by random seed collaborators and their co-authors.
+No motifs are written to the database.
+"""
+import random
+import sys
+import time
+from typing import Dict, Any, List, Set, Tuple
+from argparse import ArgumentParser
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from cumulative_advantage_brokerage.config import parse_config
+from cumulative_advantage_brokerage.constants import ARG_POSTGRES_DB_APS
+from cumulative_advantage_brokerage.dbm import\
+    PostgreSQLEngine, CumAdvBrokSession, Collaborator, Collaboration
+from cumulative_advantage_brokerage.network import\
+    SQLEdgeGenerator, GrowingTemporalLinkedListNetwork,\
+    InitiationMotifCollector, BatchInitiationMotifCollector,\
+    MemoryMotifSink
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("-n", "--n-samples",
+                    type=int, default=5,
+                    help="Number of sampled subnetworks.")
+    ap.add_argument("-k", "--n-seeds",
+                    type=int, default=50,
+                    help="Number of seed collaborators per subnetwork.")
+    ap.add_argument("-w", "--workers",
+                    type=int, default=2,
+                    help="Number of worker processes of the sharded batch collector.")
+    ap.add_argument("-s", "--seed", type=int, default=0)
+    args = ap.parse_args()
+    if args.workers < 2:
+        ap.error("--workers must be at least 2 to compare against the serial batch collector.")
+    return vars(args)
+
+def sample_collaborators(
+        session: CumAdvBrokSession, l_ids: List[int],
+        n_seeds: int, rnd: random.Random) -> List[int]:
+    l_seeds = rnd.sample(l_ids, min(n_seeds, len(l_ids)))
+    coll_seed, coll_coauthor = aliased(Collaboration), aliased(Collaboration)
+    stmt = select(coll_coauthor.id_collaborator)\
+        .join(coll_seed, coll_seed.id_project == coll_coauthor.id_project)\
+        .where(coll_seed.id_collaborator.in_(l_seeds))\
+        .distinct()
+    return sorted(set(l_seeds) | set(session.execute(stmt).scalars()))
+
+def to_set(l_motifs: List[Dict[str, Any]]) -> Set[Tuple]:
+    return {tuple(sorted(motif.items())) for motif in l_motifs}
+
+def count_batch(
+        session: CumAdvBrokSession, l_collaborators: List[int],
+        n_workers: int) -> Tuple[Set[Tuple], float]:
+    time_start = time.time()
+    collector_batch = BatchInitiationMotifCollector(
+        generator=SQLEdgeGenerator(session=session, id_collaborators=l_collaborators),
+        session=session, n_workers=n_workers, sink=MemoryMotifSink())
+    s_motifs = to_set(
+        motif for l_motifs in collector_batch.generate_motifs() for motif in l_motifs)
+    return s_motifs, time.time() - time_start
+
+def compare(s_motifs_event: Set[Tuple], s_motifs_batch: Set[Tuple]) -> Tuple[int, int]:
+    return len(s_motifs_event - s_motifs_batch), len(s_motifs_batch - s_motifs_event)
+
+def main():
+    config = parse_config([ARG_POSTGRES_DB_APS])
+    engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
+    args = parse_args()
+    rnd = random.Random(args["seed"])
+
+    n_failed = 0
+    with CumAdvBrokSession(engine) as session:
+        l_ids = list(session.execute(select(Collaborator.id)).scalars())
+        for i in range(args["n_samples"]):
+            l_collaborators = sample_collaborators(
+                session=session, l_ids=l_ids, n_seeds=args["n_seeds"], rnd=rnd)
+
+            time_start = time.time()
+            network = GrowingTemporalLinkedListNetwork(
+                generator=SQLEdgeGenerator(session=session, id_collaborators=l_collaborators))
+            collector = InitiationMotifCollector(
+                network=network, session=session, sink=MemoryMotifSink())
+            s_motifs_event = to_set(
+                motif for l_motifs in collector.generate_motifs() for motif in l_motifs)
+            time_event = time.time() - time_start
+
+            s_motifs_batch, time_batch = count_batch(
+                session=session, l_collaborators=l_collaborators, n_workers=1)
+            s_motifs_sharded, time_sharded = count_batch(
+                session=session, l_collaborators=l_collaborators, n_workers=args["workers"])
+
+            n_missing, n_extra = compare(s_motifs_event, s_motifs_batch)
+            n_missing_sharded, n_extra_sharded = compare(s_motifs_event, s_motifs_sharded)
+            print((f"Sample {i}: {len(l_collaborators)} collaborators, "
+                   f"{len(s_motifs_event)} motifs (event: {time_event:.1f}s, batch: {time_batch:.1f}s, "
+                   f"batch with {args['workers']} workers: {time_sharded:.1f}s), "
+                   f"batch: {n_missing} missing, {n_extra} extra, "
+                   f"sharded: {n_missing_sharded} missing, {n_extra_sharded} extra."))
+            n_failed += int(n_missing + n_extra + n_missing_sharded + n_extra_sharded > 0)
+
+    if n_failed > 0:
+        print(f"{n_failed} of {args['n_samples']} samples differ.")
+        sys.exit(1)
+    print("All samples are equal.")
+
+if __name__ == "__main__":
+    main()
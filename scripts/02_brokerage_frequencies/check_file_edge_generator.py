@@ -0,0 +1,68 @@
+"""Checks that the file-backed edge generator yields the same collaborations
+as the SQL edge generator, and hence the same `DateYield`s.
+Column files are written from the CSV files of `00_data_preprocessing` if they do not exist.
+"""
+import os
+import sys
+import time
+from typing import Dict, Any
+from argparse import ArgumentParser
+
+import numpy as np
+
+from cumulative_advantage_brokerage.config import parse_config
+from cumulative_advantage_brokerage.constants import\
+    ARG_POSTGRES_DB_APS, ARG_TRANSF_APS_CSV_FOLDER, ARG_PATH_CONTAINER_OUTPUT
+from cumulative_advantage_brokerage.dbm import\
+    PostgreSQLEngine, CumAdvBrokSession
+from cumulative_advantage_brokerage.network import\
+    SQLEdgeGenerator, FileEdgeGenerator
+from cumulative_advantage_brokerage.network.sql_edge_generator import EdgeColumns
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("--columns",
+                    type=str, default=None,
+                    help=("Folder of the column files. "
+                          "Defaults to `<PATH_CONTAINER_OUTPUT>/data/edge_columns`."))
+    return vars(ap.parse_args())
+
+def main():
+    config = parse_config([ARG_POSTGRES_DB_APS, ARG_TRANSF_APS_CSV_FOLDER])
+    engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
+    args = parse_args()
+    folder_columns = args["columns"] or os.path.join(
+        config.get(ARG_PATH_CONTAINER_OUTPUT, "."), "data", "edge_columns")
+
+    time_start = time.time()
+    generator_file = FileEdgeGenerator.from_csv(
+        folder_csv=config[ARG_TRANSF_APS_CSV_FOLDER], folder=folder_columns)
+    columns_file = EdgeColumns.concatenate(list(generator_file.iter_columns()))
+    time_file = time.time() - time_start
+
+    with CumAdvBrokSession(engine) as session:
+        time_start = time.time()
+        generator_sql = SQLEdgeGenerator(session=session)
+        columns_sql = EdgeColumns.concatenate(list(generator_sql.iter_columns()))
+        time_sql = time.time() - time_start
+
+    print((f"{len(columns_sql.dates)} collaborations from SQL ({time_sql:.1f}s), "
+           f"{len(columns_file.dates)} from files ({time_file:.1f}s)."))
+    n_failed = 0
+    for field in EdgeColumns._fields:
+        a_sql, a_file = getattr(columns_sql, field), getattr(columns_file, field)
+        if not np.array_equal(a_sql, a_file):
+            print(f"Column `{field}` differs.")
+            n_failed += 1
+    d_gender_sql = generator_sql.map_collaborator_gender
+    if any(d_gender_sql.get(id_collab) != id_gender\
+            for id_collab, id_gender in generator_file.map_collaborator_gender.items()):
+        print("Genders of collaborators differ.")
+        n_failed += 1
+
+    if n_failed > 0:
+        sys.exit(1)
+    print("Both generators yield the same collaborations.")
+
+if __name__ == "__main__":
+    main()
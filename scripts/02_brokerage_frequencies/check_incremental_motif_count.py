@@ -0,0 +1,93 @@
+"""Checks that counting motifs incrementally for a held-out year
+yields the same motifs as counting all dates at once.
+The count up to the held-out year is stored as state and continued on the held-out year.
+No motifs are written to the database.
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set, Tuple
+from argparse import ArgumentParser
+
+from sqlalchemy import select, func
+
+from cumulative_advantage_brokerage.config import parse_config
+from cumulative_advantage_brokerage.constants import ARG_POSTGRES_DB_APS
+from cumulative_advantage_brokerage.dbm import\
+    PostgreSQLEngine, CumAdvBrokSession, Project
+from cumulative_advantage_brokerage.network import\
+    SQLEdgeGenerator, BatchInitiationMotifCollector, MemoryMotifSink
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("-y", "--year",
+                    type=int, default=None,
+                    help="Held-out year. Defaults to the last year of publications.")
+    ap.add_argument("--workers",
+                    type=int, default=1,
+                    help="Number of worker processes.")
+    return vars(ap.parse_args())
+
+def to_set(l_motifs: List[Dict[str, Any]]) -> Set[Tuple]:
+    return {tuple(sorted(motif.items())) for motif in l_motifs}
+
+def count_motifs(
+        session: CumAdvBrokSession, n_workers: int,
+        date_start: Optional[int] = None, date_end: Optional[int] = None,
+        d_state: Optional[Dict[str, Any]] = None)\
+            -> Tuple[BatchInitiationMotifCollector, List[Dict[str, Any]]]:
+    sink = MemoryMotifSink()
+    collector = BatchInitiationMotifCollector(
+        generator=SQLEdgeGenerator(session=session, date_start=date_start, date_end=date_end),
+        session=session, n_workers=n_workers, sink=sink)
+    if d_state is not None:
+        collector.set_state(d_state)
+    collector.integrate_counts()
+    return collector, sink.motifs
+
+def main():
+    config = parse_config([ARG_POSTGRES_DB_APS])
+    engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
+    args = parse_args()
+
+    with CumAdvBrokSession(engine) as session:
+        year = args["year"] if args["year"] is not None\
+            else session.execute(select(func.max(Project.timestamp))).scalar_one().year
+        date_cut = datetime(year=year, month=1, day=1).toordinal()
+        print(f"Holding out {year}.")
+
+        time_start = time.time()
+        _, l_motifs_full = count_motifs(session=session, n_workers=args["workers"])
+        time_full = time.time() - time_start
+
+        collector, l_motifs_base = count_motifs(
+            session=session, n_workers=args["workers"], date_end=date_cut)
+        with tempfile.TemporaryDirectory() as path_dir:
+            path_state = os.path.join(path_dir, "state.npz")
+            BatchInitiationMotifCollector.save_state(collector.get_state(), path_state)
+            d_state = BatchInitiationMotifCollector.load_state(path_state)
+
+        time_start = time.time()
+        _, l_motifs_increment = count_motifs(
+            session=session, n_workers=args["workers"],
+            date_start=BatchInitiationMotifCollector.get_date_start(d_state), d_state=d_state)
+        time_increment = time.time() - time_start
+
+    s_motifs_full = to_set(l_motifs_full)
+    s_motifs_incremental = to_set(l_motifs_base + l_motifs_increment)
+    n_missing = len(s_motifs_full - s_motifs_incremental)
+    n_extra = len(s_motifs_incremental - s_motifs_full)
+    n_duplicate = len(l_motifs_base) + len(l_motifs_increment) - len(s_motifs_incremental)
+    print((f"{len(s_motifs_full)} motifs (full: {time_full:.1f}s), "
+           f"{len(l_motifs_increment)} of {year} (increment: {time_increment:.1f}s), "
+           f"{n_missing} missing, {n_extra} extra, {n_duplicate} duplicate."))
+
+    if n_missing + n_extra + n_duplicate > 0:
+        print("Incremental and full count differ.")
+        sys.exit(1)
+    print("Incremental and full count are equal.")
+
+if __name__ == "__main__":
+    main()
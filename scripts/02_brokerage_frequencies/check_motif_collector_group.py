@@ -0,0 +1,117 @@
+"""Checks that collectors of a `MotifCollectorGroup` count the same motifs on one replay
+as each collector on its own replay, and compares the wall time of both.
+Collectors differ in their motif definition, eviction and sink,
+such that their motifs differ and each is compared against its own replay.
+Collaborations are read from column files (see `00b_count_brokerage_events_from_files.py`).
+"""
+import csv
+import os
+import sys
+import tempfile
+from typing import Dict, Any, List, Tuple, Type
+from argparse import ArgumentParser
+
+from cumulative_advantage_brokerage.benchmark import measure_isolated
+from cumulative_advantage_brokerage.constants import EDGE_HISTORY_FIRST
+from cumulative_advantage_brokerage.network import\
+    FileEdgeGenerator, GrowingTemporalLinkedListNetwork,\
+    InitiationMotifCollector, MotifCollectorGroup,\
+    MotifSink, MemoryMotifSink, CSVMotifSink
+from cumulative_advantage_brokerage.network.sql_edge_generator import DateYield
+
+class ClosedWithinMotifCollector(InitiationMotifCollector):
+    """Only keeps motifs which close at most `max_dt_close` days after their second link.
+    """
+    max_dt_close: int
+
+    def __init__(self, *args, max_dt_close: int = 365, **kwargs) -> None:
+        self.max_dt_close = max_dt_close
+        super().__init__(*args, **kwargs)
+
+    def _finalize_current_date(self, date: DateYield):
+        self._l_motifs = [motif for motif in self._l_motifs\
+            if motif["dt_close"] is None or motif["dt_close"] <= self.max_dt_close]
+        super()._finalize_current_date(date)
+
+# Class, arguments and sink type of the collectors (cycled)
+COLLECTORS: List[Tuple[Type[InitiationMotifCollector], Dict[str, Any], str]] = [
+    (InitiationMotifCollector, {"evict_inactive": True}, "memory"),
+    (ClosedWithinMotifCollector, {"evict_inactive": False, "max_dt_close": 365}, "csv"),
+    (ClosedWithinMotifCollector, {"evict_inactive": True, "max_dt_close": 30}, "memory"),
+]
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("--columns",
+                    type=str, required=True,
+                    help="Folder of the column files.")
+    ap.add_argument("-n", "--n-collectors",
+                    type=int, default=3,
+                    help=("Number of collectors (cycling through all motifs, "
+                          "motifs closed within one year and within 30 days)."))
+    return vars(ap.parse_args())
+
+def create_sink(sink_type: str, path: str) -> MotifSink:
+    return CSVMotifSink(path=path) if sink_type == "csv" else MemoryMotifSink()
+
+def read_sink(sink: MotifSink) -> List[tuple]:
+    if isinstance(sink, CSVMotifSink):
+        sink.close()
+        with open(sink.path, "r", encoding="utf-8", newline="") as file:
+            return sorted(tuple(row) for row in list(csv.reader(file))[1:])
+    return sorted(tuple(motif.values()) for motif in sink.motifs)
+
+def count_separately(folder: str, n_collectors: int, folder_sinks: str) -> List[List[tuple]]:
+    l_l_motifs = []
+    for i in range(n_collectors):
+        Collector, kwargs, sink_type = COLLECTORS[i % len(COLLECTORS)]
+        network = GrowingTemporalLinkedListNetwork(
+            generator=FileEdgeGenerator(folder=folder), edge_history=EDGE_HISTORY_FIRST)
+        sink = create_sink(sink_type, os.path.join(folder_sinks, f"separate_{i}.csv"))
+        Collector(network=network, session=None, sink=sink, **kwargs).integrate_counts()
+        l_l_motifs.append(read_sink(sink))
+    return l_l_motifs
+
+def count_grouped(folder: str, n_collectors: int, folder_sinks: str) -> List[List[tuple]]:
+    network = GrowingTemporalLinkedListNetwork(
+        generator=FileEdgeGenerator(folder=folder), edge_history=EDGE_HISTORY_FIRST)
+    group = MotifCollectorGroup(network=network)
+    l_sinks = []
+    for i in range(n_collectors):
+        Collector, kwargs, sink_type = COLLECTORS[i % len(COLLECTORS)]
+        sink = create_sink(sink_type, os.path.join(folder_sinks, f"grouped_{i}.csv"))
+        group.add_collector(Collector=Collector, sink=sink, **kwargs)
+        l_sinks.append(sink)
+    group.integrate_counts()
+    return [read_sink(sink) for sink in l_sinks]
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as folder_sinks:
+        print(f"Counting motifs with {args['n_collectors']} collectors on separate replays.")
+        m_separate = measure_isolated(
+            count_separately, args["columns"], args["n_collectors"], folder_sinks)
+        print(f"Counting motifs with {args['n_collectors']} collectors on one replay.")
+        m_grouped = measure_isolated(
+            count_grouped, args["columns"], args["n_collectors"], folder_sinks)
+
+    print((f"Separate: {m_separate.wall_time:.1f}s (peak RSS +{m_separate.peak_rss / 2**20:.1f} MiB), "
+           f"grouped: {m_grouped.wall_time:.1f}s (peak RSS +{m_grouped.peak_rss / 2**20:.1f} MiB), "
+           f"speedup: {m_separate.wall_time / m_grouped.wall_time:.2f}x."))
+    n_failed = 0
+    for i, (l_separate, l_grouped) in enumerate(zip(m_separate.result, m_grouped.result)):
+        if l_separate != l_grouped:
+            print((f"Collector {i} differs: {len(l_separate)} motifs on a separate replay, "
+                   f"{len(l_grouped)} on the shared replay."))
+            n_failed += 1
+    n_distinct = len({tuple(l_motifs) for l_motifs in m_separate.result})
+    if args["n_collectors"] > 1 and n_distinct < 2:
+        print("All collectors count identical motifs, thus, their separation is not checked.")
+        n_failed += 1
+    if n_failed > 0:
+        sys.exit(1)
+    print((f"All collectors count the same {[len(l) for l in m_grouped.result]} motifs "
+           f"({n_distinct} distinct outputs)."))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measures the cost of checkpoints of the motif collector:
+the longest pause of counting, the peak memory compared to counting without checkpoints
+and the size of the snapshot.
+Collaborations are read from column files (see `00b_count_brokerage_events_from_files.py`).
+"""
+import os
+import tempfile
+from typing import Dict, Any, Optional
+from argparse import ArgumentParser
+
+from cumulative_advantage_brokerage.benchmark import measure_isolated
+from cumulative_advantage_brokerage.constants import EDGE_HISTORY_FIRST
+from cumulative_advantage_brokerage.network import\
+    FileEdgeGenerator, GrowingTemporalLinkedListNetwork,\
+    GrowingTemporalArrayNetwork, InitiationMotifCollector,\
+    MotifCollectorCheckpointer, MemoryMotifSink
+
+NETWORKS = {
+    "linked-list": GrowingTemporalLinkedListNetwork,
+    "array": GrowingTemporalArrayNetwork,
+}
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("--columns",
+                    type=str, required=True,
+                    help="Folder of the column files.")
+    ap.add_argument("-n", "--networks",
+                    choices=list(NETWORKS.keys()),
+                    default=list(NETWORKS.keys()),
+                    type=str,
+                    nargs="+")
+    ap.add_argument("--every-dates",
+                    type=int, default=500,
+                    help="Write a checkpoint after this many dates.")
+    return vars(ap.parse_args())
+
+def count(folder: str, network: str, path_checkpoint: Optional[str], every_dates: int) -> float:
+    network = NETWORKS[network](
+        generator=FileEdgeGenerator(folder=folder), edge_history=EDGE_HISTORY_FIRST)
+    collector = InitiationMotifCollector(
+        network=network, session=None, sink=MemoryMotifSink())
+    checkpointer = None
+    if path_checkpoint is not None:
+        checkpointer = MotifCollectorCheckpointer(
+            collector=collector, path=path_checkpoint, every_dates=every_dates)
+    collector.integrate_counts()
+    if checkpointer is None:
+        return 0.
+    checkpointer.close()
+    return checkpointer.seconds_pause_max
+
+def main():
+    args = parse_args()
+    with tempfile.TemporaryDirectory() as folder_tmp:
+        path_checkpoint = os.path.join(folder_tmp, "checkpoint.npz")
+        for network in args["networks"]:
+            print(f"Counting motifs on `{network}` without checkpoints.")
+            m_plain = measure_isolated(count, args["columns"], network, None, args["every_dates"])
+            print(f"Counting motifs on `{network}` with a checkpoint every {args['every_dates']} dates.")
+            m_checkpoint = measure_isolated(
+                count, args["columns"], network, path_checkpoint, args["every_dates"])
+            print((f"\tWithout: {m_plain.wall_time:.1f}s (peak RSS +{m_plain.peak_rss / 2**20:.1f} MiB), "
+                   f"with: {m_checkpoint.wall_time:.1f}s (peak RSS +{m_checkpoint.peak_rss / 2**20:.1f} MiB), "
+                   f"longest pause: {m_checkpoint.result:.3f}s, "
+                   f"snapshot: {os.path.getsize(path_checkpoint) / 2**20:.1f} MiB."))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compares the throughput of motif sinks when writing the motifs of the first dates.
+Motifs are written to a temporary copy of the motif table, which is dropped afterwards.
+"""
+from typing import Dict, Any, List
+from argparse import ArgumentParser
+
+from sqlalchemy import MetaData, Table, text
+
+from cumulative_advantage_brokerage.benchmark import measure
+from cumulative_advantage_brokerage.config import parse_config
+from cumulative_advantage_brokerage.constants import ARG_POSTGRES_DB_APS
+from cumulative_advantage_brokerage.dbm import\
+    PostgreSQLEngine, CumAdvBrokSession, BaseTriadicClosureMotif
+from cumulative_advantage_brokerage.network import\
+    SQLEdgeGenerator, GrowingTemporalLinkedListNetwork,\
+    InitiationMotifCollector, MotifSink, MemoryMotifSink,\
+    InsertMotifSink, PostgresCopyMotifSink
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("-d", "--n-dates",
+                    type=int, default=2000,
+                    help="Number of dates of which motifs are collected.")
+    ap.add_argument("-b", "--batch-size",
+                    type=int, default=100000,
+                    help="Number of motifs per COPY batch.")
+    return vars(ap.parse_args())
+
+def write_motifs(sink: MotifSink, l_motifs_dates: List[List[Dict[str, Any]]]) -> int:
+    for l_motifs in l_motifs_dates:
+        sink.write(l_motifs)
+    sink.close()
+    return sum(len(l_motifs) for l_motifs in l_motifs_dates)
+
+def main():
+    config = parse_config([ARG_POSTGRES_DB_APS])
+    engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
+    args = parse_args()
+    name_table = f"{BaseTriadicClosureMotif.__tablename__}_benchmark"
+
+    with CumAdvBrokSession(engine) as session:
+        print(f"Collecting motifs of the first {args['n_dates']} dates.")
+        collector = InitiationMotifCollector(
+            network=GrowingTemporalLinkedListNetwork(generator=SQLEdgeGenerator(session=session)),
+            session=session, sink=MemoryMotifSink())
+        l_motifs_dates = []
+        for i, l_motifs in enumerate(collector.generate_motifs()):
+            if i == args["n_dates"]:
+                break
+            l_motifs_dates.append(l_motifs)
+
+        sinks = {
+            "insert": lambda table: InsertMotifSink(session=session, table=table),
+            "copy": lambda table: PostgresCopyMotifSink(
+                engine=engine, table=table, batch_size=args["batch_size"]),
+        }
+        for name, f_sink in sinks.items():
+            session.execute(text((
+                f"CREATE TABLE {name_table} "
+                f"(LIKE {BaseTriadicClosureMotif.__tablename__} INCLUDING ALL)")))
+            session.commit()
+            try:
+                table = Table(name_table, MetaData(), autoload_with=engine)
+                m = measure(write_motifs, f_sink(table), l_motifs_dates)
+                print((f"Sink `{name}`: {m.result} motifs in {m.wall_time:.1f}s "
+                       f"({m.result / m.wall_time:.0f} motifs/s)"))
+            finally:
+                session.rollback()
+                session.execute(text(f"DROP TABLE {name_table}"))
+                session.commit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Compares peak memory and throughput of the network backends
+when replaying the full collaboration stream.
+"""
+from typing import Dict, Any, Type
+from argparse import ArgumentParser
+from itertools import product
+
+from cumulative_advantage_brokerage.benchmark import measure_isolated
+from cumulative_advantage_brokerage.config import parse_config
+from cumulative_advantage_brokerage.constants import\
+    ARG_POSTGRES_DB_APS, CN_EVENT_LINK_ADD_AFTER, TPL_EDGE_HISTORY
+from cumulative_advantage_brokerage.dbm import\
+    PostgreSQLEngine, CumAdvBrokSession
+from cumulative_advantage_brokerage.network import\
+    SQLEdgeGenerator, GrowingTemporalNetwork,\
+    GrowingTemporalLinkedListNetwork, GrowingTemporalArrayNetwork
+
+NETWORKS = {
+    "linked-list": GrowingTemporalLinkedListNetwork,
+    "array": GrowingTemporalArrayNetwork,
+}
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("-n", "--networks",
+                    choices=list(NETWORKS.keys()),
+                    default=list(NETWORKS.keys()),
+                    type=str,
+                    nargs="+")
+    ap.add_argument("-e", "--edge-histories",
+                    choices=TPL_EDGE_HISTORY,
+                    default=list(TPL_EDGE_HISTORY),
+                    type=str,
+                    nargs="+")
+    return vars(ap.parse_args())
+
+def build_network(
+        generator: SQLEdgeGenerator,
+        Network: Type[GrowingTemporalNetwork],
+        edge_history: str) -> int:
+    network = Network(generator=generator, edge_history=edge_history)
+    n_links = 0
+    def f_count(link, link_attr):
+        nonlocal n_links
+        n_links += 1
+    network.register_event_handler(
+        event=CN_EVENT_LINK_ADD_AFTER, event_handler=f_count)
+    network.aggregate_network()
+    return n_links
+
+def main():
+    config = parse_config([ARG_POSTGRES_DB_APS])
+    engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
+    args = parse_args()
+
+    with CumAdvBrokSession(engine) as session:
+        print("Loading collaborations.")
+        # Loaded once before forking, so that all backends replay the same stream
+        generator = SQLEdgeGenerator(session=session)
+
+        for name, edge_history in product(args["networks"], args["edge_histories"]):
+            print(f"Building network `{name}` with edge history `{edge_history}`.")
+            m = measure_isolated(build_network, generator, NETWORKS[name], edge_history)
+            print((f"\t{m.result} links in {m.wall_time:.1f}s "
+                   f"({m.result / m.wall_time:.0f} links/s), "
+                   f"peak RSS +{m.peak_rss / 2**20:.1f} MiB"))
+
+if __name__ == "__main__":
+    main()
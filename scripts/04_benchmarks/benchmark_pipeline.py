@@ -0,0 +1,353 @@
+"""Benchmarks each stage of the pipeline on synthetic data at several scales.
+For each stage and scale, wall time, peak RSS increase and rows per second are recorded
+and stored as JSON. With `--baseline`, results are compared against a previous run
+and the script fails if a stage regressed.
+
+Stages run in pipeline order on a dedicated database (`--database`),
+whose tables are dropped and recreated for each scale.
+"""
+import os
+import sys
+import runpy
+from datetime import datetime
+from typing import Dict, Any, List
+from argparse import ArgumentParser
+
+from sqlalchemy import text
+
+from cumulative_advantage_brokerage.benchmark import\
+    StageResult, run_stage, save_results, load_results,\
+    find_regressions, format_results
+from cumulative_advantage_brokerage.career_series import\
+    CollaboratorSeriesBrokerageInference, ArrayCollaboratorSeriesBrokerageInference,\
+    ImpactGroupsInference,\
+    CareerLengthBinner, CitationsBinner, ProductivityBinner,\
+    StandardFilter
+from cumulative_advantage_brokerage.config import parse_config
+from cumulative_advantage_brokerage.constants import\
+    ARG_POSTGRES_DB, ARG_POSTGRES_DB_APS, ARG_POSTGRES_USER, ARG_PATH_CONTAINER_OUTPUT,\
+    CS_BINS_PERCENTILES, STR_CAREER_LENGTH, STR_CITATIONS, STR_PRODUCTIVITY,\
+    TPL_STR_IMPACT, STR_BF_CMP, N_RESAMPLES_DEFAULT,\
+    FILE_NAME_CSV_GENDER, FILE_NAME_CSV_AUTHORS,\
+    FILE_NAME_CSV_AUTHOR_NAMES, FILE_NAME_CSV_AUTHORSHIPS,\
+    FILE_NAME_CSV_PUBLICATIONS, FILE_NAME_CSV_CITATIONS
+from cumulative_advantage_brokerage.data import\
+    SyntheticAPSGenerator, TransferToCSV, write_csv
+from cumulative_advantage_brokerage.dbm import\
+    PostgreSQLEngine, CumAdvBrokSession, APSIntegrator,\
+    Base, MetricConfiguration, CollaboratorSeriesBrokerage
+from cumulative_advantage_brokerage.network import\
+    SQLEdgeGenerator, GrowingTemporalLinkedListNetwork, InitiationMotifCollector
+from cumulative_advantage_brokerage.stats import\
+    CollaboratorSeriesBrokerageComparison, MannWhitneyPermutTest, GrouperDummy
+
+PATH_SCRIPTS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIGURES = {
+    "figure_02_heterogeneity": ("-idcs-cs", "-idig-cit", "-idig-prd"),
+    "figure_03_frequency_comparison": ("-id-cs", "-idig-cit", "-idig-prd", "-idcmp-cit", "-idcmp-prd"),
+}
+STAGES = (
+    "transfer_to_csv", "populate_database", "sql_edge_generator", "motif_collector",
+    "binning", "series", "impact_groups", "comparisons", "figures")
+BINNERS = {
+    STR_CITATIONS: CitationsBinner,
+    STR_PRODUCTIVITY: ProductivityBinner,
+}
+SERIES_ENGINES = {
+    "sql": CollaboratorSeriesBrokerageInference,
+    "array": ArrayCollaboratorSeriesBrokerageInference,
+}
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("-s", "--scales",
+                    type=int, nargs="+", default=[10000, 100000],
+                    help="Numbers of authorships of the synthetic datasets.")
+    ap.add_argument("--until",
+                    choices=STAGES, default=STAGES[-1],
+                    help="Last stage to run (stages depend on their predecessors).")
+    ap.add_argument("--series-engine",
+                    choices=list(SERIES_ENGINES.keys()), default="sql",
+                    help="Engine of the series stage (see `01a_compute_brokerage_frequency_series.py`).")
+    ap.add_argument("--database",
+                    type=str, default="cumadvbrok_benchmark",
+                    help="Database to benchmark on. Its tables are dropped for each scale.")
+    ap.add_argument("--seed",
+                    type=int, default=42)
+    ap.add_argument("-r", "--n-resamples",
+                    type=int, default=N_RESAMPLES_DEFAULT,
+                    help="Resamples of the permutation tests of the comparisons.")
+    ap.add_argument("--folder",
+                    type=str, default=None,
+                    help=("Folder of synthetic data and figures. "
+                          "Defaults to `<PATH_CONTAINER_OUTPUT>/benchmarks`."))
+    ap.add_argument("-o", "--output",
+                    type=str, default=None,
+                    help="Path of the results JSON. Defaults to `<FOLDER>/pipeline_<TIME>.json`.")
+    ap.add_argument("-b", "--baseline",
+                    type=str, default=None,
+                    help="Results JSON of a previous run to compare against.")
+    ap.add_argument("-t", "--tolerance",
+                    type=float, default=.2,
+                    help="Relative increase of wall time or peak RSS over the baseline flagged as regression.")
+    return vars(ap.parse_args())
+
+def get_engine(config: Dict[str, Any]):
+    return PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
+
+def reset_database(config: Dict[str, Any]):
+    engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB)
+    with engine.connect() as conn:
+        is_present = conn.execute(
+            text("SELECT 1 FROM pg_database WHERE datname = :name"),
+            {"name": config[ARG_POSTGRES_DB_APS]}).first() is not None
+        if not is_present:
+            print(f"Creating database {config[ARG_POSTGRES_DB_APS]}.")
+            conn.execute(text("COMMIT"))
+            conn.execute(text(
+                f"CREATE DATABASE {config[ARG_POSTGRES_DB_APS]} "
+                f"OWNER {config[ARG_POSTGRES_USER]};"))
+    engine.dispose()
+    engine = get_engine(config)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+def add_metric_config(config: Dict[str, Any], d_args_config: Dict[str, Any]) -> int:
+    # Configurations are added before forking, such that stages can reference them.
+    # The engine is disposed, as connections must not be shared with the forked stages.
+    engine = get_engine(config)
+    with CumAdvBrokSession(engine) as session:
+        m_config = MetricConfiguration(args=d_args_config)
+        session.commit_list(l=[m_config])
+        id_config = m_config.id
+    engine.dispose()
+    return id_config
+
+def stage_transfer_to_csv(folder_metadata: str, file_disambiguation: str, folder_output: str) -> int:
+    transfer = TransferToCSV(
+        folder_metadata=folder_metadata,
+        file_disambiguation=file_disambiguation,
+        folder_output=folder_output)
+    transfer.integrate_data()
+    return len(transfer.collection.authorships)
+
+def stage_populate_database(config: Dict[str, Any], folder_csv: str, n_rows: int) -> int:
+    integrator = APSIntegrator(
+        engine=get_engine(config),
+        folder_csv=folder_csv,
+        file_gender=FILE_NAME_CSV_GENDER,
+        file_authors=FILE_NAME_CSV_AUTHORS,
+        file_author_names=FILE_NAME_CSV_AUTHOR_NAMES,
+        file_authorships=FILE_NAME_CSV_AUTHORSHIPS,
+        file_publications=FILE_NAME_CSV_PUBLICATIONS,
+        file_citations=FILE_NAME_CSV_CITATIONS)
+    integrator.populate_database()
+    return n_rows
+
+def stage_sql_edge_generator(config: Dict[str, Any]) -> int:
+    with CumAdvBrokSession(get_engine(config)) as session:
+        generator = SQLEdgeGenerator(session=session)
+        return sum(
+            len(d_collaborations)\
+                for date_yield in generator.edges()\
+                for d_collaborations in date_yield.collaborations.values())
+
+def stage_motif_collector(config: Dict[str, Any]) -> int:
+    with CumAdvBrokSession(get_engine(config)) as session:
+        network = GrowingTemporalLinkedListNetwork(generator=SQLEdgeGenerator(session=session))
+        collector = InitiationMotifCollector(network=network, session=session)
+        collector.integrate_counts()
+        collector.sink.close()
+        return collector.n_motifs
+
+def stage_binning(config: Dict[str, Any], id_config: int, n_rows: int) -> int:
+    with CumAdvBrokSession(get_engine(config)) as session:
+        binner = CareerLengthBinner(
+            session=session,
+            id_metric_configuration=id_config,
+            percentiles=CS_BINS_PERCENTILES,
+            collaborator_filter=StandardFilter())
+        binner.compute_binning_borders()
+    return n_rows
+
+def stage_series(config: Dict[str, Any], id_config: int, engine: str) -> int:
+    with CumAdvBrokSession(get_engine(config)) as session:
+        cs = SERIES_ENGINES[engine](
+            session=session,
+            id_metric_configuration=id_config,
+            binner=CareerLengthBinner.from_database(
+                session=session,
+                id_metric_configuration=id_config,
+                percentiles=CS_BINS_PERCENTILES,
+                collaborator_filter=StandardFilter()),
+            collaborator_filter=StandardFilter())
+        l_stages_max = cs.get_stages_max()
+        session.write_list(l=l_stages_max)
+
+        with session.bulk_writer(CollaboratorSeriesBrokerage.__table__, asynchronous=True) as writer:
+            for result in cs.generate_series():
+                writer.write(result.l_series)
+    return len(l_stages_max) + writer.n_rows
+
+def stage_impact_groups(config: Dict[str, Any], d_id_configs: Dict[str, int]) -> int:
+    n_rows = 0
+    with CumAdvBrokSession(get_engine(config)) as session:
+        for metric, id_config in d_id_configs.items():
+            binner = BINNERS[metric](
+                session=session,
+                id_metric_configuration=id_config,
+                percentiles=CS_BINS_PERCENTILES,
+                collaborator_filter=StandardFilter())
+            binner.compute_binning_borders()
+            inf = ImpactGroupsInference(
+                session=session,
+                id_metric_configuration=id_config,
+                binner=binner)
+            n_rows += len(inf.compute_impact_groups())
+    return n_rows
+
+def stage_comparisons(
+        config: Dict[str, Any], id_config_career: int,
+        d_id_configs_impact: Dict[str, int], d_id_configs_cmp: Dict[str, int],
+        n_resamples: int) -> int:
+    n_rows = 0
+    with CumAdvBrokSession(get_engine(config)) as session:
+        for metric, id_config_cmp in d_id_configs_cmp.items():
+            cmp = CollaboratorSeriesBrokerageComparison(
+                session=session,
+                id_metric_config_comparison=id_config_cmp,
+                id_metric_config_career=id_config_career,
+                id_metric_config_impact_group=d_id_configs_impact[metric],
+                statistical_test=MannWhitneyPermutTest(n_resamples=n_resamples),
+                grouper=GrouperDummy)
+            cmp.init_cached_data()
+            for g_val in GrouperDummy.possible_values:
+                l_res = list(cmp.generate_comparisons(grouping_key=g_val))
+                session.write_list(l_res)
+                n_rows += len(l_res)
+    return n_rows
+
+def stage_figure(config: Dict[str, Any], name: str, l_argv: List[str], folder_output: str) -> int:
+    # Runs the figure script in the (forked) process of the stage
+    os.environ.update({
+        ARG_POSTGRES_DB_APS: config[ARG_POSTGRES_DB_APS],
+        ARG_PATH_CONTAINER_OUTPUT: folder_output})
+    path = os.path.join(PATH_SCRIPTS, "03_plotting", f"{name}.py")
+    sys.argv = [path] + l_argv
+    runpy.run_path(path, run_name="__main__")
+    return 1
+
+def run_scale(config: Dict[str, Any], args: Dict[str, Any], scale: int) -> List[StageResult]:
+    l_stages = STAGES[:STAGES.index(args["until"]) + 1]
+    folder = os.path.join(args["folder"], f"synthetic_{scale}")
+    folder_metadata = os.path.join(folder, "metadata")
+    folder_csv = os.path.join(folder, "csv")
+    folder_transfer = os.path.join(folder, "transfer")
+    file_disambiguation = os.path.join(folder, "disambiguation.csv")
+    for f in (folder_metadata, folder_csv, folder_transfer):
+        os.makedirs(f, exist_ok=True)
+
+    print(f"Generating synthetic data of {scale} authorships in `{folder}`.")
+    generator = SyntheticAPSGenerator.from_n_authorships(scale, seed=args["seed"])
+    dfs = generator.write_metadata(folder_metadata, file_disambiguation)
+    write_csv(folder_out=folder_csv, df_aps=dfs)
+    n_authors = len(dfs.authors)
+
+    l_results = []
+    def run(stage: str, f, *f_args):
+        print(f"Running stage `{stage}` at scale {scale}.")
+        result = run_stage(stage, scale, f, *f_args)
+        print((f"\t{result.n_rows} rows in {result.wall_time:.2f}s "
+               f"({result.rows_per_s:.0f} rows/s), peak RSS +{result.peak_rss / 2**20:.1f} MiB"))
+        l_results.append(result)
+
+    run("transfer_to_csv", stage_transfer_to_csv,
+        folder_metadata, file_disambiguation, folder_transfer)
+    if len(l_stages) == 1:
+        return l_results
+
+    reset_database(config)
+    run("populate_database", stage_populate_database,
+        config, folder_csv, sum(len(df) for df in vars(dfs).values()))
+    if "sql_edge_generator" in l_stages:
+        run("sql_edge_generator", stage_sql_edge_generator, config)
+    if "motif_collector" in l_stages:
+        run("motif_collector", stage_motif_collector, config)
+
+    if "binning" in l_stages:
+        id_config_career = add_metric_config(config, {
+            "type": CollaboratorSeriesBrokerageInference.__name__,
+            "metric": STR_CAREER_LENGTH,
+            "binner": CareerLengthBinner.__name__,
+            "binning": "quantile",
+            "bins_quantiles": CS_BINS_PERCENTILES})
+        run("binning", stage_binning, config, id_config_career, n_authors)
+    if "series" in l_stages:
+        run("series", stage_series, config, id_config_career, args["series_engine"])
+
+    if "impact_groups" in l_stages:
+        d_id_configs_impact = {metric: add_metric_config(config, {
+            "type": ImpactGroupsInference.__name__,
+            "metric": metric,
+            "binner": BINNERS[metric].__name__,
+            "binning": "quantile",
+            "bins_quantiles": CS_BINS_PERCENTILES}) for metric in TPL_STR_IMPACT}
+        run("impact_groups", stage_impact_groups, config, d_id_configs_impact)
+
+    if "comparisons" in l_stages:
+        d_id_configs_cmp = {metric: add_metric_config(config, {
+            "type": CollaboratorSeriesBrokerageComparison.__name__,
+            "comparison": STR_BF_CMP,
+            "id_metric_config_career": id_config_career,
+            "id_metric_config_impact": d_id_configs_impact[metric],
+            "metric_success": metric,
+            "stat_test": MannWhitneyPermutTest.label_file,
+            "grouper": GrouperDummy.name,
+            "n_resample_permut": args["n_resamples"],
+            "n_resample_bootstrap": args["n_resamples"]}) for metric in TPL_STR_IMPACT}
+        run("comparisons", stage_comparisons,
+            config, id_config_career, d_id_configs_impact, d_id_configs_cmp, args["n_resamples"])
+
+    if "figures" in l_stages:
+        l_ids = [id_config_career]\
+            + [d_id_configs_impact[metric] for metric in TPL_STR_IMPACT]\
+            + [d_id_configs_cmp[metric] for metric in TPL_STR_IMPACT]
+        for name, l_flags in FIGURES.items():
+            l_argv = [str(v) for flag, id_config in zip(l_flags, l_ids) for v in (flag, id_config)]
+            run(name, stage_figure, config, name, l_argv, folder)
+    return l_results
+
+def main():
+    args = parse_args()
+    config = parse_config([] if args["until"] == STAGES[0] else [ARG_POSTGRES_DB])
+    if config.get(ARG_POSTGRES_DB_APS) == args["database"]:
+        sys.exit(f"Refusing to benchmark on `{ARG_POSTGRES_DB_APS}`, as its tables would be dropped.")
+    config[ARG_POSTGRES_DB_APS] = args["database"]
+    args["folder"] = args["folder"] or os.path.join(
+        config.get(ARG_PATH_CONTAINER_OUTPUT, "."), "benchmarks")
+    path_output = args["output"] or os.path.join(
+        args["folder"], f"pipeline_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    os.makedirs(args["folder"], exist_ok=True)
+
+    l_results = []
+    for scale in args["scales"]:
+        l_results += run_scale(config, args, scale)
+        # Results are stored after each scale, such that aborted runs are not lost
+        save_results(path_output, l_results, d_meta={"seed": args["seed"], "until": args["until"]})
+
+    l_baseline = load_results(args["baseline"]) if args["baseline"] is not None else None
+    print(format_results(l_results, l_baseline))
+    print(f"Results written to `{path_output}`.")
+    if l_baseline is None:
+        return
+    l_regressions = find_regressions(l_results, l_baseline, tolerance=args["tolerance"])
+    for reg in l_regressions:
+        print((f"Regression of `{reg.stage}` at scale {reg.scale}: {reg.metric} "
+               f"{reg.value_baseline:.4g} -> {reg.value:.4g} ({reg.ratio:.2f}x)."))
+    if len(l_regressions) > 0:
+        sys.exit(1)
+    print(f"No regressions against `{args['baseline']}` (tolerance: {args['tolerance']:.0%}).")
+
+if __name__ == "__main__":
+    main()
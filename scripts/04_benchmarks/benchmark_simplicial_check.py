@@ -0,0 +1,84 @@
+"""Compares the simplicial dominance check of the motif collector
+by a scan over all projects of a date against the per-date inverted index
+(collaborator -> projects) on the busiest dates.
+"""
+import heapq
+import random
+import time
+from collections import defaultdict
+from typing import Dict, Any, List, Set, Tuple
+from argparse import ArgumentParser
+
+from cumulative_advantage_brokerage.config import parse_config
+from cumulative_advantage_brokerage.constants import ARG_POSTGRES_DB_APS
+from cumulative_advantage_brokerage.dbm import\
+    PostgreSQLEngine, CumAdvBrokSession
+from cumulative_advantage_brokerage.network import SQLEdgeGenerator
+from cumulative_advantage_brokerage.network.sql_edge_generator import DateYield
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("-d", "--n-dates",
+                    type=int, default=10,
+                    help="Number of busiest dates to benchmark.")
+    ap.add_argument("-t", "--n-triplets",
+                    type=int, default=10000,
+                    help="Number of sampled triplets per date.")
+    ap.add_argument("-s", "--seed", type=int, default=0)
+    return vars(ap.parse_args())
+
+def sample_triplets(date: DateYield, n_triplets: int, rnd: random.Random)\
+        -> List[Tuple[int, int, int]]:
+    # Closing pairs stem from a project of the date, brokers from all collaborators of the date
+    l_projects = [list(project) for project in date.collaborations.values() if len(project) > 1]
+    l_collaborators = list(date.collaborators)
+    l_triplets = []
+    for _ in range(n_triplets):
+        u, v = rnd.sample(rnd.choice(l_projects), 2)
+        l_triplets.append((u, rnd.choice(l_collaborators), v))
+    return l_triplets
+
+def check_scan(date: DateYield, l_triplets: List[Tuple[int, int, int]]) -> int:
+    return sum(
+        any({u, b, v}.issubset(project) for project in date.collaborations.values())\
+            for u, b, v in l_triplets)
+
+def check_index(date: DateYield, l_triplets: List[Tuple[int, int, int]]) -> int:
+    d_index: Dict[int, Set[int]] = defaultdict(set)
+    for id_project, project in date.collaborations.items():
+        for id_collaborator in project:
+            d_index[id_collaborator].add(id_project)
+    return sum(
+        not d_index[u].intersection(d_index[v]).isdisjoint(d_index.get(b, ()))\
+            for u, b, v in l_triplets)
+
+def main():
+    config = parse_config([ARG_POSTGRES_DB_APS])
+    engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
+    args = parse_args()
+    rnd = random.Random(args["seed"])
+
+    with CumAdvBrokSession(engine) as session:
+        print("Loading collaborations.")
+        generator = SQLEdgeGenerator(session=session)
+        l_dates = heapq.nlargest(
+            args["n_dates"],
+            (date for date in generator.edges()\
+                if any(len(project) > 1 for project in date.collaborations.values())),
+            key=lambda date: len(date.collaborations))
+
+        for date in l_dates:
+            l_triplets = sample_triplets(date, args["n_triplets"], rnd)
+            t_start = time.perf_counter()
+            n_scan = check_scan(date, l_triplets)
+            t_scan = time.perf_counter() - t_start
+            t_start = time.perf_counter()
+            n_index = check_index(date, l_triplets)
+            t_index = time.perf_counter() - t_start
+            assert n_scan == n_index
+            print((f"{date.timestamp:%Y-%m-%d} ({len(date.collaborations)} projects): "
+                   f"scan {t_scan:.3f}s, index {t_index:.3f}s "
+                   f"(incl. construction, speedup {t_scan / t_index:.1f}x)"))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""Generates a synthetic, APS-like collaboration history to benchmark the pipeline without the APS data.
+The CSV files follow the layout of `00_data_preprocessing` (after gender inference)
+and can optionally be integrated into the database by `APSIntegrator`.
+"""
+import os
+from typing import Dict, Any
+from argparse import ArgumentParser
+
+from cumulative_advantage_brokerage.config import parse_config
+from cumulative_advantage_brokerage.constants import\
+    ARG_PATH_CONTAINER_OUTPUT, ARG_POSTGRES_DB_APS,\
+    FILE_NAME_CSV_GENDER, FILE_NAME_CSV_AUTHORS,\
+    FILE_NAME_CSV_AUTHOR_NAMES, FILE_NAME_CSV_AUTHORSHIPS,\
+    FILE_NAME_CSV_PUBLICATIONS, FILE_NAME_CSV_CITATIONS
+from cumulative_advantage_brokerage.data import SyntheticAPSGenerator, write_csv
+from cumulative_advantage_brokerage.dbm import PostgreSQLEngine, APSIntegrator
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("-n", "--authorships",
+                    type=int, default=100000,
+                    help="Approximate number of authorships (e.g., 10000 to 10000000).")
+    ap.add_argument("--seed",
+                    type=int, default=42,
+                    help="Seed of the random number generator.")
+    ap.add_argument("--year-start",
+                    type=int, default=1893)
+    ap.add_argument("--year-end",
+                    type=int, default=2020)
+    ap.add_argument("--team-size-exponent",
+                    type=float, default=2.2,
+                    help="Exponent of the Zipf distribution of team sizes.")
+    ap.add_argument("--max-team-size",
+                    type=int, default=500)
+    ap.add_argument("--career-length-mean",
+                    type=float, default=8.,
+                    help="Mean career length in years.")
+    ap.add_argument("--references-mean",
+                    type=float, default=10.,
+                    help="Mean number of references per publication.")
+    ap.add_argument("--gender-shares",
+                    type=float, nargs=3, default=[.3, .15, .55],
+                    metavar=("UNKNOWN", "FEMALE", "MALE"),
+                    help="Shares of the genders of authors.")
+    ap.add_argument("--folder",
+                    type=str, default=None,
+                    help=("Folder of the CSV files. "
+                          "Defaults to `<PATH_CONTAINER_OUTPUT>/data/synthetic_<AUTHORSHIPS>`."))
+    ap.add_argument("--metadata",
+                    action="store_true",
+                    help=("Also write the raw input of `00_data_preprocessing/00_transform_data_to_csv.py` "
+                          "(JSON metadata in `<FOLDER>/metadata`, disambiguation in `<FOLDER>/disambiguation.csv`)."))
+    ap.add_argument("--populate-database",
+                    action="store_true",
+                    help=("Integrate the CSV files into the (empty) database `POSTGRES_DB_APS` "
+                          "as by `01_database_setup/02_integrate_aps_data.py`."))
+    return vars(ap.parse_args())
+
+def main():
+    args = parse_args()
+    config = parse_config([ARG_POSTGRES_DB_APS] if args["populate_database"] else [])
+    folder = args["folder"] or os.path.join(
+        config.get(ARG_PATH_CONTAINER_OUTPUT, "."), "data", f"synthetic_{args['authorships']}")
+    os.makedirs(folder, exist_ok=True)
+
+    generator = SyntheticAPSGenerator.from_n_authorships(
+        args["authorships"],
+        seed=args["seed"],
+        year_start=args["year_start"],
+        year_end=args["year_end"],
+        team_size_exponent=args["team_size_exponent"],
+        max_team_size=args["max_team_size"],
+        career_length_mean=args["career_length_mean"],
+        n_references_mean=args["references_mean"],
+        gender_shares=tuple(args["gender_shares"]))
+    if args["metadata"]:
+        dfs = generator.write_metadata(
+            folder_metadata=os.path.join(folder, "metadata"),
+            file_disambiguation=os.path.join(folder, "disambiguation.csv"))
+        write_csv(folder_out=folder, df_aps=dfs)
+    else:
+        generator.write(folder)
+
+    if args["populate_database"]:
+        engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
+        integrator = APSIntegrator(
+            engine=engine,
+            folder_csv=folder,
+            file_gender=FILE_NAME_CSV_GENDER,
+            file_authors=FILE_NAME_CSV_AUTHORS,
+            file_author_names=FILE_NAME_CSV_AUTHOR_NAMES,
+            file_authorships=FILE_NAME_CSV_AUTHORSHIPS,
+            file_publications=FILE_NAME_CSV_PUBLICATIONS,
+            file_citations=FILE_NAME_CSV_CITATIONS)
+        integrator.populate_database()
+
+if __name__ == "__main__":
+    main()
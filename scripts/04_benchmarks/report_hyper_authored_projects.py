@@ -0,0 +1,112 @@
+"""Reports how many links and wedges stem from projects above a size threshold
+and compares the motif count under the project size policies of the network.
+Collaborations are read from the database or, with `--columns`, from column files.
+"""
+from typing import Dict, Any, List, Optional, Tuple
+from argparse import ArgumentParser
+
+import numpy as np
+
+from cumulative_advantage_brokerage.benchmark import measure_isolated
+from cumulative_advantage_brokerage.config import parse_config
+from cumulative_advantage_brokerage.constants import\
+    ARG_POSTGRES_DB_APS, EDGE_HISTORY_FIRST, PROJECT_SIZE_EXPAND, TPL_PROJECT_SIZE_POLICY
+from cumulative_advantage_brokerage.dbm import\
+    PostgreSQLEngine, CumAdvBrokSession
+from cumulative_advantage_brokerage.network import\
+    EdgeGenerator, SQLEdgeGenerator, FileEdgeGenerator,\
+    GrowingTemporalLinkedListNetwork, InitiationMotifCollector, MotifSink
+
+def parse_args() -> Dict[str, Any]:
+    ap = ArgumentParser()
+    ap.add_argument("-s", "--max-project-size",
+                    type=int, default=100,
+                    help="Projects with more collaborators are hyper-authored.")
+    ap.add_argument("-p", "--policies",
+                    choices=TPL_PROJECT_SIZE_POLICY,
+                    default=[],
+                    type=str,
+                    nargs="*",
+                    help="Project size policies to count motifs with (none by default).")
+    ap.add_argument("--columns",
+                    type=str, default=None,
+                    help="Folder of column files to read instead of the database.")
+    return vars(ap.parse_args())
+
+class CountingMotifSink(MotifSink):
+    """Counts motifs without keeping them.
+    """
+    n_motifs: int
+
+    def __init__(self) -> None:
+        self.n_motifs = 0
+
+    def write(self, l_motifs: List[Dict[str, Any]]) -> None:
+        self.n_motifs += len(l_motifs)
+
+def get_project_sizes(generator: EdgeGenerator) -> np.ndarray:
+    # Chunks end on date boundaries, so projects are not split
+    return np.concatenate([np.zeros(0, dtype=np.int64)] + [
+        np.unique(columns.projects, return_counts=True)[1]\
+            for columns in generator.iter_columns()])
+
+def report_project_sizes(a_sizes: np.ndarray, max_project_size: int):
+    a_sizes = a_sizes.astype(np.float64)
+    a_links = a_sizes * (a_sizes - 1) / 2
+    # Wedges (paths of two links) within the clique of each project
+    a_wedges = a_sizes * (a_sizes - 1) * (a_sizes - 2) / 2
+    a_large = a_sizes > max_project_size
+    print(f"{'':<12} {'projects':>12} {'links':>16} {'wedges':>20}")
+    for label, a_mask in (("all", np.ones_like(a_large)), (f"> {max_project_size}", a_large)):
+        print((f"{label:<12} {a_mask.sum():>12.0f} "
+               f"{a_links[a_mask].sum():>16.0f} {a_wedges[a_mask].sum():>20.0f}"))
+    print((f"Projects above {max_project_size} collaborators "
+           f"({a_large.mean():.3%} of all projects, largest: {a_sizes.max(initial=0):.0f}) "
+           f"contribute {a_links[a_large].sum() / max(a_links.sum(), 1):.1%} of links "
+           f"and {a_wedges[a_large].sum() / max(a_wedges.sum(), 1):.1%} of wedges."))
+
+def count_motifs(
+        generator: EdgeGenerator,
+        project_size_policy: str,
+        max_project_size: Optional[int]) -> Tuple[int, int]:
+    network = GrowingTemporalLinkedListNetwork(
+        generator=generator,
+        edge_history=EDGE_HISTORY_FIRST,
+        project_size_policy=project_size_policy,
+        max_project_size=max_project_size)
+    sink = CountingMotifSink()
+    collector = InitiationMotifCollector(network=network, session=None, sink=sink)
+    collector.integrate_counts()
+    return sink.n_motifs, collector.n_motifs_clique
+
+def report(generator: EdgeGenerator, args: Dict[str, Any]):
+    print("Counting project sizes.")
+    report_project_sizes(get_project_sizes(generator), args["max_project_size"])
+
+    wall_time_expand = None
+    for policy in args["policies"]:
+        print(f"Counting motifs with project size policy `{policy}`.")
+        m = measure_isolated(count_motifs, generator, policy, args["max_project_size"])
+        n_motifs, n_motifs_clique = m.result
+        if policy == PROJECT_SIZE_EXPAND:
+            wall_time_expand = m.wall_time
+        speedup = "" if wall_time_expand is None\
+            else f", speedup over `{PROJECT_SIZE_EXPAND}`: {wall_time_expand / m.wall_time:.2f}x"
+        print((f"\t{n_motifs} motifs written, {n_motifs_clique} motifs within cliques "
+               f"in {m.wall_time:.1f}s, peak RSS +{m.peak_rss / 2**20:.1f} MiB{speedup}"))
+
+def main():
+    args = parse_args()
+    if args["columns"] is not None:
+        report(FileEdgeGenerator(folder=args["columns"]), args)
+        return
+
+    config = parse_config([ARG_POSTGRES_DB_APS])
+    engine = PostgreSQLEngine.from_config(config, key_dbname=ARG_POSTGRES_DB_APS)
+    with CumAdvBrokSession(engine) as session:
+        print("Loading collaborations.")
+        # Loaded once before forking, so that all policies replay the same stream
+        report(SQLEdgeGenerator(session=session), args)
+
+if __name__ == "__main__":
+    main()